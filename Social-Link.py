@@ -1,9 +1,33 @@
+import argparse
+import asyncio
+import bisect
+import csv
+import gzip
+import hashlib
+import heapq
+import io
+import json
+import os
+import platform
 import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import warnings
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, redirect_stdout
+from dataclasses import dataclass, replace
+from functools import wraps
+from itertools import chain
+from statistics import NormalDist
+import numpy as np
 import networkx as nx
-import matplotlib.pyplot as plt
-from matplotlib.patches import Patch
-from typing import List, Tuple, Set, Dict
-from matplotlib.animation import FuncAnimation
+from typing import List, Tuple, Set, Dict, Optional, Iterator, Any, Hashable, Iterable, Callable, Union
 
 ACTIVITIES = [
     "Fan de Re:Zero",
@@ -41,15 +65,2372 @@ ACTIVITIES = [
     "Fan de Guyeux"
 ]
 
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Metrics:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.enabled = False
+        self.buckets = tuple(buckets)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}  # fonction -> {"buckets", "count", "sum", "max"}
+            self.counters = {}  # (compteur, fonction) -> valeur
+            self.spans = {}  # chemin "a/b/c" -> [appels, durée totale, durée max]
+
+    def _stack(self) -> List[str]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name: str):
+        if not self.enabled:
+            yield
+            return
+
+        stack = self._stack()
+        stack.append(name)
+        path = "/".join(stack)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._observe(name, path, time.perf_counter() - started)
+            stack.pop()
+
+    def _observe(self, name: str, path: str, elapsed: float):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = {
+                    "buckets": [0] * (len(self.buckets) + 1), "count": 0, "sum": 0.0, "max": 0.0}
+            histogram["buckets"][bisect.bisect_left(self.buckets, elapsed)] += 1
+            histogram["count"] += 1
+            histogram["sum"] += elapsed
+            histogram["max"] = max(histogram["max"], elapsed)
+
+            span = self.spans.setdefault(path, [0, 0.0, 0.0])
+            span[0] += 1
+            span[1] += elapsed
+            span[2] = max(span[2], elapsed)
+
+    def count(self, name: str, value: int = 1):
+        if not self.enabled:
+            return
+        stack = self._stack()
+        key = (name, stack[-1] if stack else "")
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + int(value)
+
+    def _quantile(self, histogram: Dict[str, Any], q: float) -> Optional[float]:
+        # borne supérieure du seau qui contient le quantile
+        rank = q * histogram["count"]
+        seen = 0
+        for bound, n in zip(self.buckets, histogram["buckets"]):
+            seen += n
+            if seen >= rank:
+                return min(bound, histogram["max"])
+        return histogram["max"]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "latency": {
+                    name: {
+                        "count": h["count"],
+                        "sum": h["sum"],
+                        "mean": h["sum"] / h["count"],
+                        "max": h["max"],
+                        "p50": self._quantile(h, 0.5),
+                        "p90": self._quantile(h, 0.9),
+                        "p99": self._quantile(h, 0.99),
+                        "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], h["buckets"])),
+                    }
+                    for name, h in self.histograms.items()
+                },
+                "counters": [
+                    {"name": name, "function": function, "value": value}
+                    for (name, function), value in sorted(self.counters.items())
+                ],
+                "spans": {path: {"calls": calls, "total": total, "max": longest}
+                          for path, (calls, total, longest) in sorted(self.spans.items())},
+            }
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix: str = "sociallink") -> str:
+        def label(value: str) -> str:
+            return value.replace("\\", "\\\\").replace('"', '\\"')
+
+        with self._lock:
+            lines = [f"# HELP {prefix}_call_duration_seconds Durée des appels instrumentés.",
+                     f"# TYPE {prefix}_call_duration_seconds histogram"]
+            for name, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, n in zip([str(b) for b in self.buckets] + ["+Inf"], h["buckets"]):
+                    cumulative += n
+                    lines.append(f'{prefix}_call_duration_seconds_bucket{{function="{label(name)}",le="{bound}"}} '
+                                 f'{cumulative}')
+                lines.append(f'{prefix}_call_duration_seconds_sum{{function="{label(name)}"}} {h["sum"]!r}')
+                lines.append(f'{prefix}_call_duration_seconds_count{{function="{label(name)}"}} {h["count"]}')
+
+            for counter in sorted({name for name, _ in self.counters}):
+                lines.append(f"# TYPE {prefix}_{counter}_total counter")
+                for (name, function), value in sorted(self.counters.items()):
+                    if name == counter:
+                        lines.append(f'{prefix}_{counter}_total{{function="{label(function)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+METRICS = Metrics()
+
+
+def instrumented(name: str = None) -> Callable:
+    def decorate(func: Callable) -> Callable:
+        label = name or func.__qualname__
+
+        # désactivé, le seul surcoût est ce test
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return func(*args, **kwargs)
+            with METRICS.span(label):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+@dataclass
+class CallProfile:
+    result: Any
+    seconds: float
+    stats: Optional[str]
+    peak_memory: Optional[int]
+    top_allocations: List[Tuple[str, int]]
+
+
+def profile_call(func: Callable, args: Tuple = (), kwargs: Dict[str, Any] = None, cpu: bool = True,
+                 memory: bool = False, top: int = 20, stats_path: str = None) -> CallProfile:
+    import cProfile
+    import pstats
+
+    kwargs = kwargs or {}
+    profiler = cProfile.Profile() if cpu else None
+    if memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        if profiler is not None:
+            result = profiler.runcall(func, *args, **kwargs)
+        else:
+            result = func(*args, **kwargs)
+    finally:
+        seconds = time.perf_counter() - started
+        peak_memory, allocations = None, []
+        if memory:
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            statistics = tracemalloc.take_snapshot().statistics("lineno")[:top]
+            allocations = [(str(stat.traceback), stat.size) for stat in statistics]
+            tracemalloc.stop()
+
+    stats = None
+    if profiler is not None:
+        if stats_path is not None:
+            profiler.dump_stats(stats_path)
+        buffer = io.StringIO()
+        pstats.Stats(profiler, stream=buffer).sort_stats("cumulative").print_stats(top)
+        stats = buffer.getvalue()
+
+    return CallProfile(result, seconds, stats, peak_memory, allocations)
+
+
+def _csr_gather(offsets: np.ndarray, indices: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    starts = offsets[rows].astype(np.int64)
+    counts = offsets[rows + 1].astype(np.int64) - starts
+    total = int(counts.sum())
+    if total == 0:
+        return indices[:0], counts
+
+    shifts = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return indices[shifts + np.arange(total)], counts
+
+
+_SHARED = {}
+
+
+def _install_shared(shared: Dict[str, Any]):
+    # seulement dans les processus de travail : un processus exécute ses tâches l'une après l'autre
+    _SHARED.clear()
+    _SHARED.update(shared)
+
+    # réseau chargé depuis un fichier : chaque processus projette le même fichier en mémoire
+    path = shared.get("network_path")
+    if path is not None and "offsets" not in shared:
+        _, arrays = _map_network_file(path)
+        _SHARED["offsets"] = arrays["offsets"]
+        _SHARED["indices"] = arrays["indices"]
+
+
+def _run_shared(func: Callable, task: Any) -> Any:
+    return func(_SHARED, task)
+
+
+def _resolve_workers(workers: Optional[int], n_tasks: int) -> int:
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, n_tasks))
+
+
+def _parallel_map(func: Callable, tasks: Iterable[Any], shared: Dict[str, Any], workers: int = None) -> Iterator[Any]:
+    if isinstance(tasks, list):
+        workers = _resolve_workers(workers, len(tasks))
+    else:
+        workers = _resolve_workers(workers, workers or os.cpu_count() or 1)
+
+    # les tâches reçoivent les tableaux en argument : un appel direct ne touche à aucun état global,
+    # ce qui laisse plusieurs threads appeler _parallel_map en même temps
+    if workers == 1:
+        local = dict(shared)
+        for task in tasks:
+            yield func(local, task)
+        return
+
+    if "network_path" in shared:
+        shared = {key: value for key, value in shared.items() if key not in ("offsets", "indices")}
+
+    # les tableaux partagés sont transmis une seule fois par processus, via l'initialiseur ;
+    # les tâches sont soumises au fil de l'eau pour pouvoir s'arrêter sur un budget
+    with ProcessPoolExecutor(max_workers=workers, initializer=_install_shared, initargs=(shared,)) as pool:
+        pending = deque()
+        try:
+            for task in tasks:
+                pending.append(pool.submit(_run_shared, func, task))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).astype(np.int64)
+    return np.unpackbits(words.astype("<u8").view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def _unpack_words(words: np.ndarray) -> np.ndarray:
+    return np.unpackbits(words.astype("<u8").view(np.uint8), bitorder="little").reshape(-1, 64)
+
+
+def _biased_words(rng: np.random.Generator, size: int, probability: float) -> np.ndarray:
+    # chaque bit vaut 1 avec la probabilité donnée (quantifiée sur 16 bits)
+    bits = int(round(probability * 65536))
+    if bits <= 0:
+        return np.zeros(size, dtype=np.uint64)
+    if bits >= 65536:
+        return np.full(size, np.iinfo(np.uint64).max, dtype=np.uint64)
+
+    low = (bits & -bits).bit_length() - 1
+    words = np.zeros(size, dtype=np.uint64)
+    for i in range(low, 16):
+        raw = rng.bit_generator.random_raw(size)
+        if (bits >> i) & 1:
+            words |= raw
+        else:
+            words &= raw
+    return words
+
+
+def _simulate_cascades(offsets: np.ndarray, indices: np.ndarray, start_nodes: np.ndarray, start_cols: np.ndarray,
+                       probability: float, max_steps: int,
+                       rng: np.random.Generator) -> List[Tuple[int, np.ndarray, np.ndarray]]:
+    # jusqu'à 64 cascades avancent ensemble : le bit c du mot d'une personne correspond à la cascade c
+    n = len(offsets) - 1
+    infected = np.zeros(n, dtype=np.uint64)
+    np.bitwise_or.at(infected, start_nodes, np.left_shift(np.uint64(1), start_cols.astype(np.uint64)))
+
+    frontier = np.flatnonzero(infected)
+    frontier_words = infected[frontier]
+    events = [(0, frontier, frontier_words)]
+
+    for step in range(1, max_steps + 1):
+        reached, counts = _csr_gather(offsets, indices, frontier)
+        words = np.repeat(frontier_words, counts) & ~infected[reached]
+        active = words != 0
+        reached, words = reached[active], words[active]
+
+        words &= _biased_words(rng, len(words), probability)
+        active = words != 0
+        if not active.any():
+            break
+
+        received = np.zeros(n, dtype=np.uint64)
+        np.bitwise_or.at(received, reached[active], words[active])
+        frontier = np.flatnonzero(received)
+        frontier_words = received[frontier]
+
+        infected[frontier] |= frontier_words
+        events.append((step, frontier, frontier_words))
+
+    return events
+
+
+def _rumor_batch_task(shared: Dict[str, Any], task: Tuple[np.random.SeedSequence, int, np.ndarray, float, int]) -> Tuple[
+        np.ndarray, np.ndarray, np.ndarray]:
+    seed_seq, n_cascades, origins, probability, max_steps = task
+    offsets, indices = shared["offsets"], shared["indices"]
+    n = len(offsets) - 1
+
+    start_nodes = np.tile(origins, n_cascades)
+    start_cols = np.repeat(np.arange(n_cascades), len(origins))
+    events = _simulate_cascades(offsets, indices, start_nodes, start_cols, probability, max_steps,
+                                np.random.default_rng(seed_seq))
+
+    infections = np.zeros(n, dtype=np.int64)
+    time_sums = np.zeros(n, dtype=np.float64)
+    sizes = np.zeros(64, dtype=np.int64)
+    for step, nodes, words in events:
+        counts = _popcount(words)
+        infections[nodes] += counts
+        time_sums[nodes] += step * counts
+        sizes += _unpack_words(words).sum(axis=0, dtype=np.int64)
+
+    return infections, time_sums, sizes[:n_cascades]
+
+
+@dataclass
+class RumorEstimate:
+    origins: List[int]
+    probability: float
+    max_steps: int
+    n_simulations: int
+    node_ids: np.ndarray
+    infection_probability: np.ndarray
+    expected_time: np.ndarray
+    coverage: np.ndarray
+    confidence: float
+    coverage_mean: float
+    coverage_ci: Tuple[float, float]
+    coverage_interval: Tuple[float, float]
+
+    def probability_of(self, user_id: int) -> float:
+        found = np.flatnonzero(self.node_ids == user_id)
+        return float(self.infection_probability[found[0]]) if len(found) else 0.0
+
+    def top_users(self, k: int = 10) -> List[Tuple[int, float]]:
+        order = np.argsort(-self.infection_probability, kind="stable")[:k]
+        return list(zip(self.node_ids[order].tolist(), self.infection_probability[order].tolist()))
+
+
+def _reverse_reachable_task(shared: Dict[str, Any], task: Tuple[np.random.SeedSequence, int, float, int]) -> Tuple[
+        np.ndarray, np.ndarray, int]:
+    seed_seq, n_sets, probability, max_steps = task
+    offsets, indices = shared["offsets"], shared["indices"]
+    rng = np.random.default_rng(seed_seq)
+
+    # graphe non orienté et probabilité uniforme : l'ensemble atteignable à rebours depuis une cible
+    # a la même loi qu'une cascade directe partie de cette cible
+    targets = rng.integers(0, len(offsets) - 1, size=n_sets)
+    events = _simulate_cascades(offsets, indices, targets, np.arange(n_sets), probability, max_steps, rng)
+
+    nodes = np.concatenate([e[1] for e in events])
+    bits = _unpack_words(np.concatenate([e[2] for e in events]))[:, :n_sets]
+    member_rows, member_sets = np.nonzero(bits)
+    return nodes[member_rows], member_sets, n_sets
+
+
+def _neighbor_words(offsets: np.ndarray, indices: np.ndarray, linked: np.ndarray, words: np.ndarray,
+                    active: np.ndarray) -> np.ndarray:
+    # OU des mots des voisins : lecture de toutes les lignes si la vague est dense, sinon diffusion depuis active
+    reached = np.zeros(len(offsets) - 1, dtype=np.uint64)
+    if 4 * int((offsets[active + 1] - offsets[active]).sum()) > len(indices):
+        # reduceat n'accepte pas de segment vide : seules les lignes avec des voisins sont réduites
+        reached[linked] = np.bitwise_or.reduceat(words[indices], offsets[linked])
+    else:
+        neighbors, counts = _csr_gather(offsets, indices, active)
+        np.bitwise_or.at(reached, neighbors, np.repeat(words[active], counts))
+    return reached
+
+
+def _multi_source_bfs(offsets: np.ndarray, indices: np.ndarray, sources: np.ndarray, keep_distances: bool = False,
+                      levels: List[Tuple[np.ndarray, np.ndarray]] = None) -> Tuple[
+        np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    # BFS bit-parallèle : le bit c du mot d'une personne indique qu'elle est atteinte depuis la source c
+    # levels, s'il est fourni, reçoit pour chaque niveau les personnes atteintes et leurs mots
+    n = len(offsets) - 1
+    k = len(sources)
+    linked = np.flatnonzero(np.diff(offsets))
+    visited = np.zeros(n, dtype=np.uint64)
+    np.bitwise_or.at(visited, sources, np.left_shift(np.uint64(1), np.arange(k, dtype=np.uint64)))
+    frontier = visited.copy()
+    if levels is not None:
+        start = np.flatnonzero(visited)
+        levels.append((start, visited[start]))
+
+    eccentricity = np.zeros(k, dtype=np.int64)
+    farthest = np.asarray(sources, dtype=np.int64).copy()
+    distances = None
+    if keep_distances:
+        distances = np.full((n, k), np.iinfo(np.uint16).max, dtype=np.uint16)
+        distances[sources, np.arange(k)] = 0
+
+    level = 0
+    while True:
+        active = np.flatnonzero(frontier)
+        if len(active) == 0:
+            break
+
+        reached = _neighbor_words(offsets, indices, linked, frontier, active)
+        reached &= ~visited
+
+        nodes = np.flatnonzero(reached)
+        if len(nodes) == 0:
+            break
+
+        level += 1
+        visited[nodes] |= reached[nodes]
+        if levels is not None:
+            levels.append((nodes, reached[nodes]))
+        bits = _unpack_words(reached[nodes])[:, :k].astype(bool)
+        present = bits.any(axis=0)
+        eccentricity[present] = level
+        farthest[present] = nodes[bits.argmax(axis=0)[present]]
+        if keep_distances:
+            distances[nodes] = np.where(bits, level, distances[nodes])
+        frontier = reached
+
+    return eccentricity, farthest, distances
+
+
+def _first_discovered(offsets: np.ndarray, indices: np.ndarray, sources: np.ndarray,
+                      levels: List[Tuple[np.ndarray, np.ndarray]], eccentricity: np.ndarray) -> np.ndarray:
+    # personne la plus lointaine découverte la première par un BFS séquentiel (ordre de networkx).
+    # La première découverte d'un ensemble S du niveau l est, dans la ligne de la première découverte
+    # de ses voisins au niveau l - 1, le premier membre de S : on remonte les ensembles, puis on redescend.
+    k = len(sources)
+    linked = np.flatnonzero(np.diff(offsets))
+    bit = np.left_shift(np.uint64(1), np.arange(k, dtype=np.uint64))
+    chosen = [None] * len(levels)
+    carry = np.zeros(len(offsets) - 1, dtype=np.uint64)
+    for level in range(len(levels) - 1, -1, -1):
+        nodes, words = levels[level]
+        ending = np.bitwise_or.reduce(bit[eccentricity == level], initial=np.uint64(0))
+        chosen[level] = (carry[nodes] | ending) & words
+        if level == 0:
+            break
+        words = np.zeros(len(carry), dtype=np.uint64)
+        words[nodes] = chosen[level]
+        carry = _neighbor_words(offsets, indices, linked, words, nodes[chosen[level] != 0])
+
+    farthest = np.asarray(sources, dtype=np.int64).copy()
+    for c in np.flatnonzero(eccentricity > 0).tolist():
+        user = farthest[c]
+        for level in range(1, int(eccentricity[c]) + 1):
+            nodes, words = levels[level]
+            row = indices[offsets[user]:offsets[user + 1]]
+            pos = np.minimum(np.searchsorted(nodes, row), len(nodes) - 1)
+            member = (nodes[pos] == row) & (chosen[level][pos] & bit[c] != 0)
+            user = int(row[np.argmax(member)])
+        farthest[c] = user
+    return farthest
+
+
+def _eccentricity_task(shared: Dict[str, Any], sources: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    levels = []
+    eccentricity, _, _ = _multi_source_bfs(shared["offsets"], shared["indices"], sources, levels=levels)
+    return eccentricity, _first_discovered(shared["offsets"], shared["indices"], sources, levels, eccentricity)
+
+
+# lignes de la matrice des distances traitées à la fois : quelques Mo de temporaires quelle que soit la taille du graphe
+ECCENTRICITY_BLOCK_ROWS = 16384
+
+
+def _eccentricity_bounds_task(shared: Dict[str, Any], sources: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    eccentricity, farthest, distances = _multi_source_bfs(shared["offsets"], shared["indices"], sources, True)
+    never = np.iinfo(np.uint16).max
+    # excentricité + distance tient sur un int32 (deux valeurs uint16)
+    ecc = eccentricity.astype(np.int32)
+    n = len(distances)
+    lower = np.empty(n, dtype=np.int64)
+    upper = np.empty(n, dtype=np.int64)
+
+    for start in range(0, n, ECCENTRICITY_BLOCK_ROWS):
+        block = distances[start:start + ECCENTRICITY_BLOCK_ROWS]
+        unreachable = block == never
+        d = block.astype(np.int32)
+        lower[start:start + len(block)] = np.where(unreachable, 0, np.maximum(d, ecc - d)).max(axis=1)
+        bound = np.where(unreachable, np.iinfo(np.int32).max, ecc + d).min(axis=1).astype(np.int64)
+        bound[bound == np.iinfo(np.int32).max] = np.iinfo(np.int64).max
+        upper[start:start + len(block)] = bound
+    return eccentricity, farthest, lower, upper
+
+
+def _degeneracy_order(offsets: np.ndarray, indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # épluchage par vagues : chaque vague retire les sommets de degré <= k, k étant le cœur courant
+    n = len(offsets) - 1
+    degrees = np.diff(offsets).astype(np.int64)
+    removed = np.zeros(n, dtype=bool)
+    core = np.zeros(n, dtype=np.int64)
+    order = []
+    k = 0
+    candidates = np.flatnonzero(degrees <= k)
+
+    while True:
+        batch = np.unique(candidates[~removed[candidates] & (degrees[candidates] <= k)])
+        if len(batch) == 0:
+            rest = np.flatnonzero(~removed)
+            if len(rest) == 0:
+                break
+            k = max(k, int(degrees[rest].min()))
+            candidates = rest[degrees[rest] <= k]
+            continue
+
+        removed[batch] = True
+        core[batch] = k
+        order.append(batch)
+        neighbors, _ = _csr_gather(offsets, indices, batch)
+        neighbors = neighbors[~removed[neighbors]]
+        np.subtract.at(degrees, neighbors, 1)
+        candidates = neighbors[degrees[neighbors] <= k]
+
+    order = np.concatenate(order) if order else np.empty(0, dtype=np.int64)
+    return order, core
+
+
+def _clique_adjacency(shared: Dict[str, Any], v: int) -> Set[int]:
+    cache = shared["adjacency_sets"]
+    neighbors = cache.get(v)
+    if neighbors is None:
+        offsets, indices, allowed = shared["offsets"], shared["indices"], shared["allowed"]
+        row = indices[offsets[v]:offsets[v + 1]]
+        neighbors = set(row[allowed[row]].tolist())
+        neighbors.discard(v)
+        cache[v] = neighbors
+    return neighbors
+
+
+def _root_subproblem(shared: Dict[str, Any], root: int) -> Tuple[Set[int], Set[int]]:
+    rank = shared["rank"]
+    later, earlier = set(), set()
+    for u in _clique_adjacency(shared, root):
+        (later if rank[u] > rank[root] else earlier).add(u)
+    return later, earlier
+
+
+def _expand_cliques(shared: Dict[str, Any], R: List[int], P: Set[int], X: Set[int], max_size: Optional[int], min_size: int,
+                    found: List[List[int]]):
+    if not P:
+        if not X and len(R) >= min_size:
+            found.append(list(R))
+        return
+    # toute clique maximale de cette branche dépasserait max_size, ou ne peut plus atteindre min_size
+    if (max_size is not None and len(R) >= max_size) or len(R) + len(P) < min_size:
+        return
+
+    pivot = max(chain(P, X), key=lambda u: len(P & _clique_adjacency(shared, u)))
+    for v in list(P - _clique_adjacency(shared, pivot)):
+        neighbors = _clique_adjacency(shared, v)
+        R.append(v)
+        _expand_cliques(shared, R, P & neighbors, X & neighbors, max_size, min_size, found)
+        R.pop()
+        P.remove(v)
+        X.add(v)
+
+
+def _expand_largest(shared: Dict[str, Any], R: List[int], P: Set[int], X: Set[int], max_size: Optional[int], k: int,
+                    best: List[Tuple[int, List[int]]]):
+    if len(best) == k and len(R) + len(P) <= best[0][0]:
+        return
+    if not P:
+        if not X:
+            entry = (len(R), list(R))
+            if len(best) < k:
+                heapq.heappush(best, entry)
+            else:
+                heapq.heappushpop(best, entry)
+        return
+    if max_size is not None and len(R) >= max_size:
+        return
+
+    pivot = max(chain(P, X), key=lambda u: len(P & _clique_adjacency(shared, u)))
+    for v in list(P - _clique_adjacency(shared, pivot)):
+        neighbors = _clique_adjacency(shared, v)
+        R.append(v)
+        _expand_largest(shared, R, P & neighbors, X & neighbors, max_size, k, best)
+        R.pop()
+        P.remove(v)
+        X.add(v)
+
+
+def _clique_task(shared: Dict[str, Any], task: Tuple[np.ndarray, Optional[int], int]) -> List[List[int]]:
+    roots, max_size, min_size = task
+    shared.setdefault("adjacency_sets", {})
+    found = []
+    for root in roots.tolist():
+        later, earlier = _root_subproblem(shared, root)
+        _expand_cliques(shared, [root], later, earlier, max_size, min_size, found)
+    return found
+
+
+def _largest_clique_task(shared: Dict[str, Any], task: Tuple[np.ndarray, Optional[int], int, int]) -> List[Tuple[int, List[int]]]:
+    roots, max_size, k, bound = task
+    shared.setdefault("adjacency_sets", {})
+    later_counts = shared["later_counts"]
+    # cliques de taille bound déjà connues : on ne cherche que strictement plus grand
+    best = [(bound, [])] * k if bound > 0 else []
+    for root in roots.tolist():
+        if len(best) == k and later_counts[root] + 1 <= best[0][0]:
+            continue
+        later, earlier = _root_subproblem(shared, root)
+        _expand_largest(shared, [root], later, earlier, max_size, k, best)
+    return [entry for entry in best if entry[1]]
+
+
+@dataclass
+class GraphExtent:
+    diameter_lower: int
+    diameter_upper: int
+    radius_lower: int
+    radius_upper: int
+    center: int
+    periphery: int
+    component_size: int
+    bfs_runs: int
+    exact: bool
+
+    @property
+    def diameter(self) -> int:
+        return self.diameter_lower
+
+    @property
+    def radius(self) -> int:
+        return self.radius_upper
+
+
+@dataclass
+class SeedSelection:
+    seeds: List[int]
+    marginal_spread: List[float]
+    cumulative_spread: List[float]
+    expected_spread: float
+    probability: float
+    max_steps: int
+    n_samples: int
+    elapsed: float
+    budget_reached: bool
+
+
+class CSRGraph:
+    def __init__(self, offsets: np.ndarray, indices: np.ndarray, node_ids: np.ndarray, group_ids: np.ndarray,
+                 m: int = None, labels: np.ndarray = None):
+        self.offsets = offsets
+        self.indices = indices
+        self.node_ids = node_ids
+        self.group_ids = group_ids
+        # identifiants d'origine (octets UTF-8, triés) quand le réseau a été importé avec des ids texte
+        self.labels = labels
+        self.n = len(node_ids)
+        self.source_path = None
+
+        self._identity = self.n == 0 or bool(node_ids[0] == 0 and node_ids[-1] == self.n - 1
+                                             and np.all(np.diff(node_ids) == 1))
+        self._sorter = None if self._identity else np.argsort(node_ids, kind="stable")
+
+        if m is None:
+            rows = np.repeat(np.arange(self.n, dtype=np.int32), self.degrees())
+            m = (len(indices) + int(np.count_nonzero(rows == indices))) // 2
+        self.m = m
+
+    @classmethod
+    def from_networkx(cls, G: nx.Graph, groups: List[List[int]]) -> "CSRGraph":
+        n = G.number_of_nodes()
+        node_ids = np.fromiter(G.nodes(), dtype=np.int64, count=n)
+        degrees = np.fromiter((len(nbrs) for nbrs in G.adj.values()), dtype=np.int64, count=n)
+
+        offsets = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum(degrees, out=offsets[1:])
+        total = int(offsets[-1])
+
+        neighbors = chain.from_iterable(G.adj.values())
+        if n == 0 or (node_ids[0] == 0 and node_ids[-1] == n - 1 and np.all(np.diff(node_ids) == 1)):
+            indices = np.fromiter(neighbors, dtype=np.int32, count=total)
+        else:
+            index = {node: i for i, node in enumerate(G.nodes())}
+            indices = np.fromiter((index[v] for v in neighbors), dtype=np.int32, count=total)
+
+        graph = cls(offsets, indices, node_ids, np.full(n, -1, dtype=np.int32))
+        for group_idx in range(len(groups) - 1, -1, -1):
+            members = graph.indices_of(np.asarray(groups[group_idx], dtype=np.int64))
+            graph.group_ids[members[members >= 0]] = group_idx
+
+        return graph
+
+    @classmethod
+    def from_edges(cls, n: int, src: np.ndarray, dst: np.ndarray, group_ids: np.ndarray = None) -> "CSRGraph":
+        rows = np.column_stack((src, dst)).ravel()
+        cols = np.column_stack((dst, src)).ravel()
+        order = np.argsort(rows, kind="stable")
+
+        offsets = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum(np.bincount(rows, minlength=n), out=offsets[1:])
+        indices = cols[order].astype(np.int32)
+
+        if group_ids is None:
+            group_ids = np.full(n, -1, dtype=np.int32)
+        return cls(offsets, indices, np.arange(n, dtype=np.int64), group_ids.astype(np.int32))
+
+    def with_edge_changes(self, added: np.ndarray, removed: np.ndarray) -> "CSRGraph":
+        # toujours une nouvelle structure : les lecteurs de l'ancienne ne voient jamais de modification
+        # ordre des voisins de networkx : les liens retirés disparaissent, les liens ajoutés vont en fin de ligne
+        rows = np.repeat(np.arange(self.n, dtype=np.int64), self.degrees())
+        cols = self.indices.astype(np.int64)
+        if len(removed):
+            removed = np.asarray(removed, dtype=np.int64)
+            keys = np.concatenate((removed[:, 0] * self.n + removed[:, 1], removed[:, 1] * self.n + removed[:, 0]))
+            keep = ~np.isin(rows * self.n + cols, keys)
+            rows, cols = rows[keep], cols[keep]
+        if len(added):
+            added = np.asarray(added, dtype=np.int64)
+            # une boucle n'occupe qu'une place dans sa ligne
+            single = np.column_stack((np.ones(len(added), dtype=bool), added[:, 0] != added[:, 1])).ravel()
+            rows = np.concatenate((rows, np.column_stack((added[:, 0], added[:, 1])).ravel()[single]))
+            cols = np.concatenate((cols, np.column_stack((added[:, 1], added[:, 0])).ravel()[single]))
+            order = np.argsort(rows, kind="stable")
+            rows, cols = rows[order], cols[order]
+
+        offsets = np.zeros(self.n + 1, dtype=np.int32)
+        np.cumsum(np.bincount(rows, minlength=self.n), out=offsets[1:])
+        return CSRGraph(offsets, cols.astype(np.int32), self.node_ids, self.group_ids, labels=self.labels)
+
+    def has_edge(self, a: int, b: int) -> bool:
+        return bool(np.any(self.neighbors(a) == b))
+
+    def index_of(self, node: int) -> int:
+        if self._identity:
+            return int(node) if isinstance(node, (int, np.integer)) and 0 <= node < self.n else -1
+
+        pos = np.searchsorted(self.node_ids, node, sorter=self._sorter)
+        if pos < self.n and self.node_ids[self._sorter[pos]] == node:
+            return int(self._sorter[pos])
+        return -1
+
+    def indices_of(self, nodes: np.ndarray) -> np.ndarray:
+        nodes = np.asarray(nodes, dtype=np.int64)
+        if self._identity:
+            return np.where((nodes >= 0) & (nodes < self.n), nodes, -1)
+        if self.n == 0:
+            return np.full(len(nodes), -1, dtype=np.int64)
+
+        pos = np.minimum(np.searchsorted(self.node_ids, nodes, sorter=self._sorter), self.n - 1)
+        found = self._sorter[pos]
+        return np.where(self.node_ids[found] == nodes, found, -1)
+
+    def neighbors(self, idx: int) -> np.ndarray:
+        return self.indices[self.offsets[idx]:self.offsets[idx + 1]]
+
+    def degrees(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def friend_order(self, idx: int) -> np.ndarray:
+        # ordre d'itération de set(G.neighbors(user)), utilisé pour départager les égalités
+        return self.indices_of(list(set(self.node_ids[self.neighbors(idx)].tolist())))
+
+    def edges(self) -> Tuple[np.ndarray, np.ndarray]:
+        rows = np.repeat(np.arange(self.n, dtype=np.int32), self.degrees())
+        upper = rows <= self.indices
+        return rows[upper], self.indices[upper]
+
+    def group_edge_counts(self, nb_groups: int, src: np.ndarray = None, dst: np.ndarray = None) -> np.ndarray:
+        if src is None:
+            src, dst = self.edges()
+        group_src, group_dst = self.group_ids[src], self.group_ids[dst]
+        known = (group_src >= 0) & (group_dst >= 0)
+        pair_counts = np.bincount(group_src[known].astype(np.int64) * nb_groups + group_dst[known],
+                                  minlength=nb_groups * nb_groups).reshape(nb_groups, nb_groups)
+        return pair_counts + pair_counts.T - np.diag(np.diag(pair_counts))
+
+    def shared_arrays(self) -> Dict[str, Any]:
+        shared = {"offsets": self.offsets, "indices": self.indices}
+        if self.source_path is not None:
+            shared["network_path"] = self.source_path
+        return shared
+
+    def to_networkx(self) -> nx.Graph:
+        G = nx.Graph()
+        G.add_nodes_from(self.node_ids.tolist())
+        rows = np.repeat(np.arange(self.n), self.degrees())
+        upper = rows <= self.indices
+        G.add_edges_from(zip(self.node_ids[rows[upper]].tolist(), self.node_ids[self.indices[upper]].tolist()))
+        return G
+
+    def groups_from_ids(self) -> List[List[int]]:
+        known = np.flatnonzero(self.group_ids >= 0)
+        order = known[np.argsort(self.group_ids[known], kind="stable")]
+        sizes = np.bincount(self.group_ids[known], minlength=int(self.group_ids.max(initial=-1)) + 1)
+        return [members.tolist() for members in np.split(self.node_ids[order], np.cumsum(sizes)[:-1])]
+
+    def to_scipy(self) -> "sparse.csr_matrix":
+        from scipy import sparse
+
+        if getattr(self, "_adjacency", None) is None:
+            data = np.ones(len(self.indices), dtype=np.int32)
+            self._adjacency = sparse.csr_matrix((data, self.indices, self.offsets), shape=(self.n, self.n))
+        return self._adjacency
+
+
+class ResultCache:
+    def __init__(self, max_size: int = 1024, ttl: float = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._by_owner = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+
+        expires_at, owner, value = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            self._remove(key)
+            self.evictions += 1
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def put(self, key: Hashable, value: Any, owner: Hashable = None):
+        if self.max_size <= 0:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[key] = (expires_at, owner, value)
+        if owner is not None:
+            self._by_owner.setdefault(owner, set()).add(key)
+
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate_owners(self, owners: Iterable[Hashable]):
+        for owner in owners:
+            for key in self._by_owner.pop(owner, ()):
+                if key in self._entries:
+                    del self._entries[key]
+                    self.invalidations += 1
+
+    def clear(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._by_owner.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key: Hashable):
+        _, owner, _ = self._entries.pop(key)
+        if owner is not None:
+            keys = self._by_owner.get(owner)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_owner[owner]
+
+
+@instrumented()
+def _rank_recommendation_chunk(csr: CSRGraph, rows: np.ndarray, max_recommendations: int) -> List[
+    List[Tuple[int, int]]]:
+    from scipy import sparse
+
+    if len(rows) == 0:
+        return []
+
+    A = csr.to_scipy()
+    AR = A[rows]
+    own = sparse.csr_matrix((np.ones(len(rows), dtype=np.int32), (np.arange(len(rows)), rows)), shape=AR.shape)
+    counts = (AR @ A).tocsr()
+    counts = counts - counts.multiply(AR) - counts.multiply(own)
+    counts.eliminate_zeros()
+    counts.sort_indices()
+    if METRICS.enabled:
+        METRICS.count("edges_scanned", AR.nnz + int(csr.degrees()[AR.indices].sum()))
+        METRICS.count("candidates_scored", counts.nnz)
+
+    # rang de première rencontre de chaque candidat, dans l'ordre de parcours de get_friend_recommendations
+    friend_lists = [csr.friend_order(row) for row in rows.tolist()]
+    friend_counts = np.array([len(friends) for friends in friend_lists], dtype=np.int64)
+    friends = np.concatenate(friend_lists) if friend_lists else np.empty(0, dtype=np.int64)
+    candidates, reach = _csr_gather(csr.offsets, csr.indices, friends)
+    local_rows = np.repeat(np.repeat(np.arange(len(rows)), friend_counts), reach)
+
+    keys = local_rows * csr.n + candidates
+    friend_keys = np.repeat(np.arange(len(rows)), friend_counts) * csr.n + friends
+    keep = (candidates != rows[local_rows]) & ~np.isin(keys, friend_keys)
+    keys = keys[keep]
+    order = np.argsort(keys, kind="stable")
+    _, first = np.unique(keys[order], return_index=True)
+    first_seen = np.flatnonzero(keep)[order[first]]
+
+    ranked = []
+    for r in range(len(rows)):
+        lo, hi = counts.indptr[r], counts.indptr[r + 1]
+        row_counts = counts.data[lo:hi]
+        row_first = first_seen[lo:hi]
+        if max_recommendations <= 0 or hi == lo:
+            ranked.append([])
+            continue
+
+        if hi - lo > max_recommendations:
+            threshold = row_counts[np.argpartition(-row_counts, max_recommendations - 1)[max_recommendations - 1]]
+            selected = np.flatnonzero(row_counts >= threshold)
+        else:
+            selected = np.arange(hi - lo)
+
+        selected = selected[np.lexsort((row_first[selected], -row_counts[selected]))][:max_recommendations]
+        users = csr.node_ids[counts.indices[lo:hi][selected]]
+        ranked.append(list(zip(users.tolist(), row_counts[selected].tolist())))
+
+    return ranked
+
+
+@dataclass
+class GraphReport:
+    n_nodes: int
+    n_edges: int
+    is_connected: bool
+    density: float
+    avg_degree: float
+    max_degree_user: Tuple[int, int]
+    min_degree_user: Tuple[int, int]
+    top_connected: List[Tuple[int, int]]
+    groups: List[List[int]]
+    group_names: List[str]
+    internal_edges: np.ndarray
+    inter_group_edges: np.ndarray
+    bridges: Optional[List[Tuple[int, float]]] = None  # centralité d'intermédiarité estimée, si demandée
+    transitivity: Optional[float] = None  # les trois champs de regroupement sont remplis sur demande
+    average_clustering: Optional[float] = None
+    group_clustering: Optional[np.ndarray] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        report = {
+            "n_nodes": self.n_nodes,
+            "n_edges": self.n_edges,
+            "is_connected": self.is_connected,
+            "density": self.density,
+            "avg_degree": self.avg_degree,
+            "max_degree_user": list(self.max_degree_user),
+            "min_degree_user": list(self.min_degree_user),
+            "top_connected": [list(item) for item in self.top_connected],
+            "groups": [
+                {"name": name, "size": len(group), "internal_edges": int(internal)}
+                for name, group, internal in zip(self.group_names, self.groups, self.internal_edges)
+            ],
+            "inter_group_edges": self.inter_group_edges.tolist(),
+        }
+        if self.bridges is not None:
+            report["bridges"] = [list(item) for item in self.bridges]
+        if self.group_clustering is not None:
+            report["transitivity"] = self.transitivity
+            report["average_clustering"] = self.average_clustering
+            for group, clustering in zip(report["groups"], self.group_clustering.tolist()):
+                group["clustering"] = clustering
+        return report
+
+
+@instrumented()
+def build_graph_report(csr: CSRGraph, groups: List[List[int]], group_activities: Dict[int, str],
+                       top_k: int = 5) -> GraphReport:
+    from scipy.sparse.csgraph import connected_components
+
+    n = csr.n
+    nb_groups = len(groups)
+
+    # une seule passe sur la liste d'arêtes (u <= v) : degrés, matrice groupe x groupe
+    src, dst = csr.edges()
+    loops = src == dst
+    n_edges = len(src)
+    degrees = csr.degrees().astype(np.int64) + np.bincount(src[loops], minlength=n)
+    METRICS.count("edges_scanned", len(csr.indices))
+    inter_group_edges = csr.group_edge_counts(nb_groups, src, dst)
+
+    if n > 0:
+        max_idx, min_idx = int(np.argmax(degrees)), int(np.argmin(degrees))
+        max_degree_user = (int(csr.node_ids[max_idx]), int(degrees[max_idx]))
+        min_degree_user = (int(csr.node_ids[min_idx]), int(degrees[min_idx]))
+        avg_degree = float(degrees.sum()) / n
+    else:
+        max_degree_user = min_degree_user = (None, 0)
+        avg_degree = 0.0
+
+    if 0 < top_k < n:
+        threshold = degrees[np.argpartition(-degrees, top_k - 1)[top_k - 1]]
+        candidates = np.flatnonzero(degrees >= threshold)
+    else:
+        candidates = np.arange(n)
+    top = candidates[np.lexsort((candidates, -degrees[candidates]))][:max(top_k, 0)]
+
+    n_components = connected_components(csr.to_scipy(), directed=False, return_labels=False) if n else 0
+
+    return GraphReport(
+        n_nodes=n,
+        n_edges=n_edges,
+        is_connected=n_components == 1,
+        density=2 * n_edges / (n * (n - 1)) if n > 1 else 0.0,
+        avg_degree=avg_degree,
+        max_degree_user=max_degree_user,
+        min_degree_user=min_degree_user,
+        top_connected=list(zip(csr.node_ids[top].tolist(), degrees[top].tolist())),
+        groups=groups,
+        group_names=[group_activities.get(i, f"Groupe {i + 1}") for i in range(nb_groups)],
+        internal_edges=np.diag(inter_group_edges).copy(),
+        inter_group_edges=inter_group_edges,
+    )
+
+
+@dataclass
+class CentralityResult:
+    node_ids: np.ndarray
+    pagerank: np.ndarray
+    betweenness: np.ndarray  # normalisée comme nx.betweenness_centrality
+    betweenness_error: np.ndarray  # demi-largeur de l'intervalle de confiance de chaque utilisateur
+    betweenness_bound: float  # écart maximal garanti sur tous les utilisateurs à la fois (Hoeffding)
+    closeness: np.ndarray
+    n_samples: int
+    confidence: float
+    elapsed: float
+
+    def top(self, measure: str = "betweenness", k: int = 10) -> List[Tuple[int, float]]:
+        values = getattr(self, measure)
+        order = np.argsort(-values, kind="stable")[:k]
+        return list(zip(self.node_ids[order].tolist(), values[order].tolist()))
+
+
+def _shared_adjacency(shared: Dict[str, Any]) -> "sparse.csr_matrix":
+    from scipy import sparse
+
+    if "adjacency" not in shared:
+        offsets, indices = shared["offsets"], shared["indices"]
+        n = len(offsets) - 1
+        shared["adjacency"] = sparse.csr_matrix((np.ones(len(indices)), indices, offsets), shape=(n, n))
+    return shared["adjacency"]
+
+
+def _frontier_sums(A: "sparse.csr_matrix", rows: np.ndarray, values: np.ndarray) -> np.ndarray:
+    # somme des valeurs des voisins pris dans rows ; A est symétrique donc A[rows].T (CSC) suffit
+    return A[rows].T @ values
+
+
+def _betweenness_task(shared: Dict[str, Any], sources: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # Brandes algébrique : une colonne par source, tous les BFS d'un lot avancent niveau par niveau ensemble
+    A = _shared_adjacency(shared)
+    n, k = A.shape[0], len(sources)
+    dist = np.full((n, k), -1, dtype=np.int32)
+    sigma = np.zeros((n, k))
+    dist[sources, np.arange(k)] = 0
+    sigma[sources, np.arange(k)] = 1
+    levels = [np.unique(sources)]
+
+    while True:
+        depth = len(levels) - 1
+        rows = levels[-1]
+        paths = _frontier_sums(A, rows, np.where(dist[rows] == depth, sigma[rows], 0.0))
+        METRICS.count("edges_scanned", int(A.indptr[rows + 1].sum() - A.indptr[rows].sum()) * k)
+        new = (paths > 0) & (dist == -1)
+        touched = np.flatnonzero(new.any(axis=1))
+        if len(touched) == 0:
+            break
+        dist[new] = depth + 1
+        sigma[new] = paths[new]
+        levels.append(touched)
+
+    # remontée des dépendances, du niveau le plus profond vers les sources (qui n'en reçoivent pas)
+    delta = np.zeros((n, k))
+    for depth in range(len(levels) - 1, 1, -1):
+        rows = levels[depth]
+        at = dist[rows] == depth
+        weights = np.where(at, (1 + delta[rows]) / np.where(at, sigma[rows], 1), 0.0)
+        parents = levels[depth - 1]
+        sums = _frontier_sums(A, rows, weights)[parents]
+        delta[parents] += np.where(dist[parents] == depth - 1, sigma[parents] * sums, 0.0)
+
+    reached = dist > 0
+    return (delta.sum(axis=1), np.square(delta).sum(axis=1), np.where(reached, dist, 0).sum(axis=1),
+            reached.sum(axis=1))
+
+
+def pagerank(csr: CSRGraph, alpha: float = 0.85, tol: float = 1e-6, max_iterations: int = 100) -> np.ndarray:
+    n = csr.n
+    if n == 0:
+        return np.empty(0)
+    degrees = csr.degrees().astype(np.float64)
+    dangling = degrees == 0
+    inverse = np.divide(1.0, degrees, out=np.zeros(n), where=~dangling)
+    A = csr.to_scipy()
+
+    # itération de puissance creuse ; les personnes sans ami redistribuent leur score uniformément
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iterations):
+        previous = x
+        x = alpha * (A @ (x * inverse)) + (alpha * x[dangling].sum() + 1 - alpha) / n
+        if np.abs(x - previous).sum() < n * tol:
+            break
+    return x / x.sum()
+
+
+@instrumented()
+def compute_centrality(csr: CSRGraph, n_samples: int = 256, seed: int = None, workers: int = None,
+                       confidence: float = 0.95, alpha: float = 0.85) -> CentralityResult:
+    started = time.perf_counter()
+    n = csr.n
+    rng = np.random.default_rng(seed)
+    sources = rng.choice(n, min(n_samples, n), replace=False) if n else np.empty(0, dtype=np.int64)
+    k = len(sources)
+
+    # lots de sources bornés à ~256 Mo de tableaux (n x lot, ~48 octets par case avec les temporaires) par processus
+    batch = int(np.clip((1 << 28) // (48 * max(n, 1)), 1, 64))
+    tasks = [sources[start:start + batch] for start in range(0, k, batch)]
+    dependency, dependency_sq = np.zeros(n), np.zeros(n)
+    distance_sum, reach = np.zeros(n), np.zeros(n)
+    for parts in _parallel_map(_betweenness_task, tasks, csr.shared_arrays(), workers):
+        dependency += parts[0]
+        dependency_sq += parts[1]
+        distance_sum += parts[2]
+        reach += parts[3]
+    METRICS.count("bfs_sources", k)
+
+    # chaque source donne un estimateur sans biais de la centralité normalisée, borné par n / (n - 1)
+    scale = n / ((n - 1) * (n - 2)) if n > 2 else 0.0
+    betweenness = scale * dependency / max(k, 1)
+    variance = np.maximum(scale ** 2 * dependency_sq / max(k, 1) - betweenness ** 2, 0.0)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    error = z * np.sqrt(variance / max(k, 1) * (1 - k / n if n else 0))
+    bound = n / (n - 1) * np.sqrt(np.log(2 * n / (1 - confidence)) / (2 * k)) if k and n > 1 else float("inf")
+
+    # proximité à la networkx (composantes comprises), depuis les distances des mêmes sources
+    closeness = np.divide(reach * reach * n, k * (n - 1) * distance_sum, out=np.zeros(n), where=distance_sum > 0)
+
+    return CentralityResult(csr.node_ids, pagerank(csr, alpha), betweenness, error, float(bound), closeness, k,
+                            confidence, time.perf_counter() - started)
+
+
+LANDMARK_STRATEGIES = ["degree", "groups", "random"]
+LANDMARK_UNREACHED = np.iinfo(np.uint8).max
+
+
+def _bidirectional_bfs(offsets: np.ndarray, indices: np.ndarray, source: int, target: int,
+                       parents: Tuple[np.ndarray, np.ndarray], limit: int = None,
+                       with_path: bool = False) -> Tuple[int, Optional[List[int]]]:
+    # parents : deux tableaux à -1 réutilisés d'une requête à l'autre, remis à -1 avant de rendre la main
+    if source == target:
+        return 0, [source]
+
+    sides = [parents[0], parents[1]]
+    sides[0][source], sides[1][target] = source, target
+    frontiers = [np.array([source], dtype=np.int32), np.array([target], dtype=np.int32)]
+    touched = [[frontiers[0]], [frontiers[1]]]
+    costs = [int(offsets[source + 1] - offsets[source]), int(offsets[target + 1] - offsets[target])]
+    depths = [0, 0]
+    distance, meeting, scanned = -1, -1, 0
+    try:
+        while limit is None or depths[0] + depths[1] < limit:
+            # on avance le côté dont la frontière a le moins d'arêtes
+            side = 0 if costs[0] <= costs[1] else 1
+            own, other = sides[side], sides[1 - side]
+
+            reached, counts = _csr_gather(offsets, indices, frontiers[side])
+            scanned += len(reached)
+            origins = np.repeat(frontiers[side], counts)
+            fresh = own[reached] < 0
+            reached, origins = reached[fresh], origins[fresh]
+            if len(reached) == 0:
+                break
+
+            # n'importe quel parent convient : une seule écriture reste par personne, ce qui dédoublonne sans tri
+            own[reached] = origins
+            frontier = reached[own[reached] == origins]
+            costs[side] = int(offsets[frontier + 1].sum() - offsets[frontier].sum())
+            touched[side].append(frontier)
+            depths[side] += 1
+            frontiers[side] = frontier
+
+            met = np.flatnonzero(other[frontier] >= 0)
+            if len(met):
+                distance, meeting = depths[0] + depths[1], int(frontier[met[0]])
+                break
+
+        if distance < 0 and limit is not None and depths[0] + depths[1] >= limit:
+            return limit, None
+        if distance < 0 or not with_path:
+            return distance, None
+
+        path = [meeting]
+        while path[-1] != source:
+            path.append(int(sides[0][path[-1]]))
+        path.reverse()
+        while path[-1] != target:
+            path.append(int(sides[1][path[-1]]))
+        return distance, path
+    finally:
+        METRICS.count("edges_scanned", scanned)
+        for side in (0, 1):
+            sides[side][np.concatenate(touched[side])] = -1
+
+
+def _distance_task(shared: Dict[str, Any], task: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> np.ndarray:
+    if "parents" not in shared:
+        n = len(shared["offsets"]) - 1
+        shared["parents"] = (np.full(n, -1, dtype=np.int32), np.full(n, -1, dtype=np.int32))
+    sources, targets, limits = task
+    return np.array([_bidirectional_bfs(shared["offsets"], shared["indices"], source, target, shared["parents"],
+                                        None if limit < 0 else limit)[0]
+                     for source, target, limit in zip(sources.tolist(), targets.tolist(), limits.tolist())])
+
+
+def _landmark_task(shared: Dict[str, Any], sources: np.ndarray) -> np.ndarray:
+    _, _, distances = _multi_source_bfs(shared["offsets"], shared["indices"], sources, True)
+    # au-delà de 254 sauts (ou hors composante) la distance n'est plus connue : 255
+    return np.minimum(distances, LANDMARK_UNREACHED).astype(np.uint8)
+
+
+class LandmarkIndex:
+    def __init__(self, csr: CSRGraph, n_landmarks: int = 16, strategy: str = "degree", seed: int = 0,
+                 workers: int = None):
+        if strategy not in LANDMARK_STRATEGIES:
+            raise ValueError(f"stratégie de repères inconnue : {strategy}")
+        from scipy.sparse.csgraph import connected_components
+
+        started = time.perf_counter()
+        self.strategy = strategy
+        self.seed = seed
+        self.landmarks = self._choose(csr, min(n_landmarks, csr.n), strategy, seed)
+
+        # distances stockées par personne (n x repères) : une paire se lit en deux lignes contiguës
+        tasks = [self.landmarks[start:start + 64] for start in range(0, len(self.landmarks), 64)]
+        blocks = list(_parallel_map(_landmark_task, tasks, csr.shared_arrays(), workers))
+        self.distances = np.hstack(blocks) if blocks else np.empty((csr.n, 0), dtype=np.uint8)
+        # les composantes tranchent tout de suite les paires sans chemin
+        self.components = connected_components(csr.to_scipy(), directed=False)[1].astype(np.int32)
+        self.build_seconds = time.perf_counter() - started
+
+    @staticmethod
+    def _choose(csr: CSRGraph, count: int, strategy: str, seed: int) -> np.ndarray:
+        degrees = csr.degrees()
+        if strategy == "random":
+            return np.sort(np.random.default_rng(seed).choice(csr.n, count, replace=False))
+
+        order = np.argsort(-degrees, kind="stable")
+        if strategy == "groups":
+            # la personne la plus connectée de chaque groupe, puis la suivante, etc.
+            groups = csr.group_ids[order]
+            rank = np.zeros(csr.n, dtype=np.int64)
+            for group in np.unique(groups):
+                members = groups == group
+                rank[members] = np.arange(int(members.sum()))
+            order = order[np.lexsort((np.arange(csr.n), rank))]
+        return np.sort(order[:count])
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.distances.nbytes + self.landmarks.nbytes + self.components.nbytes
+
+    def bounds(self, sources: np.ndarray, targets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # inégalité triangulaire : |d(l, a) - d(l, b)| <= d(a, b) <= d(l, a) + d(l, b)
+        a = self.distances[sources].astype(np.int16)
+        b = self.distances[targets].astype(np.int16)
+        known_a, known_b = a != LANDMARK_UNREACHED, b != LANDMARK_UNREACHED
+        both = known_a & known_b
+        # une distance inconnue vaut au moins 255 (même composante), ce qui borne encore par le bas
+        lower = np.where(known_a | known_b, np.abs(a - b), 0).max(axis=1, initial=0).astype(np.float64)
+        upper = np.where(both, a + b, np.iinfo(np.int16).max).min(axis=1, initial=np.iinfo(np.int16).max)
+        upper = np.where(upper == np.iinfo(np.int16).max, np.inf, upper)
+
+        apart = self.components[sources] != self.components[targets]
+        lower[apart], upper[apart] = np.inf, np.inf
+        same = np.asarray(sources) == np.asarray(targets)
+        lower[same], upper[same] = 0.0, 0.0
+        return lower, upper
+
+
+class PathFinder:
+    def __init__(self, csr: CSRGraph, landmarks: LandmarkIndex = None):
+        self.csr = csr
+        self.landmarks = landmarks
+        self._local = threading.local()
+
+    def _parents(self) -> Tuple[np.ndarray, np.ndarray]:
+        parents = getattr(self._local, "parents", None)
+        if parents is None:
+            parents = self._local.parents = (np.full(self.csr.n, -1, dtype=np.int32),
+                                             np.full(self.csr.n, -1, dtype=np.int32))
+        return parents
+
+    def path(self, source: int, target: int) -> Optional[List[int]]:
+        _, path = _bidirectional_bfs(self.csr.offsets, self.csr.indices, source, target, self._parents(),
+                                     with_path=True)
+        return path
+
+    def distances(self, sources: np.ndarray, targets: np.ndarray, exact: bool = True, workers: int = 1,
+                  chunk_size: int = 256) -> Tuple[np.ndarray, np.ndarray]:
+        # rend (borne basse, borne haute) ; exactes (égales) quand exact=True, inf = aucun chemin
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if self.landmarks is not None:
+            lower, upper = self.landmarks.bounds(sources, targets)
+        else:
+            lower, upper = np.zeros(len(sources)), np.full(len(sources), np.inf)
+        if not exact:
+            return lower, upper
+
+        # le BFS s'arrête dès qu'il atteint la borne haute donnée par les repères (-1 : pas de borne)
+        pending = np.flatnonzero(lower < upper)
+        METRICS.count("cache_hits", len(sources) - len(pending))
+        limits = np.where(np.isinf(upper[pending]), -1, upper[pending]).astype(np.int64)
+        tasks = [(sources[pending[start:start + chunk_size]], targets[pending[start:start + chunk_size]],
+                  limits[start:start + chunk_size]) for start in range(0, len(pending), chunk_size)]
+        if _resolve_workers(workers, len(tasks)) > 1:
+            found = list(_parallel_map(_distance_task, tasks, self.csr.shared_arrays(), workers))
+        else:
+            parents = self._parents()
+            found = [[_bidirectional_bfs(self.csr.offsets, self.csr.indices, source, target, parents,
+                                         None if limit < 0 else limit)[0]
+                      for source, target, limit in zip(*(part.tolist() for part in task))] for task in tasks]
+
+        distances = np.concatenate(found).astype(np.float64) if found else np.empty(0)
+        distances[distances < 0] = np.inf
+        lower[pending] = upper[pending] = distances
+        return lower, upper
+
+
+@dataclass
+class ClusteringResult:
+    node_ids: np.ndarray
+    triangles: np.ndarray  # triangles auxquels participe chaque utilisateur
+    clustering: np.ndarray  # coefficient de regroupement local
+    group_clustering: np.ndarray  # moyenne du coefficient local par groupe
+    n_triangles: int
+    transitivity: float
+    average_clustering: float
+    elapsed: float
+
+
+def _forward_graph(csr: CSRGraph) -> "sparse.csr_matrix":
+    # chaque arête est orientée vers le sommet de plus haut rang (degré, puis indice) :
+    # aucun sommet n'a plus de sqrt(2m) successeurs, ce qui borne le travail des gros hubs
+    from scipy import sparse
+
+    degrees = csr.degrees().astype(np.int64)
+    rows = np.repeat(np.arange(csr.n, dtype=np.int32), degrees)
+    rank = np.empty(csr.n, dtype=np.int64)
+    rank[np.lexsort((np.arange(csr.n), degrees))] = np.arange(csr.n)
+    forward = rank[rows] < rank[csr.indices]
+    counts = np.bincount(rows[forward], minlength=csr.n)
+    offsets = np.zeros(csr.n + 1, dtype=np.int32)
+    np.cumsum(counts, out=offsets[1:])
+    indices = csr.indices[forward]
+    return sparse.csr_matrix((np.ones(len(indices), dtype=np.int32), indices, offsets), shape=(csr.n, csr.n))
+
+
+def _triangle_task(shared: Dict[str, Any], rows: Tuple[int, int]) -> np.ndarray:
+    from scipy import sparse
+
+    if "forward" not in shared:
+        n = len(shared["forward_offsets"]) - 1
+        forward = sparse.csr_matrix((np.ones(len(shared["forward_indices"]), dtype=np.int32),
+                                     shared["forward_indices"], shared["forward_offsets"]), shape=(n, n))
+        shared["forward"], shared["backward"] = forward, forward.T.tocsr()
+    forward, backward = shared["forward"], shared["backward"]
+    start, stop = rows
+    n = forward.shape[0]
+
+    # triangle a -> b -> c (rangs croissants) : produits masqués par les arêtes existantes,
+    # (F F) o F compte les b pour chaque arête a -> c et (F' F) o F les a pour chaque arête b -> c
+    closing = (forward[start:stop] @ forward).multiply(forward[start:stop]).tocsr()
+    middle = (backward[start:stop] @ forward).multiply(forward[start:stop]).tocsr()
+    METRICS.count("edges_scanned", int(closing.nnz + middle.nnz))
+
+    triangles = np.bincount(closing.indices, weights=closing.data, minlength=n)
+    triangles[start:stop] += np.asarray(closing.sum(axis=1)).ravel() + np.asarray(middle.sum(axis=1)).ravel()
+    return triangles
+
+
+def _group_average(values: np.ndarray, group_ids: np.ndarray, n_groups: int) -> np.ndarray:
+    # moyenne par groupe (membres sans triangle possible compris, comme nx.average_clustering)
+    members = group_ids >= 0
+    sizes = np.bincount(group_ids[members], minlength=n_groups)
+    sums = np.bincount(group_ids[members], weights=values[members], minlength=n_groups)
+    return np.divide(sums, sizes, out=np.zeros(len(sizes)), where=sizes > 0)
+
+
+@instrumented()
+def compute_clustering(csr: CSRGraph, workers: int = None, n_groups: int = None,
+                       chunk_wedges: int = 1 << 24) -> ClusteringResult:
+    started = time.perf_counter()
+    n = csr.n
+    forward = _forward_graph(csr)
+
+    # lots de lignes découpés sur le nombre de chemins a -> b -> c qu'ils vont énumérer
+    out_degrees = np.diff(forward.indptr).astype(np.int64)
+    wedges = forward @ out_degrees + forward.T @ out_degrees
+    bounds = np.searchsorted(np.cumsum(wedges), np.arange(chunk_wedges, int(wedges.sum()) + 1, chunk_wedges))
+    bounds = np.unique(np.concatenate(([0], bounds + 1, [n]))).clip(0, n)
+    tasks = [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+    shared = {"forward_offsets": forward.indptr, "forward_indices": forward.indices}
+    triangles = np.zeros(n)
+    for part in _parallel_map(_triangle_task, tasks, shared, workers):
+        triangles += part
+    triangles = triangles.astype(np.int64)
+
+    degrees = csr.degrees().astype(np.int64)
+    pairs = degrees * (degrees - 1)
+    clustering = np.divide(2 * triangles, pairs, out=np.zeros(n), where=pairs > 0)
+
+    if n_groups is None:
+        n_groups = int(csr.group_ids.max()) + 1 if n else 0
+    group_clustering = _group_average(clustering, csr.group_ids, n_groups)
+
+    return ClusteringResult(csr.node_ids, triangles, clustering, group_clustering, int(triangles.sum()) // 3,
+                            float(2 * triangles.sum() / pairs.sum()) if pairs.sum() else 0.0,
+                            float(clustering.mean()) if n else 0.0, time.perf_counter() - started)
+
+
+@dataclass
+class CommunityResult:
+    labels: np.ndarray  # communauté de chaque ligne du CSR, triées par taille décroissante ; -1 : aucune
+    method: str
+    modularity: float
+    n_communities: int
+    sizes: List[int]
+    iterations: int
+    elapsed: float
+
+
+def _modularity(A: "sparse.csr_matrix", labels: np.ndarray, resolution: float = 1.0) -> float:
+    strength = np.asarray(A.sum(axis=1)).ravel()
+    total = strength.sum()
+    if total == 0:
+        return 0.0
+    rows = np.repeat(np.arange(A.shape[0]), np.diff(A.indptr))
+    internal = A.data[labels[rows] == labels[A.indices]].sum()
+    community_strength = np.bincount(labels, weights=strength)
+    return float(internal / total - resolution * ((community_strength / total) ** 2).sum())
+
+
+def _indicator(labels: np.ndarray, n_labels: int) -> "sparse.csr_matrix":
+    from scipy import sparse
+
+    n = len(labels)
+    return sparse.csr_matrix((np.ones(n), labels, np.arange(n + 1)), shape=(n, n_labels))
+
+
+def _row_argmax(M: "sparse.csr_matrix", score: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # pour chaque ligne non vide : position (dans M.data) du premier score maximal
+    counts = np.diff(M.indptr)
+    rows = np.flatnonzero(counts)
+    best = np.maximum.reduceat(score, M.indptr[rows]) if len(rows) else np.empty(0)
+    row_of = np.repeat(np.arange(M.shape[0]), counts)
+    hits = np.flatnonzero(score == np.repeat(best, counts[rows]))
+    hit_rows = row_of[hits]
+    first = hits[np.r_[True, hit_rows[1:] != hit_rows[:-1]]] if len(hits) else hits
+    return row_of[first], first
+
+
+def _label_propagation(A: "sparse.csr_matrix", rng: np.random.Generator, max_iterations: int,
+                       batches: int = 4) -> Tuple[np.ndarray, int]:
+    n = A.shape[0]
+    labels = np.arange(n, dtype=np.int64)
+
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        changed = 0
+        # mises à jour par lots aléatoires : chaque lot voit les étiquettes déjà changées, ce qui évite les oscillations
+        color = rng.integers(0, batches, n)
+        for batch in range(batches):
+            nodes = np.flatnonzero(color == batch)
+            # nombre de voisins portant chaque étiquette, par produit creux ; égalités départagées au hasard
+            M = (A[nodes] @ _indicator(labels, n)).tocsr()
+            if M.nnz == 0:
+                continue
+            rows, first = _row_argmax(M, M.data + 0.5 * rng.random(M.nnz))
+
+            local = np.repeat(np.arange(len(nodes)), np.diff(M.indptr))
+            current = np.zeros(len(nodes))
+            own = M.indices == labels[nodes][local]
+            current[local[own]] = M.data[own]
+
+            better = M.data[first] > current[rows]
+            labels[nodes[rows[better]]] = M.indices[first[better]]
+            changed += int(np.count_nonzero(better))
+
+        if changed <= n * 1e-3:
+            break
+
+    return labels, iterations
+
+
+def _louvain_level(A: "sparse.csr_matrix", resolution: float, rng: np.random.Generator, batches: int,
+                   max_sweeps: int, tolerance: float = 1e-5) -> Tuple[np.ndarray, int]:
+    n = A.shape[0]
+    strength = np.asarray(A.sum(axis=1)).ravel()
+    total = strength.sum()
+    off = A.tocoo()
+    keep = off.row != off.col
+    off = type(A)((off.data[keep], (off.row[keep], off.col[keep])), shape=A.shape)
+
+    community = np.arange(n, dtype=np.int64)
+    community_strength = strength.copy()
+    community_size = np.ones(n, dtype=np.int64)
+    moves = 0
+
+    for _ in range(max_sweeps):
+        moved, improvement = 0, 0.0
+        # déplacements simultanés par lots aléatoires : proche du parcours séquentiel de Louvain, mais vectorisé
+        color = rng.integers(0, batches, n)
+        for batch in range(batches):
+            nodes = np.flatnonzero(color == batch)
+            W = (off[nodes] @ _indicator(community, n)).tocsr()
+            if W.nnz == 0:
+                continue
+            local = np.repeat(np.arange(len(nodes)), np.diff(W.indptr))
+            targets = W.indices
+
+            own = community[nodes]
+            is_own = targets == own[local]
+            weight_own = np.zeros(len(nodes))
+            weight_own[local[is_own]] = W.data[is_own]
+
+            k = strength[nodes][local]
+            own_strength = community_strength[own][local] - k
+            gain = (W.data - weight_own[local]) - resolution * k * (community_strength[targets] - own_strength) / total
+            # deux singletons ne s'échangent pas : seul celui d'étiquette la plus grande rejoint l'autre
+            singletons = (community_size[own][local] == 1) & (community_size[targets] == 1)
+            gain[is_own | (singletons & (targets > own[local]))] = -np.inf
+
+            rows, first = _row_argmax(W, gain)
+            chosen = gain[first] > 1e-12
+            rows, first = rows[chosen], first[chosen]
+            if len(rows) == 0:
+                continue
+
+            movers = nodes[rows]
+            sources, destinations = community[movers], targets[first]
+            community_strength += (np.bincount(destinations, strength[movers], minlength=n)
+                                   - np.bincount(sources, strength[movers], minlength=n))
+            community_size += np.bincount(destinations, minlength=n) - np.bincount(sources, minlength=n)
+            community[movers] = destinations
+            moved += len(movers)
+            improvement += float(gain[first].sum())
+
+        moves += moved
+        if moved == 0 or improvement / total < tolerance:
+            break
+
+    return community, moves
+
+
+def _louvain(A: "sparse.csr_matrix", resolution: float, rng: np.random.Generator, max_levels: int = 20,
+             batches: int = 8, max_sweeps: int = 10) -> Tuple[np.ndarray, int]:
+    from scipy import sparse
+
+    membership = np.arange(A.shape[0], dtype=np.int64)
+    levels = 0
+    for levels in range(1, max_levels + 1):
+        community, moves = _louvain_level(A, resolution, rng, batches, max_sweeps)
+        if moves == 0:
+            break
+
+        # agrégation : une communauté devient un nœud, les liens internes une boucle pondérée
+        _, community = np.unique(community, return_inverse=True)
+        membership = community[membership]
+        P = sparse.csr_matrix((np.ones(len(community)), (np.arange(len(community)), community)))
+        A = (P.T @ A @ P).tocsr()
+
+    return membership, levels
+
+
+def _split_disconnected(A: "sparse.csr_matrix", labels: np.ndarray) -> np.ndarray:
+    from scipy import sparse
+    from scipy.sparse.csgraph import connected_components
+
+    # garantie à la Leiden : chaque communauté est connexe (la scinder ne peut qu'augmenter la modularité)
+    rows = np.repeat(np.arange(A.shape[0]), np.diff(A.indptr))
+    inside = labels[rows] == labels[A.indices]
+    internal = sparse.csr_matrix((np.ones(np.count_nonzero(inside)), (rows[inside], A.indices[inside])),
+                                 shape=A.shape)
+    return connected_components(internal, directed=False)[1].astype(np.int64)
+
+
+@instrumented()
+def detect_communities(csr: CSRGraph, method: str = "louvain", resolution: float = 1.0, seed: int = None,
+                       max_iterations: int = 50, min_size: int = 1) -> CommunityResult:
+    if method not in ("louvain", "label_propagation"):
+        raise ValueError(f"méthode inconnue : {method}")
+
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    A = csr.to_scipy().astype(np.float64)
+
+    if method == "louvain":
+        labels, iterations = _louvain(A, resolution, rng, max_sweeps=min(max_iterations, 10))
+    else:
+        labels, iterations = _label_propagation(A, rng, max_iterations)
+    labels = _split_disconnected(A, labels)
+
+    # communautés numérotées par taille décroissante ; les trop petites restent sans groupe
+    sizes = np.bincount(labels)
+    order = np.argsort(-sizes, kind="stable")
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    labels = rank[labels]
+    sizes = sizes[order]
+    modularity = _modularity(A, labels, resolution)
+
+    kept = int(np.count_nonzero(sizes >= min_size))
+    labels = np.where(labels < kept, labels, -1).astype(np.int32)
+    METRICS.count("nodes_visited", csr.n * iterations)
+
+    return CommunityResult(labels, method, modularity, kept, sizes[:kept].tolist(), iterations,
+                           time.perf_counter() - started)
+
+
+class IncrementalStats:
+    # statistiques d'analyse tenues à jour à chaque lien ajouté ou retiré, au lieu d'être recalculées
+    def __init__(self, network: "SocialNetwork"):
+        from scipy.sparse.csgraph import connected_components
+
+        self.network = network
+        csr = network.get_csr()
+        self.node_ids = csr.node_ids.tolist()
+        self.index = {node: i for i, node in enumerate(self.node_ids)}
+        self.group_ids = csr.group_ids.tolist()
+        self.nb_groups = len(network.groups)
+
+        src, dst = csr.edges()
+        loops = src == dst
+        self.n_nodes = csr.n
+        self.n_edges = len(src)
+        self.degrees = (csr.degrees().astype(np.int64) + np.bincount(src[loops], minlength=csr.n)).tolist()
+        self.degree_sum = sum(self.degrees)
+        self.group_edges = csr.group_edge_counts(self.nb_groups, src, dst)
+
+        # tas paresseux : une entrée par changement de degré, les entrées périmées sont ignorées à la lecture
+        self._max_heap = [(-degree, row) for row, degree in enumerate(self.degrees)]
+        self._min_heap = [(degree, row) for row, degree in enumerate(self.degrees)]
+        heapq.heapify(self._max_heap)
+        heapq.heapify(self._min_heap)
+
+        n_components, labels = connected_components(csr.to_scipy(), directed=False) if csr.n else (0, [])
+        self._reset_components(n_components, labels)
+
+    def _reset_components(self, n_components: int, labels: np.ndarray):
+        labels = np.asarray(labels, dtype=np.int64)
+        representative = np.zeros(n_components, dtype=np.int64)
+        representative[labels[::-1]] = np.arange(len(labels))[::-1]
+        self._parent = representative[labels].tolist()
+        self._size = np.bincount(representative[labels], minlength=len(labels)).tolist()
+        self._components = n_components
+        self._dirty = False
+
+    def _find(self, row: int) -> int:
+        parent = self._parent
+        root = row
+        while parent[root] != root:
+            root = parent[root]
+        while parent[row] != root:
+            parent[row], row = root, parent[row]
+        return root
+
+    def _union(self, a: int, b: int):
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return
+        if self._size[a] < self._size[b]:
+            a, b = b, a
+        self._parent[b] = a
+        self._size[a] += self._size[b]
+        self._components -= 1
+
+    def _set_degree(self, row: int, delta: int):
+        self.degrees[row] += delta
+        self.degree_sum += delta
+        heapq.heappush(self._max_heap, (-self.degrees[row], row))
+        heapq.heappush(self._min_heap, (self.degrees[row], row))
+        if len(self._max_heap) > 4 * self.n_nodes + 64:
+            self._max_heap = [(-degree, row) for row, degree in enumerate(self.degrees)]
+            self._min_heap = [(degree, row) for row, degree in enumerate(self.degrees)]
+            heapq.heapify(self._max_heap)
+            heapq.heapify(self._min_heap)
+
+    def _edge_changed(self, user_a: int, user_b: int, delta: int):
+        a, b = self.index[user_a], self.index[user_b]
+        self.n_edges += delta
+        self._set_degree(a, delta)
+        self._set_degree(b, delta)
+
+        group_a, group_b = self.group_ids[a], self.group_ids[b]
+        if group_a >= 0 and group_b >= 0:
+            self.group_edges[group_a, group_b] += delta
+            if group_a != group_b:
+                self.group_edges[group_b, group_a] += delta
+
+    def edge_added(self, user_a: int, user_b: int):
+        self._edge_changed(user_a, user_b, 1)
+        if not self._dirty:
+            self._union(self.index[user_a], self.index[user_b])
+
+    def edge_removed(self, user_a: int, user_b: int):
+        self._edge_changed(user_a, user_b, -1)
+        # une suppression peut couper une composante : recalcul différé à la prochaine question
+        self._dirty = True
+
+    def _top(self, heap: List[Tuple[int, int]], sign: int, k: int) -> List[Tuple[int, int]]:
+        found, seen = [], set()
+        while heap and len(found) < k:
+            key, row = heap[0]
+            heapq.heappop(heap)
+            if sign * key == self.degrees[row] and row not in seen:
+                found.append((key, row))
+                seen.add(row)
+        for entry in found:
+            heapq.heappush(heap, entry)
+        return [(self.node_ids[row], sign * key) for key, row in found]
+
+    def degree(self, user: int) -> int:
+        return self.degrees[self.index[user]]
+
+    def top_connected(self, k: int = 5) -> List[Tuple[int, int]]:
+        return self._top(self._max_heap, -1, k)
+
+    def max_degree_user(self) -> Tuple[Optional[int], int]:
+        top = self._top(self._max_heap, -1, 1)
+        return top[0] if top else (None, 0)
+
+    def min_degree_user(self) -> Tuple[Optional[int], int]:
+        bottom = self._top(self._min_heap, 1, 1)
+        return bottom[0] if bottom else (None, 0)
+
+    def avg_degree(self) -> float:
+        return self.degree_sum / self.n_nodes if self.n_nodes else 0.0
+
+    def density(self) -> float:
+        n = self.n_nodes
+        return 2 * self.n_edges / (n * (n - 1)) if n > 1 else 0.0
+
+    def n_components(self) -> int:
+        if self._dirty:
+            from scipy.sparse.csgraph import connected_components
+
+            self._reset_components(*connected_components(self.network.get_csr().to_scipy(), directed=False))
+        return self._components
+
+    def is_connected(self) -> bool:
+        return self.n_components() == 1
+
+    def report(self, top_k: int = 5) -> "GraphReport":
+        groups = self.network.groups
+        return GraphReport(
+            n_nodes=self.n_nodes,
+            n_edges=self.n_edges,
+            is_connected=self.is_connected(),
+            density=self.density(),
+            avg_degree=self.avg_degree(),
+            max_degree_user=self.max_degree_user(),
+            min_degree_user=self.min_degree_user(),
+            top_connected=self.top_connected(top_k) if top_k > 0 else [],
+            groups=groups,
+            group_names=[self.network.group_activities.get(i, f"Groupe {i + 1}") for i in range(self.nb_groups)],
+            internal_edges=np.diag(self.group_edges).copy(),
+            inter_group_edges=self.group_edges.copy(),
+        )
+
+
+EMBEDDING_METHODS = ("walks", "spectral")
+
+
+@dataclass
+class EmbeddingRecall:
+    n_queries: int
+    k: int
+    ann_recall: float  # index IVF contre le classement exact sur les plongements
+    common_recall: float  # contre le classement exact par amis communs
+    cold_users: int  # utilisateurs avec moins de k suggestions par amis communs
+    query_ms: float
+
+
+def _normalize_rows(X: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    return np.divide(X, norms, out=np.zeros_like(X), where=norms > 0)
+
+
+def _within_hops(csr: CSRGraph, rows: np.ndarray, hops: int) -> np.ndarray:
+    mask = np.zeros(csr.n, dtype=bool)
+    mask[rows] = True
+    A = csr.to_scipy()
+    for _ in range(hops):
+        mask |= (A @ mask.astype(np.int32)) > 0
+    return mask
+
+
+def _walk_embedding(csr: CSRGraph, projection: np.ndarray, length: int, decay: float,
+                    rows: np.ndarray = None) -> np.ndarray:
+    # visites attendues des marches aléatoires de 1 à length pas, lancées depuis tous les utilisateurs à la fois
+    # par produits creux sur une projection aléatoire (FastRP) : le premier pas reproduit les amis communs
+    from scipy import sparse
+
+    degrees = csr.degrees().astype(np.float64)
+    P = (sparse.diags(np.divide(1.0, degrees, out=np.zeros_like(degrees), where=degrees > 0))
+         @ csr.to_scipy().astype(np.float32)).tocsr()
+
+    current = projection
+    out = np.zeros((csr.n if rows is None else len(rows), projection.shape[1]), dtype=np.float32)
+    for step in range(1, length + 1):
+        if rows is None:
+            current = P @ current
+            out += decay ** (step - 1) * _normalize_rows(current)
+            continue
+        # mise à jour locale : seules les lignes à portée des lignes demandées sont recalculées
+        needed = np.flatnonzero(_within_hops(csr, rows, length - step))
+        following = np.zeros_like(current)
+        following[needed] = P[needed] @ current
+        current = following
+        out += decay ** (step - 1) * _normalize_rows(current[rows])
+    return out
+
+
+def _spectral_embedding(csr: CSRGraph, dim: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    from scipy.sparse.linalg import eigsh
+
+    N = _normalized_adjacency(csr)
+    k = min(dim + 1, csr.n - 1)
+    values, vectors = eigsh(N, k=k, which="LA", tol=1e-4, v0=rng.standard_normal(csr.n))
+    order = np.argsort(-values)
+    # le premier vecteur propre ne porte que le degré : il est écarté
+    return values[order][1:].astype(np.float32), vectors[:, order][:, 1:].astype(np.float32)
+
+
+def _normalized_adjacency(csr: CSRGraph) -> "sparse.csr_matrix":
+    from scipy import sparse
+
+    degrees = csr.degrees().astype(np.float64)
+    scale = np.divide(1.0, np.sqrt(degrees), out=np.zeros_like(degrees), where=degrees > 0)
+    D = sparse.diags(scale)
+    return (D @ csr.to_scipy().astype(np.float64) @ D).tocsr()
+
+
+class EmbeddingIndex:
+    # plongements calculés une fois, puis index IVF (listes inversées autour de centroïdes k-means)
+    # pour des top-k approchés ; les régions modifiées sont recalculées localement
+    def __init__(self, network: "SocialNetwork", method: str = "walks", dim: int = 64, activity_weight: float = 0.0,
+                 seed: int = 42, n_lists: int = None, n_probe: int = 16, walk_length: int = 3, decay: float = 1.0):
+        if method not in EMBEDDING_METHODS:
+            raise ValueError(f"méthode de plongement inconnue : {method}")
+        if not 0 <= activity_weight <= 1:
+            raise ValueError("activity_weight doit être entre 0 et 1")
+
+        self.network = network
+        self.method = method
+        self.dim = dim
+        self.activity_weight = activity_weight
+        self.seed = seed
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.walk_length = walk_length
+        self.decay = decay
+        self.changed = set()
+        self.build()
+
+    def build(self):
+        started = time.perf_counter()
+        csr = self.network.get_csr()
+        self.rng = np.random.default_rng(self.seed)
+        self.node_ids = csr.node_ids
+
+        if self.method == "spectral":
+            self.eigenvalues, self.base = _spectral_embedding(csr, self.dim, self.rng)
+        else:
+            self.projection = (self.rng.standard_normal((csr.n, self.dim)) / np.sqrt(self.dim)).astype(np.float32)
+            self.base = _walk_embedding(csr, self.projection, self.walk_length, self.decay)
+        self.vectors = self._finish(csr, np.arange(csr.n))
+        self._build_lists()
+        self.changed.clear()
+        self.build_seconds = time.perf_counter() - started
+
+    def _finish(self, csr: CSRGraph, rows: np.ndarray) -> np.ndarray:
+        base = self.base[rows] * self.eigenvalues if self.method == "spectral" else self.base[rows]
+        vectors = _normalize_rows(base)
+        if self.activity_weight == 0:
+            return vectors
+
+        # activité du groupe en indicatrice : la similarité devient (1 - w) cos + w [même activité]
+        names = sorted(set(self.network.group_activities.values()))
+        column = {name: i for i, name in enumerate(names)}
+        group_column = np.array([column.get(self.network.group_activities.get(g), -1)
+                                 for g in range(int(csr.group_ids.max(initial=-1)) + 1)] + [-1], dtype=np.int64)
+        columns = group_column[csr.group_ids[rows]]
+        activity = np.zeros((len(rows), len(names)), dtype=np.float32)
+        activity[np.flatnonzero(columns >= 0), columns[columns >= 0]] = 1
+        return np.hstack((vectors * np.sqrt(1 - self.activity_weight), activity * np.sqrt(self.activity_weight)))
+
+    def _build_lists(self, iterations: int = 10):
+        from scipy import sparse
+
+        # k-means sphérique sur un échantillon (centroïdes normalisés, affectation par produit scalaire maximal)
+        n = len(self.vectors)
+        n_lists = min(self.n_lists or max(1, int(np.sqrt(n))), max(n, 1))
+        sample = self.vectors[self.rng.choice(n, min(n, 64 * n_lists), replace=False)] if n else self.vectors
+        self.centroids = sample[:n_lists].copy()
+        for _ in range(iterations):
+            assign = self._nearest_lists(sample)
+            members = sparse.csr_matrix((np.ones(len(sample), dtype=np.float32), (assign, np.arange(len(sample)))),
+                                        shape=(n_lists, len(sample)))
+            sums = members @ sample
+            empty = np.flatnonzero(np.diff(members.indptr) == 0)
+            sums[empty] = sample[self.rng.choice(len(sample), len(empty))]
+            self.centroids = _normalize_rows(sums)
+        self.assign = self._nearest_lists(self.vectors)
+        self._index_lists()
+
+    def _nearest_lists(self, vectors: np.ndarray, chunk: int = 16384) -> np.ndarray:
+        return np.concatenate([np.argmax(vectors[start:start + chunk] @ self.centroids.T, axis=1)
+                               for start in range(0, len(vectors), chunk)] or [np.empty(0, dtype=np.int64)])
+
+    def _index_lists(self):
+        # vecteurs recopiés dans l'ordre des listes : chaque liste sondée est une tranche contiguë
+        self.members = np.argsort(self.assign, kind="stable")
+        self.list_vectors = self.vectors[self.members]
+        self.list_offsets = np.zeros(len(self.centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.assign, minlength=len(self.centroids)), out=self.list_offsets[1:])
+
+    def mark_changed(self, users: Iterable[int]):
+        self.changed.update(users)
+
+    def refresh(self) -> int:
+        # re-plonge seulement la région touchée (à portée des marches), puis réaffecte ses listes
+        if not self.changed:
+            return 0
+        csr = self.network.get_csr()
+        if csr.n != len(self.vectors):
+            self.build()
+            return csr.n
+
+        seeds = csr.indices_of(np.fromiter(self.changed, dtype=np.int64, count=len(self.changed)))
+        self.changed.clear()
+        # un lien modifié change les marches de ceux qui sont à moins de walk_length - 1 sauts de ses extrémités
+        hops = self.walk_length - 1 if self.method == "walks" else 1
+        region = np.flatnonzero(_within_hops(csr, seeds[seeds >= 0], hops))
+        if self.method == "walks":
+            self.base[region] = _walk_embedding(csr, self.projection, self.walk_length, self.decay, region)
+        else:
+            # vecteurs propres : x = N x / λ, appliqué localement quelques fois
+            N = _normalized_adjacency(csr)[region]
+            for _ in range(3):
+                self.base[region] = (N @ self.base) / np.where(self.eigenvalues != 0, self.eigenvalues, 1)
+
+        self.vectors[region] = self._finish(csr, region)
+        self.assign[region] = self._nearest_lists(self.vectors[region])
+        self._index_lists()
+        METRICS.count("nodes_visited", len(region))
+        return len(region)
+
+    def _candidates(self, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        scores = self.centroids @ query
+        n_probe = min(self.n_probe, len(scores))
+        probes = np.argpartition(-scores, n_probe - 1)[:n_probe]
+        spans = [(self.list_offsets[p], self.list_offsets[p + 1]) for p in probes]
+        return (np.concatenate([self.members[lo:hi] for lo, hi in spans]),
+                np.concatenate([self.list_vectors[lo:hi] @ query for lo, hi in spans]))
+
+    def _rank(self, row: int, candidates: np.ndarray, scores: np.ndarray, k: int, csr: CSRGraph) -> List[
+            Tuple[int, float]]:
+        # les amis et l'utilisateur lui-même sont écartés parmi les k + degré + 1 meilleurs seulement
+        friends = csr.neighbors(row)
+        keep = min(len(candidates), k + len(friends) + 1)
+        if len(candidates) > keep:
+            top = np.argpartition(-scores, keep - 1)[:keep]
+            candidates, scores = candidates[top], scores[top]
+        valid = (candidates != row) & ~np.isin(candidates, friends)
+        candidates, scores = candidates[valid], scores[valid]
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [(int(self.node_ids[c]), round(float(s), 4)) for c, s in zip(candidates[order], scores[order])
+                if s > 0]
+
+    def query(self, user_id: int, k: int = 5, exact: bool = False) -> List[Tuple[int, float]]:
+        self.refresh()
+        csr = self.network.get_csr()
+        row = csr.index_of(user_id)
+        if row < 0 or k <= 0:
+            return []
+        if exact:
+            candidates, scores = np.arange(csr.n), self.vectors @ self.vectors[row]
+        else:
+            candidates, scores = self._candidates(self.vectors[row])
+        return self._rank(row, candidates, scores, k, csr)
+
+    def evaluate(self, n_queries: int = 200, k: int = 5, seed: int = None) -> EmbeddingRecall:
+        self.refresh()
+        csr = self.network.get_csr()
+        rng = np.random.default_rng(seed)
+        users = csr.node_ids[rng.choice(csr.n, min(n_queries, csr.n), replace=False)]
+        common = dict(chain.from_iterable(self.network.iter_friend_recommendations(users, k)))
+
+        ann_hits = ann_total = common_hits = common_total = cold = 0
+        elapsed = 0.0
+        for user in users.tolist():
+            started = time.perf_counter()
+            approximate = {v for v, _ in self.query(user, k)}
+            elapsed += time.perf_counter() - started
+
+            exact = {v for v, _ in self.query(user, k, exact=True)}
+            ann_hits += len(approximate & exact)
+            ann_total += len(exact)
+            expected = {v for v, _ in common[user]}
+            common_hits += len(approximate & expected)
+            common_total += len(expected)
+            cold += len(expected) < k
+
+        return EmbeddingRecall(len(users), k, ann_hits / ann_total if ann_total else 1.0,
+                               common_hits / common_total if common_total else 1.0, cold,
+                               1000 * elapsed / max(len(users), 1))
+
 
 class SocialNetwork:
-    def __init__(self, G: nx.Graph, groups: List[List[int]], group_activities: Dict[int, str]):
-        self.G = G
-        self.groups = groups
+    # propriétaire commun des résultats qui dépendent de tout le graphe (clés portant la version)
+    WHOLE_GRAPH = ("graph",)
+
+    def __init__(self, G: nx.Graph, groups: List[List[int]], group_activities: Dict[int, str],
+                 use_csr: bool = False, cache_size: int = 1024, cache_ttl: float = None):
+        self._G = G
+        self._groups = groups
         self.group_activities = group_activities
         self.rumor_state = {}
 
-    def get_friend_recommendations(self, user_id: int, max_recommendations: int = 5) -> List[Tuple[int, int]]:
+        self.use_csr = use_csr
+        self._csr = CSRGraph.from_networkx(G, groups) if use_csr else None
+        # liens modifiés depuis la construction de _csr : (ligne, ligne) -> présent, dans l'ordre des modifications
+        self._csr_edits = {}
+
+        self.version = 0
+        self.cache = ResultCache(cache_size, cache_ttl)
+        self.layouts = {}
+        self._stats = None
+        self._embeddings = None
+        self._paths = None
+
+    @classmethod
+    def from_csr(cls, csr: CSRGraph, group_activities: Dict[int, str], cache_size: int = 1024,
+                 cache_ttl: float = None) -> "SocialNetwork":
+        network = cls(None, None, group_activities, cache_size=cache_size, cache_ttl=cache_ttl)
+        network.use_csr = True
+        network._csr = csr
+        return network
+
+    # G et groups ne sont reconstruits depuis les tableaux que si un traitement networkx en a besoin
+    @property
+    def G(self) -> nx.Graph:
+        if self._G is None:
+            self._G = self._csr.to_networkx()
+        return self._G
+
+    @G.setter
+    def G(self, G: nx.Graph):
+        self._G = G
+        self._csr = None
+        self._csr_edits = {}
+        # nouveau graphe : tous les résultats en cache sont périmés
+        self.version += 1
+        self.cache.clear()
+        self._stats = None
+        self._embeddings = None
+        self.layouts.clear()
+
+    @property
+    def groups(self) -> List[List[int]]:
+        if self._groups is None:
+            self._groups = self._csr.groups_from_ids()
+        return self._groups
+
+    @groups.setter
+    def groups(self, groups: List[List[int]]):
+        self._groups = groups
+        self._csr = None
+        self._csr_edits = {}
+        self.version += 1
+        self.cache.clear()
+        self._stats = None
+        self._embeddings = None
+        self.layouts.clear()
+
+    def get_csr(self) -> CSRGraph:
+        if self._csr is None:
+            self._csr = CSRGraph.from_networkx(self.G, self.groups)
+        elif self._csr_edits:
+            # une seule passe sur les tableaux pour toutes les modifications en attente
+            csr = self._csr
+            removed = [key for key in self._csr_edits if csr.has_edge(*key)]
+            added = [key for key, present in self._csr_edits.items() if present]
+            self._csr = csr.with_edge_changes(np.array(added, dtype=np.int64).reshape(-1, 2),
+                                              np.array(removed, dtype=np.int64).reshape(-1, 2))
+            self._csr_edits = {}
+        return self._csr
+
+    def _record_csr_edit(self, user_a: int, user_b: int, present: bool):
+        if self._csr is None:
+            return
+        a, b = self._csr.index_of(user_a), self._csr.index_of(user_b)
+        key = (min(a, b), max(a, b))
+        # un lien retiré puis rajouté passe en fin de ligne, comme dans networkx
+        self._csr_edits.pop(key, None)
+        self._csr_edits[key] = present
+
+    def user_label(self, user_id: int) -> str:
+        csr = self.get_csr()
+        if csr.labels is None:
+            return str(user_id)
+        return bytes(csr.labels[csr.index_of(user_id)]).decode("utf-8")
+
+    def user_from_label(self, label: str) -> int:
+        # table inverse : les libellés importés sont triés, l'id dense est leur rang
+        csr = self.get_csr()
+        if csr.labels is None:
+            return int(label)
+        encoded = label.encode("utf-8")
+        key = np.array(encoded, dtype=csr.labels.dtype)
+        pos = int(np.searchsorted(csr.labels, key))
+        if len(encoded) > csr.labels.dtype.itemsize or pos == csr.n or csr.labels[pos] != key:
+            raise KeyError(label)
+        return int(csr.node_ids[pos])
+
+    def assign_groups(self, group_ids: np.ndarray, group_activities: Dict[int, str] = None):
+        # remplace les groupes sans reconstruire l'adjacence (ni repasser par networkx)
+        csr = self.get_csr()
+        updated = CSRGraph(csr.offsets, csr.indices, csr.node_ids, np.asarray(group_ids, dtype=np.int32), csr.m,
+                           csr.labels)
+        updated.source_path = csr.source_path
+        updated._adjacency = getattr(csr, "_adjacency", None)
+
+        self._csr = updated
+        self._groups = updated.groups_from_ids()
+        if group_activities is None:
+            group_activities = {i: f"Communauté {i + 1}" for i in range(len(self._groups))}
+        self.group_activities = group_activities
+        self._stats = None
+        self._embeddings = None
+        self.layouts.clear()
+
+    @instrumented()
+    def detect_communities(self, method: str = "louvain", resolution: float = 1.0, seed: int = None,
+                           min_size: int = 1, assign: bool = True) -> CommunityResult:
+        result = detect_communities(self.get_csr(), method, resolution, seed, min_size=min_size)
+        if assign:
+            self.assign_groups(result.labels)
+        return result
+
+    @property
+    def stats(self) -> IncrementalStats:
+        if self._stats is None:
+            self._stats = IncrementalStats(self)
+        return self._stats
+
+    @instrumented()
+    def embeddings(self, method: str = "walks", dim: int = 64, activity_weight: float = 0.0, seed: int = 42,
+                   **options) -> EmbeddingIndex:
+        # index conservé tant que les réglages ne changent pas ; les liens modifiés sont repris à la requête
+        settings = (method, dim, activity_weight, seed, tuple(sorted(options.items())))
+        if self._embeddings is None or self._embeddings[0] != settings:
+            self._embeddings = (settings, EmbeddingIndex(self, method, dim, activity_weight, seed, **options))
+        return self._embeddings[1]
+
+    @instrumented()
+    def add_friendship(self, user_a: int, user_b: int) -> bool:
+        return self.add_friendships([(user_a, user_b)])[0]
+
+    @instrumented()
+    def remove_friendship(self, user_a: int, user_b: int) -> bool:
+        return self.remove_friendships([(user_a, user_b)])[0]
+
+    @instrumented()
+    def add_friendships(self, pairs: Iterable[Tuple[int, int]]) -> List[bool]:
+        G = self.G
+        affected = set()
+        applied = []
+        for user_a, user_b in pairs:
+            if user_a == user_b or user_a not in G or user_b not in G or G.has_edge(user_a, user_b):
+                applied.append(False)
+                continue
+
+            G.add_edge(user_a, user_b)
+            self._record_csr_edit(user_a, user_b, True)
+            self._collect_affected(affected, user_a, user_b)
+            if self._stats is not None:
+                self._stats.edge_added(user_a, user_b)
+            applied.append(True)
+
+        if affected:
+            self._graph_changed(affected)
+        return applied
+
+    @instrumented()
+    def remove_friendships(self, pairs: Iterable[Tuple[int, int]]) -> List[bool]:
+        G = self.G
+        affected = set()
+        applied = []
+        for user_a, user_b in pairs:
+            if not G.has_edge(user_a, user_b):
+                applied.append(False)
+                continue
+
+            self._collect_affected(affected, user_a, user_b)
+            G.remove_edge(user_a, user_b)
+            self._record_csr_edit(user_a, user_b, False)
+            if self._stats is not None:
+                self._stats.edge_removed(user_a, user_b)
+            applied.append(True)
+
+        if affected:
+            self._graph_changed(affected)
+        return applied
+
+    def _collect_affected(self, affected: Set[int], user_a: int, user_b: int):
+        # les recommandations d'un utilisateur ne dépendent que de son voisinage à 2 sauts
+        affected.update((user_a, user_b))
+        affected.update(self.G.neighbors(user_a))
+        affected.update(self.G.neighbors(user_b))
+
+    def _graph_changed(self, affected: Set[int]):
+        # les entrées de l'ancienne version ne seraient plus jamais lues : on les libère tout de suite
+        self.cache.invalidate_owners(chain(affected, [self.WHOLE_GRAPH]))
+        if self._embeddings is not None:
+            self._embeddings[1].mark_changed(affected)
+
+        # les tableaux sont corrigés à la prochaine lecture (get_csr), sans repasser par networkx
+        self.version += 1
+
+    @instrumented()
+    def layout(self, kind: str = "circular", seed: int = 42, iterations: int = None) -> np.ndarray:
+        if kind not in LAYOUTS:
+            raise ValueError(f"disposition inconnue : {kind}")
+
+        csr = self.get_csr()
+        previous = self.layouts.get(kind)
+        if previous is not None and previous["version"] == self.version and previous["seed"] == seed:
+            METRICS.count("cache_hits")
+            return previous["positions"]
+        METRICS.count("cache_misses")
+
+        # après une modification des liens, les dispositions par forces repartent des positions précédentes
+        warm = None
+        if previous is not None and previous["seed"] == seed and kind in ("spring", "force"):
+            warm = np.full((csr.n, 2), np.nan)
+            rows = csr.indices_of(previous["node_ids"])
+            warm[rows[rows >= 0]] = previous["positions"][rows >= 0]
+
+        if kind == "circular":
+            positions = _circular_positions(csr.n)
+        elif kind == "groups":
+            positions = _group_positions(csr.group_ids, len(self.groups))
+        elif kind == "spring" and csr.n <= 1000:
+            initial = None
+            if warm is not None:
+                initial = {node: xy for node, xy in zip(csr.node_ids.tolist(), warm) if not np.isnan(xy[0])}
+            pos = nx.spring_layout(self.G, pos=initial or None, seed=seed, k=0.5,
+                                   iterations=iterations or (15 if warm is not None else 50))
+            positions = np.array([pos[node] for node in csr.node_ids.tolist()])
+        else:
+            rng = np.random.default_rng(seed)
+            if warm is None:
+                initial = _group_positions(csr.group_ids, len(self.groups))
+                temperature = 0.1
+            else:
+                initial = warm
+                missing = np.flatnonzero(np.isnan(warm[:, 0]))
+                initial[missing] = rng.uniform(-1, 1, size=(len(missing), 2))
+                temperature = 0.02
+            initial = initial + rng.normal(scale=1e-3, size=initial.shape)
+            # les personnes sans ami ne participent pas aux forces : elles sont rangées sur un cercle extérieur
+            linked = csr.degrees() > 0
+            rows = np.cumsum(linked) - 1
+            src, dst = csr.edges()
+            positions = np.empty((csr.n, 2))
+            placed = _force_layout(rows[src], rows[dst], initial[linked], iterations or (50 if warm is None else 15),
+                                   temperature)
+
+            # échelle robuste : les rares petites composantes repoussées au loin sont ramenées sur le bord
+            placed = placed - np.median(placed, axis=0)
+            norms = np.sqrt((placed ** 2).sum(axis=1))
+            placed /= max(float(np.quantile(norms, 0.99)), 1e-12) if len(norms) else 1.0
+            norms = np.maximum(np.sqrt((placed ** 2).sum(axis=1)), 1.0)
+            positions[linked] = placed / norms[:, None]
+            positions[~linked] = 1.1 * _circular_positions(int(np.count_nonzero(~linked)))
+            if np.any(~linked):
+                positions = _rescale_positions(positions)
+
+        positions.setflags(write=False)
+        self.layouts[kind] = {"version": self.version, "seed": seed, "node_ids": csr.node_ids.copy(),
+                              "positions": positions}
+        return positions
+
+    @instrumented()
+    def get_friend_recommendations(self, user_id: int, max_recommendations: int = 5, mode: str = "common") -> List[
+            Tuple[int, Union[int, float]]]:
+        if mode == "embedding":
+            # similarité cosinus des plongements : utile aux utilisateurs qui ont peu d'amis
+            return self.embeddings().query(user_id, max_recommendations)
+        if mode != "common":
+            raise ValueError(f"mode de recommandation inconnu : {mode}")
+
+        key = ("recommendations", user_id, max_recommendations)
+        found, recommendations = self.cache.get(key)
+        METRICS.count("cache_hits" if found else "cache_misses")
+        if not found:
+            if self.use_csr:
+                recommendations = self._friend_recommendations_csr(user_id, max_recommendations)
+            else:
+                recommendations = self._friend_recommendations_nx(user_id, max_recommendations)
+            self.cache.put(key, recommendations, owner=user_id)
+
+        return list(recommendations)
+
+    def _friend_recommendations_nx(self, user_id: int, max_recommendations: int) -> List[Tuple[int, int]]:
         if user_id not in self.G:
             return []
 
@@ -61,29 +2442,358 @@ class SocialNetwork:
                 if friend_of_friend != user_id and friend_of_friend not in friends:
                     recommendations[friend_of_friend] = recommendations.get(friend_of_friend, 0) + 1
 
+        if METRICS.enabled:
+            METRICS.count("edges_scanned", sum(self.G.degree(friend) for friend in friends))
+            METRICS.count("candidates_scored", len(recommendations))
         sorted_recommendations = sorted(recommendations.items(), key=lambda x: x[1], reverse=True)
         return sorted_recommendations[:max_recommendations]
 
+    def _friend_recommendations_csr(self, user_id: int, max_recommendations: int) -> List[Tuple[int, int]]:
+        csr = self.get_csr()
+        user = csr.index_of(user_id)
+        if user < 0:
+            return []
+
+        friends = csr.neighbors(user)
+        candidates, _ = _csr_gather(csr.offsets, csr.indices, csr.friend_order(user))
+        METRICS.count("edges_scanned", len(candidates))
+        candidates = candidates[(candidates != user) & ~np.isin(candidates, friends)]
+        if len(candidates) == 0:
+            return []
+
+        # l'ordre de première rencontre reproduit l'ordre d'insertion du dictionnaire (départage des égalités)
+        unique, first_seen, counts = np.unique(candidates, return_index=True, return_counts=True)
+        METRICS.count("candidates_scored", len(unique))
+        order = np.lexsort((first_seen, -counts))[:max_recommendations]
+        return [(int(csr.node_ids[c]), int(k)) for c, k in zip(unique[order], counts[order])]
+
+    def iter_friend_recommendations(self, user_ids: List[int] = None, max_recommendations: int = 5,
+                                    chunk_size: int = 4096) -> Iterator[List[Tuple[int, List[Tuple[int, int]]]]]:
+        csr = self.get_csr()
+        if user_ids is None:
+            user_ids = csr.node_ids
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+
+        for start in range(0, len(user_ids), chunk_size):
+            chunk_ids = user_ids[start:start + chunk_size]
+            rows = csr.indices_of(chunk_ids)
+            ranked = _rank_recommendation_chunk(csr, rows[rows >= 0], max_recommendations)
+
+            results = []
+            position = 0
+            for user_id, row in zip(chunk_ids.tolist(), rows.tolist()):
+                if row < 0:
+                    results.append((user_id, []))
+                else:
+                    results.append((user_id, ranked[position]))
+                    position += 1
+            yield results
+
+    @instrumented()
     def get_farthest_person(self, user_id: int) -> Tuple[int, int]:
+        # une arête modifiée peut changer toutes les distances : la clé porte la version du graphe
+        key = ("farthest", user_id, self.version)
+        found, farthest = self.cache.get(key)
+        METRICS.count("cache_hits" if found else "cache_misses")
+        if not found:
+            if self.use_csr:
+                farthest = self._farthest_person_csr(user_id)
+            else:
+                farthest = self._farthest_person_nx(user_id)
+            self.cache.put(key, farthest, owner=self.WHOLE_GRAPH)
+
+        return farthest
+
+    @instrumented()
+    def get_farthest_persons(self, user_ids: List[int] = None, workers: int = None) -> Dict[
+            int, Tuple[Optional[int], Optional[int]]]:
+        csr = self.get_csr()
+        if user_ids is None:
+            user_ids = csr.node_ids
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        sources = csr.indices_of(user_ids)
+
+        valid = np.flatnonzero(sources >= 0)
+        tasks = [sources[valid[start:start + 64]] for start in range(0, len(valid), 64)]
+        shared = csr.shared_arrays()
+
+        results = {int(user): (None, None) for user in user_ids[sources < 0]}
+        METRICS.count("bfs_sources", len(valid))
+        batches = _parallel_map(_eccentricity_task, tasks, shared, workers)
+        for start, (eccentricity, farthest) in zip(range(0, len(valid), 64), batches):
+            users = user_ids[valid[start:start + 64]]
+            for user, ecc, far in zip(users.tolist(), eccentricity.tolist(), farthest.tolist()):
+                results[user] = (int(csr.node_ids[far]), ecc) if ecc > 0 else (None, None)
+        return results
+
+    @instrumented()
+    def graph_extent(self, max_sources: int = None, workers: int = None) -> Optional[GraphExtent]:
+        if self.get_csr().n == 0:
+            return None
+
+        key = ("extent", self.version, max_sources)
+        found, extent = self.cache.get(key)
+        if found:
+            return extent
+
+        from scipy.sparse.csgraph import connected_components
+
+        csr = self.get_csr()
+        _, labels = connected_components(csr.to_scipy(), directed=False)
+        component = labels == np.argmax(np.bincount(labels))
+        degrees = csr.degrees()
+        workers = _resolve_workers(workers, os.cpu_count() or 1)
+        shared = csr.shared_arrays()
+
+        big = np.iinfo(np.int64).max
+        lower = np.where(component, 0, big)
+        upper = np.where(component, big, -1)
+        diam_lo, diam_hi, rad_lo, rad_hi = 0, big, 0, big
+        center = periphery = int(np.argmax(np.where(component, degrees, -1)))
+        best_ecc = -1
+        runs = 0
+
+        # bornes de Takes & Kosters sur les excentricités, calculées 64 sources à la fois
+        while diam_lo < diam_hi or rad_lo < rad_hi:
+            open_nodes = np.flatnonzero(component & (lower < upper) & ((upper > diam_lo) | (lower < rad_hi)))
+            if len(open_nodes) == 0 or (max_sources is not None and runs >= max_sources):
+                break
+
+            budget = workers * 64 if max_sources is None else min(workers * 64, max_sources - runs)
+            by_upper = open_nodes[np.lexsort((-degrees[open_nodes], -upper[open_nodes]))]
+            by_lower = open_nodes[np.lexsort((-degrees[open_nodes], lower[open_nodes]))]
+            picked = np.unique(np.concatenate((by_upper[:(budget + 1) // 2], by_lower[:budget // 2])))
+            if len(picked) < budget:
+                picked = np.unique(np.concatenate((picked, by_upper[:budget])))[:budget]
+
+            tasks = [picked[start:start + 64] for start in range(0, len(picked), 64)]
+            for sources, (ecc, far, batch_lower, batch_upper) in zip(
+                    tasks, _parallel_map(_eccentricity_bounds_task, tasks, shared, workers)):
+                lower = np.maximum(lower, np.where(component, batch_lower, big))
+                upper = np.minimum(upper, batch_upper)
+                lower[sources] = upper[sources] = ecc
+                if ecc.max() > best_ecc:
+                    best_ecc = int(ecc.max())
+                    periphery = int(far[np.argmax(ecc)])
+                runs += len(sources)
+
+            diam_lo = int(lower[component].max())
+            diam_hi = int(upper[component].max())
+            rad_hi = int(upper[component].min())
+            rad_lo = int(lower[component].min())
+            diam_hi = min(diam_hi, 2 * rad_hi)
+            rad_lo = max(rad_lo, (diam_lo + 1) // 2)
+            center = int(np.flatnonzero(component & (upper == rad_hi))[0])
+
+        METRICS.count("bfs_sources", runs)
+        extent = GraphExtent(
+            diameter_lower=diam_lo,
+            diameter_upper=diam_hi,
+            radius_lower=rad_lo,
+            radius_upper=rad_hi,
+            center=int(csr.node_ids[center]),
+            periphery=int(csr.node_ids[periphery]),
+            component_size=int(component.sum()),
+            bfs_runs=runs,
+            exact=diam_lo == diam_hi and rad_lo == rad_hi,
+        )
+        self.cache.put(key, extent, owner=self.WHOLE_GRAPH)
+        return extent
+
+    def _farthest_person_nx(self, user_id: int) -> Tuple[int, int]:
         if user_id not in self.G:
             return None, None
 
         try:
             distances = nx.single_source_shortest_path_length(self.G, user_id)
+            METRICS.count("nodes_visited", len(distances))
 
             if len(distances) <= 1:
                 return None, None
 
             farthest_user = max(distances.items(), key=lambda x: x[1])
             return farthest_user[0], farthest_user[1]
-        except:
+        except nx.NodeNotFound:
             return None, None
 
-    def find_cliques(self, max_size: int = 10) -> List[Set[int]]:
-        cliques = list(nx.find_cliques(self.G))
-        return [set(clique) for clique in cliques if len(clique) <= max_size]
+    def _farthest_person_csr(self, user_id: int) -> Tuple[int, int]:
+        csr = self.get_csr()
+        source = csr.index_of(user_id)
+        if source < 0:
+            return None, None
+
+        visited = np.zeros(csr.n, dtype=bool)
+        visited[source] = True
+        frontier = np.array([source], dtype=np.int32)
+        level = 0
+
+        while True:
+            reached, _ = _csr_gather(csr.offsets, csr.indices, frontier)
+            METRICS.count("edges_scanned", len(reached))
+            reached = reached[~visited[reached]]
+            if len(reached) == 0:
+                break
 
+            # ordre de découverte, comme le BFS de networkx : départage les personnes à égale distance
+            unique, first_seen = np.unique(reached, return_index=True)
+            frontier = unique[np.argsort(first_seen)]
+            visited[frontier] = True
+            level += 1
+
+        METRICS.count("nodes_visited", int(visited.sum()))
+        if level == 0:
+            return None, None
+
+        return int(csr.node_ids[frontier[0]]), level
+
+    def path_finder(self) -> PathFinder:
+        # l'index de repères suit le graphe : reconstruit avec les mêmes réglages après une modification
+        csr = self.get_csr()
+        if self._paths is None or self._paths.csr is not csr:
+            landmarks = None
+            if self._paths is not None and self._paths.landmarks is not None:
+                old = self._paths.landmarks
+                landmarks = LandmarkIndex(csr, len(old.landmarks), old.strategy, old.seed)
+            self._paths = PathFinder(csr, landmarks)
+        return self._paths
+
+    @instrumented()
+    def build_landmarks(self, n_landmarks: int = 16, strategy: str = "degree", seed: int = 0,
+                        workers: int = None) -> LandmarkIndex:
+        csr = self.get_csr()
+        self._paths = PathFinder(csr, LandmarkIndex(csr, n_landmarks, strategy, seed, workers))
+        return self._paths.landmarks
+
+    @instrumented()
+    def shortest_path(self, user_a: int, user_b: int) -> Optional[List[int]]:
+        finder = self.path_finder()
+        source, target = finder.csr.index_of(user_a), finder.csr.index_of(user_b)
+        if source < 0 or target < 0:
+            return None
+        path = finder.path(source, target)
+        return None if path is None else finder.csr.node_ids[path].tolist()
+
+    @instrumented()
+    def degrees_of_separation(self, user_a: int, user_b: int) -> Optional[int]:
+        distance = self.distances([(user_a, user_b)])[0][0]
+        return None if np.isinf(distance) else int(distance)
+
+    @instrumented()
+    def distances(self, pairs: Iterable[Tuple[int, int]], exact: bool = True,
+                  workers: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        finder = self.path_finder()
+        pairs = np.asarray(list(pairs), dtype=np.int64).reshape(-1, 2)
+        sources, targets = finder.csr.indices_of(pairs[:, 0]), finder.csr.indices_of(pairs[:, 1])
+        known = (sources >= 0) & (targets >= 0)
+
+        lower, upper = np.full(len(pairs), np.inf), np.full(len(pairs), np.inf)
+        lower[known], upper[known] = finder.distances(sources[known], targets[known], exact, workers)
+        return lower, upper
+
+    @instrumented()
+    def graph_report(self, top_k: int = 5, bridges: int = 0, n_samples: int = 256, workers: int = None,
+                     clustering: bool = False) -> GraphReport:
+        # une fois les statistiques incrémentales construites, le rapport ne reparcourt plus le graphe
+        if self._stats is not None:
+            report = self._stats.report(top_k)
+        else:
+            report = build_graph_report(self.get_csr(), self.groups, self.group_activities, top_k)
+        if bridges:
+            report.bridges = self.centrality(n_samples, seed=0, workers=workers).top("betweenness", bridges)
+        if clustering:
+            result = self.clustering(workers)
+            report.transitivity, report.average_clustering = result.transitivity, result.average_clustering
+            report.group_clustering = result.group_clustering
+        return report
+
+    @instrumented()
+    def clustering(self, workers: int = None) -> ClusteringResult:
+        # les triangles ne dépendent que des liens ; les moyennes par groupe suivent les groupes courants
+        key = ("clustering", self.version)
+        found, result = self.cache.get(key)
+        METRICS.count("cache_hits" if found else "cache_misses")
+        csr = self.get_csr()
+        if not found:
+            result = compute_clustering(csr, workers, len(self.groups))
+            self.cache.put(key, result, owner=self.WHOLE_GRAPH)
+        return replace(result, group_clustering=_group_average(result.clustering, csr.group_ids, len(self.groups)))
+
+    @instrumented()
+    def centrality(self, n_samples: int = 256, seed: int = None, workers: int = None,
+                   confidence: float = 0.95) -> CentralityResult:
+        # sans graine le tirage change à chaque appel : seul un calcul reproductible est mis en cache
+        key = ("centrality", n_samples, seed, confidence, self.version)
+        found, result = self.cache.get(key) if seed is not None else (False, None)
+        METRICS.count("cache_hits" if found else "cache_misses")
+        if not found:
+            result = compute_centrality(self.get_csr(), n_samples, seed, workers, confidence)
+            if seed is not None:
+                self.cache.put(key, result, owner=self.WHOLE_GRAPH)
+        return result
+
+    @instrumented()
+    def find_cliques(self, max_size: int = 10) -> List[Set[int]]:
+        cliques = list(self.iter_cliques(max_size))
+        METRICS.count("cliques_found", len(cliques))
+        return cliques
+
+    def _clique_setup(self, min_size: int) -> Tuple[CSRGraph, np.ndarray, Dict[str, Any]]:
+        csr = self.get_csr()
+        order, core = _degeneracy_order(csr.offsets, csr.indices)
+        rank = np.empty(csr.n, dtype=np.int64)
+        rank[order] = np.arange(csr.n)
+
+        # une clique de taille >= min_size ne contient que des sommets du (min_size - 1)-cœur
+        allowed = core >= min_size - 1
+        rows = np.repeat(np.arange(csr.n), csr.degrees())
+        later = (rank[csr.indices] > rank[rows]) & allowed[csr.indices] & allowed[rows]
+        later_counts = np.bincount(rows[later], minlength=csr.n)
+
+        roots = order[allowed[order]]
+        roots = roots[np.argsort(-later_counts[roots], kind="stable")]
+        shared = dict(csr.shared_arrays(), allowed=allowed, rank=rank, later_counts=later_counts)
+        return csr, roots, shared
+
+    def iter_cliques(self, max_size: int = None, min_size: int = 1, workers: int = None,
+                     roots_per_task: int = 512) -> Iterator[Set[int]]:
+        csr, roots, shared = self._clique_setup(min_size)
+        n_tasks = max(1, -(-len(roots) // roots_per_task))
+        # distribution en tourniquet : les racines les plus lourdes sont réparties entre les tâches
+        tasks = [(roots[i::n_tasks], max_size, min_size) for i in range(n_tasks)]
+
+        for found in _parallel_map(_clique_task, tasks, shared, workers):
+            for clique in found:
+                yield set(csr.node_ids[clique].tolist())
+
+    @instrumented()
+    def largest_cliques(self, k: int = 10, max_size: int = None, workers: int = None,
+                        roots_per_task: int = 512) -> List[Set[int]]:
+        csr, roots, shared = self._clique_setup(1)
+        best = []
+
+        def tasks():
+            for start in range(0, len(roots), roots_per_task):
+                chunk = roots[start:start + roots_per_task]
+                bound = best[0][0] if len(best) == k else 0
+                if len(best) == k and shared["later_counts"][chunk[0]] + 1 <= bound:
+                    return
+                yield chunk, max_size, k, bound
+
+        for found in _parallel_map(_largest_clique_task, tasks(), shared, workers):
+            for entry in found:
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif entry[0] > best[0][0]:
+                    heapq.heappushpop(best, entry)
+
+        METRICS.count("cliques_found", len(best))
+        return [set(csr.node_ids[clique].tolist()) for _, clique in sorted(best, key=lambda e: -e[0])]
+
+    @instrumented()
     def propagate_rumor(self, origin_user: int, probability: float = 0.7, max_steps: int = 10) -> Dict[int, int]:
+        if self.use_csr:
+            return self._propagate_rumor_csr(origin_user, probability, max_steps)
+
         if origin_user not in self.G:
             return {}
 
@@ -104,6 +2814,160 @@ class SocialNetwork:
 
             current_wave = next_wave
 
+        if METRICS.enabled:
+            METRICS.count("nodes_visited", len(infected))
+            METRICS.count("edges_scanned", sum(self.G.degree(u) for u, t in infected.items() if t < max_steps))
+        self.rumor_state = infected
+        return infected
+
+    @instrumented()
+    def estimate_rumor_spread(self, origin_user: Union[int, List[int]], probability: float = 0.7, max_steps: int = 10,
+                              n_simulations: int = 1000, seed: int = None, workers: int = None,
+                              batch_size: int = 64, confidence: float = 0.95) -> Optional[RumorEstimate]:
+        csr = self.get_csr()
+        batch_size = max(1, min(batch_size, 64))
+        origin_users = [origin_user] if isinstance(origin_user, (int, np.integer)) else list(origin_user)
+        origins = csr.indices_of(origin_users)
+        if len(origins) == 0 or np.any(origins < 0) or n_simulations <= 0:
+            return None
+
+        batches = [min(batch_size, n_simulations - start) for start in range(0, n_simulations, batch_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(batches))
+        tasks = [(seed_seq, size, origins, probability, max_steps) for seed_seq, size in zip(seeds, batches)]
+
+        infections = np.zeros(csr.n, dtype=np.int64)
+        time_sums = np.zeros(csr.n, dtype=np.float64)
+        sizes = []
+        shared = csr.shared_arrays()
+        for batch_infections, batch_times, batch_sizes in _parallel_map(_rumor_batch_task, tasks, shared, workers):
+            infections += batch_infections
+            time_sums += batch_times
+            sizes.append(batch_sizes)
+
+        METRICS.count("simulations", n_simulations)
+        METRICS.count("nodes_visited", int(infections.sum()))
+        coverage = np.concatenate(sizes) / csr.n
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        mean = float(coverage.mean())
+        margin = z * float(coverage.std(ddof=1)) / n_simulations ** 0.5 if n_simulations > 1 else 0.0
+        tail = (1 - confidence) / 2
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            expected_time = np.where(infections > 0, time_sums / infections, np.nan)
+
+        return RumorEstimate(
+            origins=[int(u) for u in origin_users],
+            probability=probability,
+            max_steps=max_steps,
+            n_simulations=n_simulations,
+            node_ids=csr.node_ids,
+            infection_probability=infections / n_simulations,
+            expected_time=expected_time,
+            coverage=coverage,
+            confidence=confidence,
+            coverage_mean=mean,
+            coverage_ci=(max(0.0, mean - margin), min(1.0, mean + margin)),
+            coverage_interval=(float(np.quantile(coverage, tail)), float(np.quantile(coverage, 1 - tail))),
+        )
+
+    @instrumented()
+    def select_rumor_seeds(self, k: int, probability: float = 0.7, max_steps: int = 10, n_samples: int = 20000,
+                           time_budget: float = None, seed: int = None, workers: int = None) -> SeedSelection:
+        csr = self.get_csr()
+        started = time.perf_counter()
+        deadline = started + time_budget if time_budget is not None else None
+        seeds = np.random.SeedSequence(seed)
+
+        def tasks():
+            produced = 0
+            while produced < n_samples and (deadline is None or time.perf_counter() < deadline or produced == 0):
+                size = min(64, n_samples - produced)
+                produced += size
+                yield seeds.spawn(1)[0], size, probability, max_steps
+
+        set_nodes = []
+        set_ids = []
+        n_sets = 0
+        shared = csr.shared_arrays()
+        for nodes, members, batch_sets in _parallel_map(_reverse_reachable_task, tasks(), shared, workers):
+            set_nodes.append(nodes)
+            set_ids.append(members + n_sets)
+            n_sets += batch_sets
+
+        set_nodes = np.concatenate(set_nodes)
+        set_ids = np.concatenate(set_ids)
+        METRICS.count("simulations", n_sets)
+        METRICS.count("nodes_visited", len(set_nodes))
+
+        # glouton sur la couverture des ensembles RR (garantie 1 - 1/e sur l'étalement espéré)
+        order = np.argsort(set_nodes, kind="stable")
+        node_offsets = np.zeros(csr.n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(set_nodes, minlength=csr.n), out=node_offsets[1:])
+        sets_of_node = set_ids[order]
+
+        set_order = np.argsort(set_ids, kind="stable")
+        set_offsets = np.zeros(n_sets + 1, dtype=np.int64)
+        np.cumsum(np.bincount(set_ids, minlength=n_sets), out=set_offsets[1:])
+        nodes_of_set = set_nodes[set_order]
+
+        gains = np.diff(node_offsets)
+        covered = np.zeros(n_sets, dtype=bool)
+        chosen, marginal = [], []
+        for _ in range(min(k, csr.n)):
+            best = int(np.argmax(gains))
+            new_sets = sets_of_node[node_offsets[best]:node_offsets[best + 1]]
+            new_sets = new_sets[~covered[new_sets]]
+            covered[new_sets] = True
+
+            touched, _ = _csr_gather(set_offsets, nodes_of_set, new_sets)
+            gains -= np.bincount(touched, minlength=csr.n)
+            gains[best] = -1
+            chosen.append(best)
+            marginal.append(csr.n * len(new_sets) / max(n_sets, 1))
+
+        return SeedSelection(
+            seeds=csr.node_ids[chosen].tolist(),
+            marginal_spread=marginal,
+            cumulative_spread=np.cumsum(marginal).tolist(),
+            expected_spread=float(sum(marginal)),
+            probability=probability,
+            max_steps=max_steps,
+            n_samples=n_sets,
+            elapsed=time.perf_counter() - started,
+            budget_reached=n_sets < n_samples,
+        )
+
+    def _propagate_rumor_csr(self, origin_user: int, probability: float, max_steps: int) -> Dict[int, int]:
+        csr = self.get_csr()
+        origin = csr.index_of(origin_user)
+        if origin < 0:
+            return {}
+
+        offsets, indices = csr.offsets, csr.indices
+        infected = {origin: 0}
+        current_wave = [origin]
+
+        # mêmes tirages random.random() que la version networkx, dans le même ordre
+        for step in range(1, max_steps + 1):
+            next_wave = []
+
+            for user in current_wave:
+                for neighbor in indices[offsets[user]:offsets[user + 1]].tolist():
+                    if neighbor not in infected and random.random() < probability:
+                        infected[neighbor] = step
+                        next_wave.append(neighbor)
+
+            if not next_wave:
+                break
+
+            current_wave = next_wave
+
+        if METRICS.enabled:
+            METRICS.count("nodes_visited", len(infected))
+            processed = [user for user, step in infected.items() if step < max_steps]
+            METRICS.count("edges_scanned", int(csr.degrees()[processed].sum()))
+        node_ids = csr.node_ids
+        infected = {int(node_ids[user]): step for user, step in infected.items()}
         self.rumor_state = infected
         return infected
 
@@ -131,6 +2995,7 @@ def ask_float(prompt: str, min_value: float = 0.0, max_value: float = 1.0) -> fl
             print("Erreur : Entrez un nombre valide")
 
 
+@instrumented()
 def generate_social_graph(nb_groups: int, max_people_per_group: int, p_in: float = 0.6) -> Tuple[
     nx.Graph, List[List[int]], Dict[int, str]]:
     G = nx.Graph()
@@ -184,43 +3049,700 @@ def generate_social_graph(nb_groups: int, max_people_per_group: int, p_in: float
     return G, groups, group_activities
 
 
-def get_group_color(group_index: int, total_groups: int):
-    cmap = plt.cm.tab10 if total_groups <= 10 else plt.cm.tab20
-    return cmap(group_index % (10 if total_groups <= 10 else 20))
+def _sample_pair_positions(total_pairs: int, p: float, rng: np.random.Generator) -> np.ndarray:
+    if total_pairs == 0 or p <= 0:
+        return np.empty(0, dtype=np.int64)
+    if p >= 1:
+        return np.arange(total_pairs, dtype=np.int64)
 
+    # saut géométrique : on tire directement l'écart jusqu'à la prochaine paire retenue
+    expected = total_pairs * p
+    chunks = []
+    last = -1
+    while last < total_pairs - 1:
+        gaps = rng.geometric(p, size=int(expected + 6 * expected ** 0.5) + 16)
+        positions = last + np.cumsum(gaps)
+        chunks.append(positions)
+        last = int(positions[-1])
 
-def visualize_network(network: SocialNetwork, highlight_nodes: Set[int] = None,
-                      highlight_colors: Dict[int, str] = None, title: str = "Réseau Social",
-                      use_circular: bool = True, show_legend: bool = False):
-    G = network.G
-    groups = network.groups
+    positions = np.concatenate(chunks)
+    return positions[positions < total_pairs]
+
+
+def _unrank_upper_pairs(k: np.ndarray, sizes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    def pairs_before(row):
+        return row * sizes - row * (row + 1) // 2
+
+    b = 2 * sizes - 1
+    i = np.floor((b - np.sqrt(np.maximum(b * b - 8 * k, 0).astype(np.float64))) / 2).astype(np.int64)
+    i = np.clip(i, 0, np.maximum(sizes - 2, 0))
+    i -= pairs_before(i) > k
+    i += pairs_before(i + 1) <= k
+    j = k - pairs_before(i) + i + 1
+    return i, j
 
-    node_colors = []
-    for node in G.nodes():
-        if highlight_colors and node in highlight_colors:
-            node_colors.append(highlight_colors[node])
+
+@instrumented()
+def sample_social_edges(nb_groups: int, max_people_per_group: int, p_in: float = 0.6, seed: int = None) -> Tuple[
+    np.ndarray, np.ndarray, np.ndarray, Dict[int, str]]:
+    rng = np.random.default_rng(seed)
+
+    available_activities = ACTIVITIES.copy()
+    random.Random(seed).shuffle(available_activities)
+    group_activities = {}
+    for group_idx in range(nb_groups):
+        if group_idx < len(available_activities):
+            group_activities[group_idx] = available_activities[group_idx]
         else:
-            for i, group in enumerate(groups):
-                if node in group:
-                    node_colors.append(get_group_color(i, len(groups)))
+            group_activities[group_idx] = f"Activité {group_idx + 1}"
+
+    sizes = rng.integers(5, max_people_per_group + 1, size=nb_groups).astype(np.int64)
+    starts = np.cumsum(sizes) - sizes
+    total_nodes = int(sizes.sum())
+
+    pairs = sizes * (sizes - 1) // 2
+    pair_offsets = np.cumsum(pairs) - pairs
+    positions = _sample_pair_positions(int(pairs.sum()), p_in, rng)
+    owner = np.searchsorted(pair_offsets, positions, side="right") - 1
+    i, j = _unrank_upper_pairs(positions - pair_offsets[owner], sizes[owner])
+    intra_src = starts[owner] + i
+    intra_dst = starts[owner] + j
+
+    empty = np.flatnonzero(np.bincount(owner, minlength=nb_groups) == 0)
+    chain_len = sizes[empty] - 1
+    chain_src = np.repeat(starts[empty] - (np.cumsum(chain_len) - chain_len), chain_len) + np.arange(chain_len.sum())
+
+    group_i, group_j = np.triu_indices(nb_groups, 1)
+    need = rng.integers(2, 6, size=len(group_i))
+    accepted = np.empty(0, dtype=np.int64)
+    for _ in range(10):
+        active = np.flatnonzero(need > 0)
+        if len(active) == 0:
+            break
+
+        pair_idx = np.repeat(active, need[active])
+        gi, gj = group_i[pair_idx], group_j[pair_idx]
+        node_a = starts[gi] + (rng.random(len(pair_idx)) * sizes[gi]).astype(np.int64)
+        node_b = starts[gj] + (rng.random(len(pair_idx)) * sizes[gj]).astype(np.int64)
+
+        keys, first = np.unique(node_a * total_nodes + node_b, return_index=True)
+        fresh = ~np.isin(keys, accepted, assume_unique=True)
+        accepted = np.sort(np.concatenate((accepted, keys[fresh])))
+        need -= np.bincount(pair_idx[first[fresh]], minlength=len(need))
+
+    src = np.concatenate((intra_src, chain_src, accepted // total_nodes))
+    dst = np.concatenate((intra_dst, chain_src + 1, accepted % total_nodes))
+    dtype = np.int32 if total_nodes < 2 ** 31 else np.int64
+    return src.astype(dtype), dst.astype(dtype), sizes, group_activities
+
+
+@instrumented()
+def generate_social_graph_fast(nb_groups: int, max_people_per_group: int, p_in: float = 0.6, seed: int = None) -> \
+        Tuple[nx.Graph, List[List[int]], Dict[int, str]]:
+    src, dst, sizes, group_activities = sample_social_edges(nb_groups, max_people_per_group, p_in, seed)
+
+    G = nx.Graph()
+    G.add_nodes_from(range(int(sizes.sum())))
+    G.add_edges_from(zip(src.tolist(), dst.tolist()))
+
+    bounds = np.concatenate(([0], np.cumsum(sizes))).tolist()
+    groups = [list(range(bounds[k], bounds[k + 1])) for k in range(nb_groups)]
+    return G, groups, group_activities
+
+
+NETWORK_MAGIC = b"SOCLINK1"
+NETWORK_ALIGNMENT = 64
+
+
+@instrumented()
+def save_network(network: SocialNetwork, path: str):
+    csr = network.get_csr()
+    nb_groups = int(csr.group_ids.max(initial=-1)) + 1
+    arrays = {
+        "offsets": np.ascontiguousarray(csr.offsets, dtype=np.int32),
+        "indices": np.ascontiguousarray(csr.indices, dtype=np.int32),
+        "node_ids": np.ascontiguousarray(csr.node_ids, dtype=np.int64),
+        "group_ids": np.ascontiguousarray(csr.group_ids, dtype=np.int32),
+    }
+    if csr.labels is not None:
+        arrays["labels"] = np.ascontiguousarray(csr.labels)
+    activities = [network.group_activities.get(i) for i in range(max(nb_groups, len(network.group_activities)))]
+
+    # en-tête JSON puis blocs binaires alignés, directement projetables en mémoire
+    layout = {}
+    position = 0
+    for name, array in arrays.items():
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": position}
+        position += -(-array.nbytes // NETWORK_ALIGNMENT) * NETWORK_ALIGNMENT
+
+    header = {"format": 1, "n": csr.n, "m": csr.m, "arrays": layout, "activities": activities}
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    data_start = -(-(len(NETWORK_MAGIC) + 8 + len(header_bytes)) // NETWORK_ALIGNMENT) * NETWORK_ALIGNMENT
+
+    with open(path, "wb") as f:
+        f.write(NETWORK_MAGIC)
+        f.write(len(header_bytes).to_bytes(8, "little"))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            array.tofile(f)
+        f.truncate(data_start + position)
+
+
+def _map_network_file(path: str, mmap: bool = True) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    with open(path, "rb") as f:
+        if f.read(len(NETWORK_MAGIC)) != NETWORK_MAGIC:
+            raise ValueError(f"{path} n'est pas un fichier de réseau Social-Link")
+        header_len = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(header_len).decode("utf-8"))
+        data_start = -(-(len(NETWORK_MAGIC) + 8 + header_len) // NETWORK_ALIGNMENT) * NETWORK_ALIGNMENT
+
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            dtype, shape = np.dtype(spec["dtype"]), tuple(spec["shape"])
+            if mmap and int(np.prod(shape)) > 0:
+                arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=data_start + spec["offset"], shape=shape)
+            else:
+                f.seek(data_start + spec["offset"])
+                arrays[name] = np.fromfile(f, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+
+    return header, arrays
+
+
+@instrumented()
+def load_network(path: str, mmap: bool = True, cache_size: int = 1024) -> SocialNetwork:
+    header, arrays = _map_network_file(path, mmap)
+    csr = CSRGraph(arrays["offsets"], arrays["indices"], arrays["node_ids"], arrays["group_ids"], header["m"],
+                   arrays.get("labels"))
+    if mmap:
+        csr.source_path = os.path.abspath(path)
+
+    group_activities = {i: name for i, name in enumerate(header["activities"]) if name is not None}
+    return SocialNetwork.from_csr(csr, group_activities, cache_size=cache_size)
+
+
+@dataclass
+class ImportReport:
+    path: str
+    n_nodes: int
+    n_edges: int
+    lines: int  # lignes d'arêtes lues (avant doublons et boucles)
+    self_loops: int
+    duplicates: int
+    skipped: int  # lignes mal formées ignorées
+    string_ids: bool
+    spilled_edges: int  # arêtes passées par le fichier temporaire
+    seconds: float
+    edges_per_second: float
+    peak_rss: Optional[int]
+
+
+class _IdTable:
+    # ids d'origine -> codes denses (ordre d'apparition). Les ids nouveaux de chaque bloc forment une série triée ;
+    # une série est fusionnée avec la précédente dès qu'elle atteint la moitié de sa taille, si bien que chaque id
+    # n'est recopié que O(log N) fois et qu'une recherche ne parcourt que O(log N) séries
+    def __init__(self, numeric: bool):
+        self.dtype = np.dtype(np.int64 if numeric else "U1")
+        self.runs = []  # [(clés triées, codes)], de la plus grande à la plus petite
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def numeric(self) -> bool:
+        return self.dtype.kind == "i"
+
+    @property
+    def nbytes(self) -> int:
+        return sum(keys.nbytes + codes.nbytes for keys, codes in self.runs)
+
+    @property
+    def keys(self) -> np.ndarray:
+        self._merge_runs(1)
+        return self.runs[0][0] if self.runs else np.empty(0, dtype=self.dtype)
+
+    @property
+    def codes(self) -> np.ndarray:
+        self._merge_runs(1)
+        return self.runs[0][1] if self.runs else np.empty(0, dtype=np.int64)
+
+    def _merge_runs(self, keep: int):
+        while len(self.runs) > keep:
+            (keys_a, codes_a), (keys_b, codes_b) = self.runs[-2:]
+            keys = np.concatenate((keys_a, keys_b))
+            order = np.argsort(keys, kind="stable")
+            self.runs[-2:] = [(keys[order], np.concatenate((codes_a, codes_b))[order])]
+
+    def encode(self, ids: np.ndarray) -> np.ndarray:
+        unique, inverse = np.unique(ids, return_inverse=True)
+        codes = np.full(len(unique), -1, dtype=np.int64)
+        for keys, run_codes in self.runs:
+            missing = np.flatnonzero(codes < 0)
+            if len(missing) == 0:
+                break
+            pos = np.minimum(np.searchsorted(keys, unique[missing]), len(keys) - 1)
+            hit = keys[pos] == unique[missing]
+            codes[missing[hit]] = run_codes[pos[hit]]
+
+        new = np.flatnonzero(codes < 0)
+        if len(new):
+            codes[new] = np.arange(self.count, self.count + len(new))
+            self.count += len(new)
+            self.runs.append((unique[new], codes[new]))
+            while len(self.runs) > 1 and 2 * len(self.runs[-1][0]) >= len(self.runs[-2][0]):
+                self._merge_runs(len(self.runs) - 1)
+        return codes[inverse].reshape(ids.shape)
+
+    def to_strings(self):
+        # les codes déjà attribués restent valables, seules les clés changent de type (et d'ordre)
+        self.dtype = np.dtype("U1")
+        for i, (keys, codes) in enumerate(self.runs):
+            keys = keys.astype(str)
+            order = np.argsort(keys, kind="stable")
+            self.runs[i] = (keys[order], codes[order])
+
+    def ranks(self) -> np.ndarray:
+        # id dense final de chaque code : son rang parmi les clés triées
+        codes = self.codes
+        ranks = np.empty(len(codes), dtype=np.int32)
+        ranks[codes] = np.arange(len(codes), dtype=np.int32)
+        return ranks
+
+
+class _EdgeBuffer:
+    # paires de codes int32 gardées en mémoire jusqu'au plafond, puis déversées dans un fichier temporaire
+    def __init__(self, limit: Optional[int], temp_dir: str = None):
+        self.limit = limit
+        self.temp_dir = temp_dir
+        self.chunks = []
+        self.nbytes = 0
+        self.file = None
+        self.spilled = 0
+
+    def append(self, pairs: np.ndarray):
+        self.chunks.append(pairs)
+        self.nbytes += pairs.nbytes
+        if self.limit is not None and self.nbytes > self.limit:
+            if self.file is None:
+                self.file = tempfile.TemporaryFile(dir=self.temp_dir)
+            for chunk in self.chunks:
+                chunk.tofile(self.file)
+                self.spilled += len(chunk)
+            self.chunks, self.nbytes = [], 0
+
+    def iter_chunks(self, size: int) -> Iterator[np.ndarray]:
+        if self.file is not None:
+            self.file.seek(0)
+            while True:
+                chunk = np.fromfile(self.file, dtype=np.int32, count=2 * size)
+                if len(chunk) == 0:
                     break
+                yield chunk.reshape(-1, 2)
+        yield from self.chunks
 
-    plt.figure(figsize=(14, 10))
+    def close(self):
+        if self.file is not None:
+            self.file.close()
 
-    if use_circular:
-        pos = nx.circular_layout(G)
-    else:
-        pos = nx.spring_layout(G, seed=42, k=0.5, iterations=50)
 
-    node_sizes = [800 if highlight_nodes and node in highlight_nodes else 500 for node in G.nodes()]
+def _open_edge_file(path: str):
+    with open(path, "rb") as f:
+        compressed = f.read(2) == b"\x1f\x8b"
+    if compressed:
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
 
-    if highlight_colors:
-        nx.draw_networkx_nodes(G, pos, node_color=node_colors, node_size=node_sizes, alpha=0.9)
+
+def _iter_edge_blocks(stream, block_chars: int) -> Iterator[str]:
+    # blocs de lignes entières, pour ne jamais charger le fichier d'un coup
+    rest = ""
+    while True:
+        data = stream.read(block_chars)
+        if not data:
+            break
+        data = rest + data
+        cut = data.rfind("\n") + 1
+        rest = data[cut:]
+        if cut:
+            yield data[:cut]
+    if rest:
+        yield rest
+
+
+def _sniff_edge_block(text: str, delimiter: Optional[str], header: Optional[bool],
+                      columns: Tuple[int, int]) -> Tuple[str, Optional[str]]:
+    data = [line for line in text[:1 << 16].splitlines() if line.strip() and not line.startswith(("#", "%"))]
+    if not data:
+        return text, delimiter
+    if delimiter is None:
+        delimiter = next((candidate for candidate in (",", ";") if candidate in data[0]), None)
+
+    def numeric(line: str) -> bool:
+        fields = next(csv.reader([line], delimiter=delimiter)) if delimiter else line.split()
+        try:
+            [int(fields[c]) for c in columns]
+        except (IndexError, ValueError):
+            return False
+        return True
+
+    # en-tête CSV (« source,target ») : première ligne non numérique alors que la suivante l'est,
+    # ou, pour des ids texte, colonnes dont la première valeur détonne (heuristique du module csv)
+    if header is None:
+        header = len(data) > 1 and not numeric(data[0]) and numeric(data[1])
+        if not header and delimiter is not None and len(data) > 1:
+            try:
+                header = csv.Sniffer().has_header("\n".join(data[:20]))
+            except csv.Error:
+                header = False
+    if header:
+        # l'en-tête est retiré à sa position de ligne : son texte peut aussi figurer dans un commentaire au-dessus
+        start = 0
+        for line in text[:1 << 16].splitlines(keepends=True):
+            if line.strip() and not line.startswith(("#", "%")):
+                text = text[:start] + text[start + len(line):]
+                break
+            start += len(line)
+    return text, delimiter
+
+
+def _load_edge_rows(text: str, numeric: bool, delimiter: Optional[str], columns: Tuple[int, int]) -> Optional[
+        np.ndarray]:
+    # un seul préfixe de commentaire garde numpy sur son analyseur C ; les lignes « % » (KONECT) sont retirées avant
+    if text.startswith("%") or "\n%" in text:
+        text = re.sub(r"(?m)^%.*\n?", "", text)
+    options = {"usecols": columns, "comments": "#", "delimiter": delimiter, "ndmin": 2}
+    if delimiter is not None:
+        options["quotechar"] = '"'
+    with warnings.catch_warnings():
+        # blocs ne contenant que des commentaires
+        warnings.simplefilter("ignore", UserWarning)
+        try:
+            return np.loadtxt(io.StringIO(text), dtype=np.int64 if numeric else str, **options)
+        except ValueError:
+            return None
+
+
+def _parse_edge_lines(text: str, numeric: bool, delimiter: Optional[str], columns: Tuple[int, int]) -> Tuple[
+        np.ndarray, int]:
+    # bloc avec des lignes mal formées : analyse ligne à ligne pour ne perdre que celles-là
+    lines = text.splitlines()
+    rows = csv.reader(lines, delimiter=delimiter) if delimiter else (line.split() for line in lines)
+    pairs, skipped = [], 0
+    for fields in rows:
+        if not fields or fields[0].lstrip().startswith(("#", "%")):
+            continue
+        try:
+            pair = [fields[c].strip() for c in columns]
+            pairs.append([int(value) for value in pair] if numeric else pair)
+        except (IndexError, ValueError):
+            skipped += 1
+    return np.array(pairs, dtype=np.int64 if numeric else str).reshape(-1, 2), skipped
+
+
+def _edges_to_csr(buffer: _EdgeBuffer, ranks: np.ndarray, memory_limit: Optional[int], temp_dir: str = None) -> \
+        Tuple[np.ndarray, np.ndarray, int]:
+    n = len(ranks)
+    # environ 128 octets de temporaires par arête d'un bloc, 32 par voisin lors du tri des lignes
+    chunk = max(1 << 16, memory_limit // 256) if memory_limit else 1 << 22
+
+    degrees = np.zeros(n, dtype=np.int64)
+    for pairs in buffer.iter_chunks(chunk):
+        degrees += np.bincount(ranks[pairs].ravel(), minlength=n)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(degrees, out=offsets[1:])
+    total = int(offsets[-1])
+    if total >= 2 ** 31:
+        raise ValueError(f"trop d'arêtes pour des indices int32 : {total // 2}")
+
+    # placement direct de chaque voisin dans sa ligne, sans tri global des arêtes
+    if memory_limit and 4 * total > memory_limit // 2:
+        indices = np.memmap(tempfile.TemporaryFile(dir=temp_dir), dtype=np.int32, mode="w+", shape=(total,))
+    else:
+        indices = np.empty(total, dtype=np.int32)
+    fill = offsets[:-1].copy()
+    for pairs in buffer.iter_chunks(chunk):
+        if len(pairs) == 0:
+            continue
+        pairs = ranks[pairs]
+        rows = np.concatenate((pairs[:, 0], pairs[:, 1]))
+        cols = np.concatenate((pairs[:, 1], pairs[:, 0]))
+        order = np.argsort(rows)
+        rows, cols = rows[order], cols[order]
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        counts = np.diff(np.r_[starts, len(rows)])
+        indices[fill[rows] + np.arange(len(rows)) - np.repeat(starts, counts)] = cols
+        fill[rows[starts]] += counts
+
+    # voisins triés et doublons retirés par blocs de lignes, en compactant sur place
+    block = max(1 << 16, memory_limit // 128) if memory_limit else 1 << 24
+    compact = np.zeros(n + 1, dtype=np.int64)
+    start = written = 0
+    while start < n:
+        stop = min(n, max(start + 1, int(np.searchsorted(offsets, offsets[start] + block, side="right")) - 1))
+        keys = np.repeat(np.arange(stop - start, dtype=np.int64), degrees[start:stop]) * n
+        keys += indices[offsets[start]:offsets[stop]]
+        keys.sort()
+        if len(keys):
+            keys = keys[np.r_[True, keys[1:] != keys[:-1]]]
+        rows = keys // n
+        indices[written:written + len(keys)] = keys - rows * n
+        compact[start + 1:stop + 1] = written + np.cumsum(np.bincount(rows, minlength=stop - start))
+        written += len(keys)
+        start = stop
+
+    if isinstance(indices, np.memmap):
+        indices = indices[:written]
+    else:
+        indices.resize(written, refcheck=False)
+    return compact.astype(np.int32), indices, written // 2
+
+
+def _peak_rss() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@instrumented()
+def import_edge_list(path: str, output: str = None, columns: Tuple[int, int] = (0, 1), delimiter: str = None,
+                     ids: str = "auto", header: bool = None, memory_limit: int = None, temp_dir: str = None,
+                     progress: Callable[[int, float], None] = None) -> Tuple[SocialNetwork, ImportReport]:
+    if ids not in ("auto", "int", "str"):
+        raise ValueError(f"type d'identifiants inconnu : {ids}")
+
+    started = time.perf_counter()
+    # le plafond borne tout ce qui grandit avec les arêtes (blocs de texte, tampon, tri des lignes) ;
+    # les tableaux par utilisateur (~50 octets chacun) s'y ajoutent
+    block_chars = min(1 << 24, max(1 << 16, memory_limit // 64)) if memory_limit else 1 << 24
+    table = _IdTable(ids != "str")
+    buffer = _EdgeBuffer(memory_limit // 4 if memory_limit else None, temp_dir)
+    lines = self_loops = skipped = 0
+
+    try:
+        with _open_edge_file(path) as stream:
+            for number, block in enumerate(_iter_edge_blocks(stream, block_chars)):
+                if number == 0:
+                    block, delimiter = _sniff_edge_block(block, delimiter, header, columns)
+
+                pairs = _load_edge_rows(block, table.numeric, delimiter, columns)
+                if pairs is None and ids == "auto" and table.numeric:
+                    # ids texte si plus de 1 % des lignes ne sont pas numériques ; sinon simples lignes erronées
+                    pairs = _load_edge_rows(block, False, delimiter, columns)
+                    if pairs is not None and np.mean(~np.char.isdigit(np.char.lstrip(pairs, "-")).all(axis=1)) > 0.01:
+                        table.to_strings()
+                    else:
+                        pairs = None
+                if pairs is None:
+                    pairs, bad = _parse_edge_lines(block, table.numeric, delimiter, columns)
+                    skipped += bad
+
+                codes = table.encode(pairs).astype(np.int32)
+                loops = codes[:, 0] == codes[:, 1]
+                self_loops += int(np.count_nonzero(loops))
+                buffer.append(codes[~loops])
+                lines += len(pairs)
+
+                if len(table) >= 2 ** 31:
+                    raise ValueError("trop d'utilisateurs pour des indices int32")
+                if memory_limit and table.nbytes > memory_limit // 2:
+                    raise MemoryError(f"la table des identifiants ({table.nbytes} octets) dépasse la moitié du "
+                                      f"plafond mémoire")
+                if progress is not None:
+                    progress(lines, time.perf_counter() - started)
+
+        n = len(table)
+        offsets, indices, m = _edges_to_csr(buffer, table.ranks(), memory_limit, temp_dir)
+    finally:
+        buffer.close()
+
+    if table.numeric:
+        node_ids, labels = table.keys, None
     else:
-        nx.draw_networkx_nodes(G, pos, node_color=node_colors, node_size=node_sizes, alpha=0.9)
+        node_ids, labels = np.arange(n, dtype=np.int64), np.char.encode(table.keys, "utf-8")
+    csr = CSRGraph(offsets, indices, node_ids, np.full(n, -1, dtype=np.int32), m, labels)
+    network = SocialNetwork.from_csr(csr, {})
+    if output is not None:
+        save_network(network, output)
+        network = load_network(output)
+
+    seconds = time.perf_counter() - started
+    METRICS.count("edges_scanned", lines)
+    report = ImportReport(path, n, m, lines, self_loops, lines - self_loops - m, skipped, not table.numeric,
+                          buffer.spilled, seconds, lines / seconds if seconds > 0 else float("inf"), _peak_rss())
+    return network, report
+
+
+LAYOUTS = ("circular", "spring", "groups", "force")
+
+
+def _rescale_positions(pos: np.ndarray) -> np.ndarray:
+    # centré, coordonnée maximale ramenée à 1 (comme nx.rescale_layout)
+    if len(pos) == 0:
+        return pos
+    pos = pos - pos.mean(axis=0)
+    extent = np.abs(pos).max()
+    return pos / extent if extent > 0 else pos
+
+
+def _circular_positions(n: int) -> np.ndarray:
+    # même disposition que nx.circular_layout, sans passer par le graphe networkx
+    if n == 1:
+        return np.zeros((1, 2))
+    theta = np.linspace(0, 1, n + 1)[:-1] * 2 * np.pi
+    return np.column_stack((np.cos(theta), np.sin(theta)))
+
+
+def _group_positions(group_ids: np.ndarray, nb_groups: int) -> np.ndarray:
+    # un disque par groupe, de rayon proportionnel à la racine de sa taille, disposés en cercle ;
+    # les membres sont répartis en tournesol (angle d'or) à l'intérieur du disque
+    labels = np.where(group_ids >= 0, group_ids, nb_groups)
+    sizes = np.bincount(labels, minlength=nb_groups + 1)
+    radii = np.sqrt(sizes)
+    angles = 2 * np.pi * (np.cumsum(2 * radii) - radii) / max(2 * radii.sum(), 1)
+    ring = 1.25 * radii.sum() / np.pi if np.count_nonzero(sizes) > 1 else 0.0
+    centers = ring * np.column_stack((np.cos(angles), np.sin(angles)))
+
+    order = np.argsort(labels, kind="stable")
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    rank = np.empty(len(labels), dtype=np.int64)
+    rank[order] = np.arange(len(labels)) - starts[labels[order]]
+
+    radius = radii[labels] * np.sqrt((rank + 0.5) / sizes[labels])
+    theta = rank * np.pi * (3 - np.sqrt(5))
+    return _rescale_positions(centers[labels] + radius[:, None] * np.column_stack((np.cos(theta), np.sin(theta))))
+
+
+def _exact_repulsion(pos: np.ndarray, k: float) -> np.ndarray:
+    displacement = np.zeros_like(pos)
+    for start in range(0, len(pos), 512):
+        delta = pos[start:start + 512, None, :] - pos[None, :, :]
+        distance2 = np.maximum((delta ** 2).sum(axis=2), 1e-12)
+        displacement[start:start + 512] = (delta * (k * k / distance2)[:, :, None]).sum(axis=1)
+    return displacement
+
+
+def _grid_repulsion(pos: np.ndarray, k: float, grid: int) -> np.ndarray:
+    # approximation particule-maillage : masses déposées sur une grille, champ de répulsion k²/d obtenu
+    # par convolution FFT avec le noyau, puis relu au point de grille de chaque nœud
+    low = pos.min(axis=0)
+    h = max(float(np.ptp(pos, axis=0).max()), 1e-9) * (1 + 1e-9) / grid
+    cells = np.minimum(((pos - low) / h).astype(np.int64), grid - 1)
+    flat = cells[:, 0] * grid + cells[:, 1]
+    density = np.bincount(flat, minlength=grid * grid).reshape(grid, grid).astype(np.float64)
+
+    offsets = np.fft.ifftshift(np.arange(-grid, grid))
+    X, Y = np.meshgrid(offsets, offsets, indexing="ij")
+    r2 = (X * X + Y * Y).astype(np.float64)
+    r2[0, 0] = np.inf
+
+    shape = (2 * grid, 2 * grid)
+    spectrum = np.fft.rfft2(density, s=shape)
+    field_x = np.fft.irfft2(spectrum * np.fft.rfft2(X / r2), s=shape)[:grid, :grid]
+    field_y = np.fft.irfft2(spectrum * np.fft.rfft2(Y / r2), s=shape)[:grid, :grid]
+    return (k * k / h) * np.column_stack((field_x.ravel()[flat], field_y.ravel()[flat]))
+
+
+def _force_layout(src: np.ndarray, dst: np.ndarray, initial: np.ndarray, iterations: int = 50,
+                  temperature: float = 0.1, gravity: float = 0.1, exact_limit: int = 2000) -> np.ndarray:
+    # Fruchterman-Reingold vectorisé : attraction d²/k le long des arêtes, répulsion k²/d entre tous les nœuds,
+    # plus une légère gravité vers le centre pour que les composantes isolées ne s'éloignent pas
+    pos = np.array(initial, dtype=np.float64)
+    n = len(pos)
+    if n <= 1:
+        return pos
+
+    keep = src != dst
+    src, dst = src[keep], dst[keep]
+    k = 1 / np.sqrt(n)
+    grid = int(min(512, max(64, 2 ** np.ceil(np.log2(np.sqrt(n) * 1.5)))))
+    step = temperature * max(float(np.ptp(pos, axis=0).max()), 1e-9)
+    cooling = step / (iterations + 1)
+
+    for _ in range(iterations):
+        displacement = _exact_repulsion(pos, k) if n <= exact_limit else _grid_repulsion(pos, k, grid)
+
+        delta = pos[src] - pos[dst]
+        pull = delta * (np.sqrt((delta ** 2).sum(axis=1)) / k)[:, None]
+        for axis in range(2):
+            displacement[:, axis] -= np.bincount(src, pull[:, axis], minlength=n)
+            displacement[:, axis] += np.bincount(dst, pull[:, axis], minlength=n)
+
+        displacement -= gravity * (pos - pos.mean(axis=0))
+
+        length = np.maximum(np.sqrt((displacement ** 2).sum(axis=1)), 1e-12)
+        pos += displacement * (np.minimum(length, step) / length)[:, None]
+        step -= cooling
+
+    return pos
+
+
+def get_group_color(group_index: int, total_groups: int):
+    import matplotlib.pyplot as plt
+
+    cmap = plt.cm.tab10 if total_groups <= 10 else plt.cm.tab20
+    return cmap(group_index % (10 if total_groups <= 10 else 20))
+
+
+@instrumented()
+def visualize_network(network: SocialNetwork, highlight_nodes: Set[int] = None,
+                      highlight_colors: Dict[int, str] = None, title: str = "Réseau Social",
+                      use_circular: bool = True, show_legend: bool = False, label_threshold: int = 200,
+                      aggregate: bool = None, max_nodes: int = 5000, layout: str = None):
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+    from matplotlib.colors import to_rgba
+    from matplotlib.patches import Patch
+
+    csr = network.get_csr()
+    groups = network.groups
+
+    # au-delà de max_nodes, un dessin nœud par nœud n'est plus lisible : vue agrégée par groupe
+    if aggregate is None:
+        aggregate = csr.n > max_nodes
+    if aggregate:
+        visualize_group_network(network, title, highlight_nodes, show_legend)
+        return
 
-    nx.draw_networkx_edges(G, pos, alpha=0.3, width=1.5)
-    nx.draw_networkx_labels(G, pos, font_size=9, font_weight='bold')
+    # couleur par identifiant de groupe (premier groupe trouvé), sans parcourir les listes de groupes
+    # la dernière entrée sert aux personnes sans groupe (identifiant -1)
+    palette = np.array([get_group_color(i, len(groups)) for i in range(len(groups))] + [to_rgba('lightgray')])
+    node_colors = palette[csr.group_ids]
+    if highlight_colors:
+        nodes = csr.indices_of(np.fromiter(highlight_colors, dtype=np.int64, count=len(highlight_colors)))
+        colors = [to_rgba(color) for color in highlight_colors.values()]
+        for idx, color in zip(nodes.tolist(), colors):
+            if idx >= 0:
+                node_colors[idx] = color
+
+    highlighted = np.zeros(csr.n, dtype=bool)
+    if highlight_nodes:
+        nodes = csr.indices_of(np.fromiter(highlight_nodes, dtype=np.int64, count=len(highlight_nodes)))
+        highlighted[nodes[nodes >= 0]] = True
+
+    # taille des nœuds et épaisseur des liens diminuent avec la taille du réseau
+    base_size = 500 if csr.n <= label_threshold else max(4.0, 500 * label_threshold / csr.n)
+    node_sizes = np.where(highlighted, base_size * 1.6, base_size)
+    src, dst = csr.edges()
+    edge_width = 1.5 if len(src) <= 5000 else 0.3
+    edge_alpha = 0.3 if len(src) <= 5000 else 0.1
+
+    pos = network.layout(layout or ("circular" if use_circular else "spring"))
+
+    fig, ax = plt.subplots(figsize=(14, 10))
+    edges = LineCollection(np.stack((pos[src], pos[dst]), axis=1), colors="black", linewidths=edge_width,
+                           alpha=edge_alpha, zorder=1)
+    ax.add_collection(edges)
+    ax.scatter(pos[:, 0], pos[:, 1], s=node_sizes, c=node_colors, alpha=0.9, linewidths=0, zorder=2)
+
+    # niveau de détail : toutes les étiquettes sous le seuil, sinon seulement les nœuds mis en évidence
+    labelled = np.arange(csr.n) if csr.n <= label_threshold else np.flatnonzero(highlighted)[:label_threshold]
+    for idx in labelled.tolist():
+        ax.text(pos[idx, 0], pos[idx, 1], str(csr.node_ids[idx]), fontsize=9, fontweight='bold',
+                ha='center', va='center', zorder=3)
 
     if show_legend and not highlight_colors:
         legend_elements = []
@@ -230,154 +3752,316 @@ def visualize_network(network: SocialNetwork, highlight_nodes: Set[int] = None,
             label = f'{activity} ({len(group)} pers.)'
             legend_elements.append(Patch(facecolor=color, label=label, alpha=0.9))
 
-        plt.legend(handles=legend_elements, loc='upper left',
-                   framealpha=0.95, fontsize=10, title="Groupes d'activités")
+        ax.legend(handles=legend_elements, loc='upper left',
+                  framealpha=0.95, fontsize=10, title="Groupes d'activités")
 
-    plt.title(title, fontsize=16, fontweight='bold', pad=20)
-    plt.axis('off')
+    ax.autoscale_view()
+    ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
+    ax.axis('off')
     plt.tight_layout()
     plt.show()
 
 
-def visualize_rumor_propagation_realtime(network: SocialNetwork, origin: int, probability: float = 0.7,
-                                         max_steps: int = 10):
-    G = network.G
-
-    if origin not in G:
-        print(f"L'utilisateur {origin} n'existe pas dans le réseau.")
-        return
-
-    infected = {origin: 0}
-    current_wave = [origin]
-    propagation_steps = [{origin: 0}]
-    new_infected_per_step = [[origin]]
-
-    for step in range(1, max_steps + 1):
-        next_wave = []
-
-        for user in current_wave:
-            for neighbor in G.neighbors(user):
-                if neighbor not in infected and random.random() < probability:
-                    infected[neighbor] = step
-                    next_wave.append(neighbor)
-
-        if not next_wave:
-            break
+@instrumented()
+def visualize_group_network(network: SocialNetwork, title: str = "Réseau Social (vue par groupes)",
+                            highlight_nodes: Set[int] = None, show_legend: bool = True, max_links: int = 300):
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+    from matplotlib.patches import Patch
+
+    csr = network.get_csr()
+    nb_groups = len(network.groups)
+    sizes = np.bincount(csr.group_ids[csr.group_ids >= 0], minlength=nb_groups)
+    weights = csr.group_edge_counts(nb_groups)
+    internal = np.diag(weights)
+
+    highlighted = np.zeros(nb_groups, dtype=bool)
+    if highlight_nodes:
+        nodes = csr.indices_of(np.fromiter(highlight_nodes, dtype=np.int64, count=len(highlight_nodes)))
+        group_ids = csr.group_ids[nodes[nodes >= 0]]
+        highlighted[group_ids[group_ids >= 0]] = True
+
+    pos = _circular_positions(nb_groups)
+    a, b = np.triu_indices(nb_groups, k=1)
+    linked = weights[a, b] > 0
+    a, b, counts = a[linked], b[linked], weights[a, b][linked]
+    total_between = int(counts.sum())
+
+    # seuls les liens les plus forts sont tracés, sinon le centre du cercle devient une tache
+    if len(counts) > max_links:
+        strongest = np.sort(np.argpartition(-counts, max_links - 1)[:max_links])
+        a, b, counts = a[strongest], b[strongest], counts[strongest]
+
+    fig, ax = plt.subplots(figsize=(14, 10))
+    if len(counts):
+        spread = counts.max() - counts.min()
+        strength = (counts - counts.min()) / spread if spread else np.ones(len(counts))
+        edge_colors = np.zeros((len(counts), 4))
+        edge_colors[:, 3] = 0.1 + 0.6 * strength
+        ax.add_collection(LineCollection(np.stack((pos[a], pos[b]), axis=1), linewidths=0.5 + 5.5 * strength,
+                                         colors=edge_colors, zorder=1))
+        if len(counts) <= 60:
+            for u, v, count in zip(a.tolist(), b.tolist(), counts.tolist()):
+                middle = (pos[u] + pos[v]) / 2
+                ax.text(middle[0], middle[1], str(count), fontsize=8, ha='center', va='center', zorder=3,
+                        bbox=dict(boxstyle='round,pad=0.15', facecolor='white', alpha=0.7, linewidth=0))
+
+    colors = [get_group_color(i, nb_groups) for i in range(nb_groups)]
+    node_sizes = 300 + 3000 * np.sqrt(sizes / max(int(sizes.max()), 1)) if nb_groups else []
+    ax.scatter(pos[:, 0], pos[:, 1], s=node_sizes, c=colors, alpha=0.9, zorder=2, edgecolors="red",
+               linewidths=np.where(highlighted, 3.0, 0.0))
+    if nb_groups <= 50:
+        for i in range(nb_groups):
+            ax.text(pos[i, 0], pos[i, 1], f"{i + 1}\n{sizes[i]}", fontsize=9, fontweight='bold',
+                    ha='center', va='center', zorder=3)
+
+    if show_legend and nb_groups <= 40:
+        legend_elements = []
+        for i in range(nb_groups):
+            activity = network.group_activities.get(i, f"Groupe {i + 1}")
+            label = f'{i + 1}. {activity} ({sizes[i]} pers., {internal[i]} liens internes)'
+            legend_elements.append(Patch(facecolor=colors[i], label=label, alpha=0.9))
+        ax.legend(handles=legend_elements, loc='upper left',
+                  framealpha=0.95, fontsize=9, title="Groupes d'activités")
+
+    ax.autoscale_view()
+    ax.set_title(f"{title}\n{csr.n} personnes, {csr.m} liens, {total_between} liens entre groupes",
+                 fontsize=16, fontweight='bold', pad=20)
+    ax.axis('off')
+    plt.tight_layout()
+    plt.show()
 
-        current_wave = next_wave
-        propagation_steps.append(dict(infected))
-        new_infected_per_step.append(next_wave.copy())
 
-    fig = plt.figure(figsize=(16, 10))
-    gs = fig.add_gridspec(3, 2, height_ratios=[4, 0.3, 0.3], width_ratios=[3, 1])
+@dataclass
+class RumorFrames:
+    origin: int
+    probability: float
+    node_ids: np.ndarray
+    positions: np.ndarray
+    src: np.ndarray
+    dst: np.ndarray
+    infection_step: np.ndarray  # -1 : jamais infecté
+    edge_step: np.ndarray  # première étape où les deux extrémités sont infectées
+    node_colors: np.ndarray  # (étapes, n, 4)
+    node_sizes: np.ndarray  # (étapes, n)
+    new_nodes: List[np.ndarray]
+    labelled: np.ndarray
+    scale: float
+
+    @property
+    def n_frames(self) -> int:
+        return len(self.new_nodes)
+
+
+def build_rumor_frames(network: SocialNetwork, origin: int, probability: float = 0.7, max_steps: int = 10,
+                       label_threshold: int = 200, layout: str = "circular") -> Optional[RumorFrames]:
+    from matplotlib import colormaps
+    from matplotlib.colors import to_rgba
+
+    csr = network.get_csr()
+    origin_idx = csr.index_of(origin)
+    if origin_idx < 0:
+        return None
+
+    # même simulation que propagate_rumor, sans remplacer le dernier résultat de l'utilisateur
+    previous = network.rumor_state
+    try:
+        infected = network.propagate_rumor(origin, probability, max_steps)
+    finally:
+        network.rumor_state = previous
+    infection_step = np.full(csr.n, -1, dtype=np.int32)
+    infection_step[csr.indices_of(np.fromiter(infected, dtype=np.int64, count=len(infected)))] = list(
+        infected.values())
+    n_frames = int(infection_step.max()) + 1
+
+    src, dst = csr.edges()
+    never = np.iinfo(np.int32).max
+    edge_step = np.maximum(infection_step[src], infection_step[dst])
+    edge_step[(infection_step[src] < 0) | (infection_step[dst] < 0)] = never
+
+    # couleurs et tailles de chaque étape calculées une fois pour toutes
+    scale = 1.0 if csr.n <= label_threshold else max(0.01, label_threshold / csr.n)
+    reds = colormaps["Reds"]
+    node_colors = np.empty((n_frames, csr.n, 4), dtype=np.float32)
+    node_sizes = np.empty((n_frames, csr.n), dtype=np.float32)
+    new_nodes = []
+    for frame in range(n_frames):
+        current = (infection_step >= 0) & (infection_step <= frame)
+        node_colors[frame] = to_rgba('lightgray')
+        node_colors[frame, current] = reds(0.3 + 0.7 * infection_step[current] / max(frame, 1))
+
+        new = np.flatnonzero(infection_step == frame) if frame > 0 else np.empty(0, dtype=np.int64)
+        sizes = np.where(current, 600.0, 400.0)
+        sizes[new] = 900.0
+        sizes[origin_idx] = 1200.0
+        node_sizes[frame] = sizes * scale
+        new_nodes.append(new)
+
+    labelled = np.arange(csr.n) if csr.n <= label_threshold else np.array([origin_idx])
+    return RumorFrames(origin, probability, csr.node_ids, network.layout(layout), src, dst,
+                       infection_step, edge_step, node_colors, node_sizes, new_nodes, labelled, scale)
+
+
+class _RumorScene:
+    # artistes créés une seule fois ; chaque étape ne modifie que leurs tableaux
+    def __init__(self, fig, frames: RumorFrames):
+        from matplotlib.collections import LineCollection
+
+        self.frames = frames
+        gs = fig.add_gridspec(3, 2, height_ratios=[4, 0.3, 0.3], width_ratios=[3, 1])
+        self.ax_graph = fig.add_subplot(gs[0, :])
+        self.ax_progress = fig.add_subplot(gs[1, :])
+        self.ax_stats = fig.add_subplot(gs[2, :])
+
+        pos = frames.positions
+        thin = len(frames.src) > 5000
+        self.edge_widths = (0.3, 0.6) if thin else (1.5, 2.5)
+        self.edge_colors = (np.array([0.0, 0.0, 0.0, 0.1 if thin else 0.3]), np.array([1.0, 0.0, 0.0, 0.6]))
+
+        self.edges = LineCollection(np.stack((pos[frames.src], pos[frames.dst]), axis=1), zorder=1)
+        self.ax_graph.add_collection(self.edges)
+        self.nodes = self.ax_graph.scatter(pos[:, 0], pos[:, 1], s=frames.node_sizes[0], c=frames.node_colors[0],
+                                           alpha=0.9, linewidths=0, zorder=2)
+        self.rings = self.ax_graph.scatter([], [], s=1000 * frames.scale, facecolors='none', edgecolors='yellow',
+                                           linewidths=4, zorder=3)
+        self.labels = [self.ax_graph.text(pos[idx, 0], pos[idx, 1], str(frames.node_ids[idx]), fontsize=9,
+                                          fontweight='bold', ha='center', va='center', zorder=4)
+                       for idx in frames.labelled.tolist()]
+
+        # titre dans le cadre des axes : il est effacé avec le fond lors du blitting
+        self.ax_graph.set_xlim(-1.1, 1.1)
+        self.ax_graph.set_ylim(-1.1, 1.35)
+        self.ax_graph.axis('off')
+        self.title = self.ax_graph.text(0.5, 0.99, "", transform=self.ax_graph.transAxes, ha='center', va='top',
+                                        fontsize=14, fontweight='bold', zorder=5)
+
+        self.done_bar = self.ax_progress.barh([0], [0], color='green', alpha=0.7, height=0.5).patches[0]
+        self.todo_bar = self.ax_progress.barh([0], [1], color='lightgray', alpha=0.3, height=0.5).patches[0]
+        self.ax_progress.set_xlim(0, 1)
+        self.ax_progress.set_ylim(-0.5, 0.5)
+        self.ax_progress.set_yticks([])
+        self.ax_progress.set_xticks([0, 0.25, 0.5, 0.75, 1])
+        self.ax_progress.set_xticklabels(['0%', '25%', '50%', '75%', '100%'])
+        self.ax_progress.set_title('Progression de l\'animation', fontsize=10, pad=5)
+
+        self.ax_stats.axis('off')
+        self.stats = self.ax_stats.text(0.5, 0.5, "", fontsize=11, ha='center', va='center',
+                                        bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+        fig.tight_layout()
+
+    def artists(self) -> List[Any]:
+        return [self.edges, self.nodes, self.rings, *self.labels, self.title, self.done_bar, self.todo_bar,
+                self.stats]
+
+    def draw(self, frame: int) -> List[Any]:
+        frames = self.frames
+        last = frames.n_frames - 1
+        infected_edges = frames.edge_step <= frame
+        self.edges.set_color(np.where(infected_edges[:, None], *self.edge_colors[::-1]))
+        self.edges.set_linewidth(np.where(infected_edges, self.edge_widths[1], self.edge_widths[0]))
+        self.nodes.set_facecolor(frames.node_colors[frame])
+        self.nodes.set_sizes(frames.node_sizes[frame])
+        self.rings.set_offsets(frames.positions[frames.new_nodes[frame]].reshape(-1, 2))
+
+        infected_count = int(np.count_nonzero((frames.infection_step >= 0) & (frames.infection_step <= frame)))
+        total_count = len(frames.node_ids)
+        coverage = (infected_count / total_count) * 100
+        self.title.set_text(f"Propagation de la rumeur - Étape {frame}/{last}\n"
+                            f"Infectés: {infected_count}/{total_count} ({coverage:.1f}%) | "
+                            f"Origine: Utilisateur {frames.origin} | Probabilité: {frames.probability:.0%}")
 
-    ax_graph = fig.add_subplot(gs[0, :])
-    ax_progress = fig.add_subplot(gs[1, :])
-    ax_stats = fig.add_subplot(gs[2, :])
+        progress = frame / last if last > 0 else 1
+        self.done_bar.set_width(progress)
+        self.todo_bar.set_x(progress)
+        self.todo_bar.set_width(1 - progress)
 
-    pos = nx.circular_layout(G)
-    cmap = plt.cm.Reds
+        if frame > 0:
+            new_users = sorted(frames.node_ids[frames.new_nodes[frame]].tolist())
+            stats_text = f"[Étape {frame}] {len(new_users)} nouvelle(s) personne(s) infectée(s)\n"
+            stats_text += f"Nouveaux: {new_users if len(new_users) <= 30 else new_users[:30] + ['…']}"
+        else:
+            stats_text = f"[Étape 0] Rumeur lancée par l'utilisateur {frames.origin}"
+        self.stats.set_text(stats_text)
 
-    def update(frame):
-        ax_graph.clear()
-        ax_progress.clear()
-        ax_stats.clear()
+        return self.artists()
 
-        current_infected = propagation_steps[frame]
-        max_step = max(current_infected.values()) if current_infected else 1
 
-        node_colors = []
-        for node in G.nodes():
-            if node in current_infected:
-                intensity = current_infected[node] / max(max_step, 1)
-                node_colors.append(cmap(0.3 + 0.7 * intensity))
-            else:
-                node_colors.append('lightgray')
-
-        node_sizes = []
-        for node in G.nodes():
-            if node == origin:
-                node_sizes.append(1200)
-            elif frame > 0 and node in new_infected_per_step[frame]:
-                node_sizes.append(900)
-            elif node in current_infected:
-                node_sizes.append(600)
-            else:
-                node_sizes.append(400)
+def _render_rumor_task(shared: Dict[str, Any], frame_ids: List[int]) -> List[Tuple[int, np.ndarray]]:
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
 
-        normal_edges = []
-        infected_edges = []
+    # rendu hors écran : Figure + Agg, sans pyplot ni fenêtre
+    fig = Figure(figsize=(16, 10), dpi=shared["dpi"])
+    canvas = FigureCanvasAgg(fig)
+    scene = _RumorScene(fig, shared["rumor_frames"])
 
-        for edge in G.edges():
-            if edge[0] in current_infected and edge[1] in current_infected:
-                infected_edges.append(edge)
-            else:
-                normal_edges.append(edge)
+    rendered = []
+    for frame in frame_ids:
+        scene.draw(frame)
+        canvas.draw()
+        rendered.append((frame, np.asarray(canvas.buffer_rgba()).copy()))
+    return rendered
 
-        nx.draw_networkx_edges(G, pos, edgelist=normal_edges, alpha=0.3, width=1.5, ax=ax_graph)
 
-        nx.draw_networkx_edges(G, pos, edgelist=infected_edges, edge_color='red',
-                               alpha=0.6, width=2.5, ax=ax_graph)
+@instrumented()
+def export_rumor_animation(frames: RumorFrames, path: str, fps: float = 1.0, dpi: int = 80,
+                           workers: int = None) -> int:
+    import subprocess
 
-        nx.draw_networkx_nodes(G, pos, node_color=node_colors,
-                               node_size=node_sizes, alpha=0.9, ax=ax_graph)
-        nx.draw_networkx_labels(G, pos, font_size=9, font_weight='bold', ax=ax_graph)
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in (".gif", ".mp4"):
+        raise ValueError(f"format d'animation non pris en charge : {extension or path}")
+    if extension == ".mp4" and shutil.which("ffmpeg") is None:
+        raise ValueError("ffmpeg est nécessaire pour l'export MP4")
 
-        if frame > 0 and new_infected_per_step[frame]:
-            new_positions = {node: pos[node] for node in new_infected_per_step[frame]}
-            nx.draw_networkx_nodes(G, new_positions,
-                                   nodelist=new_infected_per_step[frame],
-                                   node_color='none',
-                                   edgecolors='yellow', linewidths=4,
-                                   node_size=1000, ax=ax_graph)
+    workers = _resolve_workers(workers, frames.n_frames)
+    tasks = [list(range(start, frames.n_frames, workers)) for start in range(workers)]
+    images = [None] * frames.n_frames
+    for rendered in _parallel_map(_render_rumor_task, tasks, {"rumor_frames": frames, "dpi": dpi}, workers):
+        for frame, image in rendered:
+            images[frame] = image
 
-        infected_count = len(current_infected)
-        total_count = G.number_of_nodes()
-        coverage = (infected_count / total_count) * 100
+    if extension == ".gif":
+        from PIL import Image
 
-        ax_graph.set_title(f"Propagation de la rumeur - Étape {frame}/{len(propagation_steps) - 1}\n"
-                           f"Infectés: {infected_count}/{total_count} ({coverage:.1f}%) | "
-                           f"Origine: Utilisateur {origin} | Probabilité: {probability:.0%}",
-                           fontsize=14, fontweight='bold', pad=20)
-        ax_graph.axis('off')
+        pictures = [Image.fromarray(image).convert("RGB") for image in images]
+        pictures[0].save(path, save_all=True, append_images=pictures[1:], duration=int(1000 / fps), loop=0)
+    else:
+        height, width = images[0].shape[:2]
+        command = ["ffmpeg", "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgba",
+                   "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+                   "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p", "-vcodec", "libx264", path]
+        subprocess.run(command, input=b"".join(image.tobytes() for image in images), check=True)
 
-        progress = frame / (len(propagation_steps) - 1) if len(propagation_steps) > 1 else 1
-        ax_progress.barh([0], [progress], color='green', alpha=0.7, height=0.5)
-        ax_progress.barh([0], [1 - progress], left=[progress], color='lightgray', alpha=0.3, height=0.5)
-        ax_progress.set_xlim(0, 1)
-        ax_progress.set_ylim(-0.5, 0.5)
-        ax_progress.set_yticks([])
-        ax_progress.set_xticks([0, 0.25, 0.5, 0.75, 1])
-        ax_progress.set_xticklabels(['0%', '25%', '50%', '75%', '100%'])
-        ax_progress.set_title('Progression de l\'animation', fontsize=10, pad=5)
+    return frames.n_frames
 
-        ax_stats.axis('off')
 
-        if frame > 0:
-            new_count = len(new_infected_per_step[frame])
-            stats_text = f"[Étape {frame}] {new_count} nouvelle(s) personne(s) infectée(s)\n"
-            stats_text += f"Nouveaux: {sorted(new_infected_per_step[frame])}"
-        else:
-            stats_text = f"[Étape 0] Rumeur lancée par l'utilisateur {origin}"
+@instrumented()
+def visualize_rumor_propagation_realtime(network: SocialNetwork, origin: int, probability: float = 0.7,
+                                         max_steps: int = 10, layout: str = "circular"):
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
 
-        ax_stats.text(0.5, 0.5, stats_text,
-                      fontsize=11, ha='center', va='center',
-                      bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+    frames = build_rumor_frames(network, origin, probability, max_steps, layout=layout)
+    if frames is None:
+        print(f"L'utilisateur {origin} n'existe pas dans le réseau.")
+        return
 
-    frames_count = len(propagation_steps)
+    fig = plt.figure(figsize=(16, 10))
+    scene = _RumorScene(fig, frames)
+    frames_count = frames.n_frames
 
     print(f"\n[Animation] Propagation sur {frames_count} étapes...")
     print("   Fermez la fenêtre pour continuer.")
 
-    anim = FuncAnimation(fig, update, frames=frames_count,
-                         interval=1500, repeat=True)
+    anim = FuncAnimation(fig, scene.draw, frames=frames_count, init_func=lambda: scene.draw(0),
+                         interval=1500, repeat=True, blit=True)
 
-    plt.tight_layout()
     plt.show()
 
-    final_infected = propagation_steps[-1]
-    total_users = G.number_of_nodes()
-    infected_count = len(final_infected)
+    new_infected_per_step = [[origin]] + [frames.node_ids[new].tolist() for new in frames.new_nodes[1:]]
+    infected_count = int(np.count_nonzero(frames.infection_step >= 0))
+    total_users = len(frames.node_ids)
     non_infected_count = total_users - infected_count
     coverage = (infected_count / total_users) * 100
     non_coverage = (non_infected_count / total_users) * 100
@@ -390,14 +4074,11 @@ def visualize_rumor_propagation_realtime(network: SocialNetwork, origin: int, pr
     print(f"   - Total utilisateurs dans le réseau : {total_users}")
     print(f"   - Utilisateurs infectés : {infected_count} ({coverage:.2f}%)")
     print(f"   - Utilisateurs non-infectés : {non_infected_count} ({non_coverage:.2f}%)")
-    print(f"   - Nombre d'étapes de propagation : {len(propagation_steps) - 1}")
+    print(f"   - Nombre d'étapes de propagation : {frames_count - 1}")
     print(f"   - Probabilité de transmission : {probability:.0%}")
 
-    infected_edges_count = 0
-    total_edges = G.number_of_edges()
-    for edge in G.edges():
-        if edge[0] in final_infected and edge[1] in final_infected:
-            infected_edges_count += 1
+    infected_edges_count = int(np.count_nonzero(frames.edge_step < frames_count))
+    total_edges = len(frames.src)
 
     print(f"\n[Analyse du réseau infecté]")
     print(f"   - Connexions totales dans le réseau : {total_edges}")
@@ -407,8 +4088,8 @@ def visualize_rumor_propagation_realtime(network: SocialNetwork, origin: int, pr
         print(f"   - Connexions moyennes par infecté : {avg_connections:.2f}")
 
     print(f"\n[Vitesse de propagation]")
-    if len(propagation_steps) > 1:
-        avg_new_per_step = infected_count / (len(propagation_steps) - 1)
+    if frames_count > 1:
+        avg_new_per_step = infected_count / (frames_count - 1)
         print(f"   - Moyenne de nouvelles infections par étape : {avg_new_per_step:.2f}")
 
         max_new_infections = max(len(step) for step in new_infected_per_step[1:]) if len(
@@ -446,7 +4127,7 @@ def menu_friend_recommendations(network: SocialNetwork):
     else:
         print("   Aucun ami pour le moment.")
 
-    recommendations = network.reco_friend(user_id)
+    recommendations = network.get_friend_recommendations(user_id)
 
     farthest_user, distance = network.get_farthest_person(user_id)
 
@@ -494,15 +4175,12 @@ def menu_find_cliques(network: SocialNetwork):
     max_size = ask_positive_int("\n> Taille MAXIMALE des cercles à détecter : ", 3)
 
     print("\n[Recherche en cours...]")
-    cliques = network.find_cliques(max_size)
-
-    if cliques:
-        print(f"\n[RÉSULTATS] {len(cliques)} cercle(s) complet(s) trouvé(s) de taille <= {max_size}")
+    # seuls les 10 plus grands sont affichés : inutile d'énumérer tous les cercles
+    cliques_sorted = network.largest_cliques(10, max_size)
 
-        cliques_sorted = sorted(cliques, key=len, reverse=True)
-
-        print(f"\n[TOP 10 DES CERCLES LES PLUS GRANDS (taille <= {max_size})]")
-        for i, clique in enumerate(cliques_sorted[:10], 1):
+    if cliques_sorted:
+        print(f"\n[TOP {len(cliques_sorted)} DES CERCLES LES PLUS GRANDS (taille <= {max_size})]")
+        for i, clique in enumerate(cliques_sorted, 1):
             clique_list = sorted(clique)
             print(f"\n   Cercle #{i} - Taille : {len(clique)} personnes")
             print(f"   Membres : {clique_list}")
@@ -518,9 +4196,6 @@ def menu_find_cliques(network: SocialNetwork):
                 if len(connections) > 10:
                     print(f" (+ {len(connections) - 10} autres connexions)")
 
-        if len(cliques) > 10:
-            print(f"\n   ... et {len(cliques) - 10} autre(s) cercle(s)")
-
         largest_clique = cliques_sorted[0]
         print(f"\n[VISUALISATION DU PLUS GRAND CERCLE (taille <= {max_size})]")
         print(f"   Taille : {len(largest_clique)} personnes")
@@ -564,45 +4239,68 @@ def menu_rumor_propagation(network: SocialNetwork):
     visualize_rumor_propagation_realtime(network, origin, probability, max_steps)
 
 
-def analyze_graph(G: nx.Graph, groups: List[List[int]], group_activities: Dict[int, str]):
+def menu_rumor_seeds(network: SocialNetwork):
     print("\n" + "=" * 60)
-    print("[ANALYSE DU RÉSEAU SOCIAL]")
+    print("[MEILLEURS DIFFUSEURS POUR UNE RUMEUR]")
     print("=" * 60)
 
-    print(f"\n[Statistiques globales]")
-    print(f"   - Nombre de personnes : {G.number_of_nodes()}")
-    print(f"   - Nombre de connexions : {G.number_of_edges()}")
-    print(f"   - Réseau connexe : {'Oui' if nx.is_connected(G) else 'Non'}")
-    print(f"   - Densité du réseau : {nx.density(G):.2%}")
+    k = ask_positive_int("\n> Nombre de personnes à choisir : ", 1)
+    probability = ask_float("> Probabilité de partage (0.0 - 1.0) : ", 0.0, 1.0)
+    max_steps = ask_positive_int("> Nombre maximum d'étapes : ", 1)
 
-    degrees = dict(G.degree())
-    avg_degree = sum(degrees.values()) / G.number_of_nodes()
-    print(f"   - Degré moyen : {avg_degree:.2f} amis par personne")
+    print("\n[Recherche en cours...]")
+    selection = network.select_rumor_seeds(k, probability, max_steps, time_budget=10.0)
+    total_users = network.G.number_of_nodes()
+
+    print(f"\n[RÉSULTATS] ({selection.n_samples} échantillons en {selection.elapsed:.1f}s)")
+    for i, (user, gain, total) in enumerate(zip(selection.seeds, selection.marginal_spread,
+                                                selection.cumulative_spread), 1):
+        print(f"   {i}. Utilisateur {user} : +{gain:.1f} personne(s) (total attendu : {total:.1f}, "
+              f"{total / total_users:.1%})")
 
-    max_degree_user = max(degrees.items(), key=lambda x: x[1])
-    min_degree_user = min(degrees.items(), key=lambda x: x[1])
+    colors = {node: 'red' if node in selection.seeds else 'lightgray' for node in network.G.nodes()}
+    visualize_network(network, highlight_nodes=set(selection.seeds), highlight_colors=colors,
+                      title=f"Meilleurs diffuseurs ({len(selection.seeds)} personnes)\n"
+                            f"Portée attendue : {selection.expected_spread:.1f} personnes")
 
+
+def render_graph_report(report: GraphReport):
+    print("\n" + "=" * 60)
+    print("[ANALYSE DU RÉSEAU SOCIAL]")
+    print("=" * 60)
+
+    print(f"\n[Statistiques globales]")
+    print(f"   - Nombre de personnes : {report.n_nodes}")
+    print(f"   - Nombre de connexions : {report.n_edges}")
+    print(f"   - Réseau connexe : {'Oui' if report.is_connected else 'Non'}")
+    print(f"   - Densité du réseau : {report.density:.2%}")
+    print(f"   - Degré moyen : {report.avg_degree:.2f} amis par personne")
+    if report.group_clustering is not None:
+        print(f"   - Transitivité (amis d'amis qui sont amis) : {report.transitivity:.2%}")
+        print(f"   - Coefficient de regroupement moyen : {report.average_clustering:.2%}")
+
+    max_degree_user = report.max_degree_user
+    min_degree_user = report.min_degree_user
     print(f"   - Personne avec le plus d'amis : Utilisateur {max_degree_user[0]} ({max_degree_user[1]} amis)")
     print(f"   - Personne avec le moins d'amis : Utilisateur {min_degree_user[0]} ({min_degree_user[1]} amis)")
 
-    top_connected = sorted(degrees.items(), key=lambda x: x[1], reverse=True)[:5]
-    print(f"\n[Les 5 personnes avec le plus de connexions]")
-    for i, (user, degree) in enumerate(top_connected, 1):
+    print(f"\n[Les {len(report.top_connected)} personnes avec le plus de connexions]")
+    for i, (user, degree) in enumerate(report.top_connected, 1):
         print(f"   {i}. Utilisateur {user} : {degree} amis")
 
+    if report.bridges:
+        print(f"\n[Les {len(report.bridges)} personnes qui relient le plus le réseau (intermédiarité estimée)]")
+        for i, (user, score) in enumerate(report.bridges, 1):
+            print(f"   {i}. Utilisateur {user} : {score:.4f}")
+
     print(f"\n[Connexions inter-groupes]")
-    for i in range(len(groups)):
-        for j in range(i + 1, len(groups)):
-            inter_edges = 0
-            for node_i in groups[i]:
-                for node_j in groups[j]:
-                    if G.has_edge(node_i, node_j):
-                        inter_edges += 1
-            activity_i = group_activities.get(i, f"Groupe {i + 1}")
-            activity_j = group_activities.get(j, f"Groupe {j + 1}")
-            print(f"   {activity_i} <-> {activity_j} : {inter_edges} connexion(s)")
-
-    print(f"\n[Composition des groupes ({len(groups)} groupes)]")
+    nb_groups = len(report.groups)
+    for i in range(nb_groups):
+        for j in range(i + 1, nb_groups):
+            print(f"   {report.group_names[i]} <-> {report.group_names[j]} : "
+                  f"{report.inter_group_edges[i, j]} connexion(s)")
+
+    print(f"\n[Composition des groupes ({nb_groups} groupes)]")
     print("=" * 60)
 
     color_codes = [
@@ -616,20 +4314,23 @@ def analyze_graph(G: nx.Graph, groups: List[List[int]], group_activities: Dict[i
     ]
     reset_code = '\033[0m'
 
-    for i, group in enumerate(groups):
-        subgraph = G.subgraph(group)
-        internal_edges = subgraph.number_of_edges()
-
+    for i, group in enumerate(report.groups):
         color = color_codes[i % len(color_codes)]
-        activity = group_activities.get(i, f"Groupe {i + 1}")
 
-        print(f"{color}   [{activity}]{reset_code}")
+        print(f"{color}   [{report.group_names[i]}]{reset_code}")
         print(f"      - Membres : {sorted(group)}")
         print(f"      - Taille : {len(group)} personnes")
-        print(f"      - Connexions internes : {internal_edges}")
+        print(f"      - Connexions internes : {report.internal_edges[i]}")
+        if report.group_clustering is not None:
+            print(f"      - Regroupement moyen : {report.group_clustering[i]:.2%}")
         print()
 
 
+@instrumented()
+def analyze_graph(G: nx.Graph, groups: List[List[int]], group_activities: Dict[int, str]):
+    render_graph_report(build_graph_report(CSRGraph.from_networkx(G, groups), groups, group_activities))
+
+
 def interactive_menu():
     network = None
 
@@ -644,6 +4345,9 @@ def interactive_menu():
         print(" - 4. Recommandation d'amis potentiels")
         print(" - 5. Détecter les cercles d'amis complets")
         print(" - 6. Simuler la propagation d'une rumeur (TEMPS RÉEL)")
+        print(" - 7. Trouver les meilleurs diffuseurs d'une rumeur")
+        print(" - 8. Sauvegarder le réseau actuel")
+        print(" - 9. Charger un réseau sauvegardé")
         print(" - 0. Quitter")
 
         choice = input("\n> Votre choix : ").strip()
@@ -674,7 +4378,7 @@ def interactive_menu():
             if network is None:
                 print("\nAucun réseau n'a été généré. Veuillez d'abord générer un réseau (option 1).")
             else:
-                analyze_graph(network.G, network.groups, network.group_activities)
+                render_graph_report(network.graph_report())
 
         elif choice == "4":
             if network is None:
@@ -694,6 +4398,31 @@ def interactive_menu():
             else:
                 menu_rumor_propagation(network)
 
+        elif choice == "7":
+            if network is None:
+                print("\nAucun réseau n'a été généré. Veuillez d'abord générer un réseau (option 1).")
+            else:
+                menu_rumor_seeds(network)
+
+        elif choice == "8":
+            if network is None:
+                print("\nAucun réseau n'a été généré. Veuillez d'abord générer un réseau (option 1).")
+            else:
+                path = input("\n> Fichier de sauvegarde : ").strip()
+                try:
+                    save_network(network, path)
+                    print(f"\n[Réseau sauvegardé dans {path}]")
+                except OSError as error:
+                    print(f"\nErreur : impossible d'écrire {path} ({error})")
+
+        elif choice == "9":
+            path = input("\n> Fichier à charger : ").strip()
+            try:
+                network = load_network(path)
+                print(f"\n[Réseau chargé : {network.get_csr().n} personnes, {network.get_csr().m} connexions]")
+            except (OSError, ValueError) as error:
+                print(f"\nErreur : impossible de charger {path} ({error})")
+
         elif choice == "0":
             print("\nMerci d'avoir utilisé Social-Link.")
             break
@@ -702,5 +4431,1298 @@ def interactive_menu():
             print("\nChoix invalide. Veuillez réessayer.")
 
 
+SWEEP_MAGIC = b"SLSWEEP1"
+SWEEP_COLUMNS = ("step", "new_mean", "infected_mean", "infected_std", "infected_p05", "infected_p95")
+
+
+@dataclass
+class SweepProgress:
+    cells_done: int
+    cells_total: int
+    cells_resumed: int  # cellules déjà présentes dans le fichier, non recalculées
+    simulations: int
+    elapsed: float
+    simulations_per_second: float
+
+
+def _sweep_cell_key(origins: Tuple[int, ...], probability: float, max_steps: int) -> str:
+    return f"{'+'.join(map(str, origins))}|{probability!r}|{max_steps}"
+
+
+def _sweep_cell_seed(seed: int, key: str) -> np.random.SeedSequence:
+    # graine dérivée des paramètres de la cellule : indépendante de l'ordre de la grille et du nombre de processus
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+    return np.random.SeedSequence(seed, spawn_key=tuple(np.frombuffer(digest[:16], dtype="<u4").tolist()))
+
+
+def _sweep_cell_task(shared: Dict[str, Any], task: Tuple[str, np.random.SeedSequence, np.ndarray, float, int, int]) -> Tuple[
+        str, Dict[str, np.ndarray]]:
+    key, seed_seq, origins, probability, max_steps, n_simulations = task
+    offsets, indices = shared["offsets"], shared["indices"]
+
+    # nouvelles infections par simulation et par pas, par lots de 64 cascades bit-parallèles
+    batches = [min(64, n_simulations - start) for start in range(0, n_simulations, 64)]
+    new = np.zeros((n_simulations, max_steps + 1), dtype=np.int64)
+    row = 0
+    for batch_seed, size in zip(seed_seq.spawn(len(batches)), batches):
+        start_nodes = np.tile(origins, size)
+        start_cols = np.repeat(np.arange(size), len(origins))
+        for step, _, words in _simulate_cascades(offsets, indices, start_nodes, start_cols, probability, max_steps,
+                                                 np.random.default_rng(batch_seed)):
+            new[row:row + size, step] = _unpack_words(words).sum(axis=0, dtype=np.int64)[:size]
+        row += size
+
+    infected = np.cumsum(new, axis=1)
+    columns = {
+        "step": np.arange(max_steps + 1, dtype=np.int32),
+        "new_mean": new.mean(axis=0),
+        "infected_mean": infected.mean(axis=0),
+        "infected_std": infected.std(axis=0),
+        "infected_p05": np.quantile(infected, 0.05, axis=0),
+        "infected_p95": np.quantile(infected, 0.95, axis=0),
+    }
+    return key, columns
+
+
+def _open_sweep_file(path: str, meta: Dict[str, Any]) -> Tuple[Any, Set[str]]:
+    # le fichier de résultats sert aussi de point de reprise : un bloc par cellule terminée,
+    # un bloc tronqué (arrêt brutal) est coupé à l'ouverture
+    done = set()
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        f = open(path, "wb")
+        header = json.dumps(meta).encode("utf-8")
+        f.write(SWEEP_MAGIC + len(header).to_bytes(8, "little") + header)
+        f.flush()
+        return f, done
+
+    f = open(path, "r+b")
+    if f.read(len(SWEEP_MAGIC)) != SWEEP_MAGIC:
+        f.close()
+        raise ValueError(f"{path} n'est pas un fichier de balayage Social-Link")
+    stored = json.loads(f.read(int.from_bytes(f.read(8), "little")).decode("utf-8"))
+    if stored != meta:
+        f.close()
+        raise ValueError(f"{path} a été produit avec d'autres réglages : {stored}")
+
+    size = os.path.getsize(path)
+    end = f.tell()
+    for block, block_end in _iter_sweep_blocks(f, size):
+        done.add(block["key"])
+        end = block_end
+    f.seek(end)
+    f.truncate()
+    return f, done
+
+
+def _iter_sweep_blocks(f, size: int) -> Iterator[Tuple[Dict[str, Any], int]]:
+    # bloc : longueur de l'en-tête JSON, en-tête, puis les colonnes brutes les unes après les autres
+    while f.tell() + 8 <= size:
+        length = int.from_bytes(f.read(8), "little")
+        if f.tell() + length > size:
+            return
+        block = json.loads(f.read(length).decode("utf-8"))
+        data_size = sum(np.dtype(spec["dtype"]).itemsize * spec["count"] for spec in block["columns"].values())
+        if f.tell() + data_size > size:
+            return
+        block["data"] = f.read(data_size)
+        yield block, f.tell()
+
+
+def _write_sweep_block(f, key: str, origins: List[int], probability: float, max_steps: int, n_simulations: int,
+                       columns: Dict[str, np.ndarray]):
+    block = {"key": key, "origins": origins, "probability": probability, "max_steps": max_steps,
+             "n_simulations": n_simulations,
+             "columns": {name: {"dtype": array.dtype.str, "count": len(array)} for name, array in columns.items()}}
+    header = json.dumps(block).encode("utf-8")
+    f.write(len(header).to_bytes(8, "little") + header + b"".join(array.tobytes() for array in columns.values()))
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def load_sweep_results(path: str) -> Dict[str, np.ndarray]:
+    # une ligne par (cellule, pas) ; les paramètres de la cellule sont répétés en colonnes
+    parts = {name: [] for name in ("origins", "probability", "max_steps", "n_simulations") + SWEEP_COLUMNS}
+    with open(path, "rb") as f:
+        if f.read(len(SWEEP_MAGIC)) != SWEEP_MAGIC:
+            raise ValueError(f"{path} n'est pas un fichier de balayage Social-Link")
+        f.seek(int.from_bytes(f.read(8), "little"), os.SEEK_CUR)
+        for block, _ in _iter_sweep_blocks(f, os.path.getsize(path)):
+            position = 0
+            columns = {}
+            for name, spec in block["columns"].items():
+                columns[name] = np.frombuffer(block["data"], dtype=spec["dtype"], count=spec["count"], offset=position)
+                position += columns[name].nbytes
+
+            rows = len(columns["step"])
+            parts["origins"].append(np.full(rows, "+".join(map(str, block["origins"]))))
+            parts["probability"].append(np.full(rows, block["probability"], dtype=np.float64))
+            parts["max_steps"].append(np.full(rows, block["max_steps"], dtype=np.int32))
+            parts["n_simulations"].append(np.full(rows, block["n_simulations"], dtype=np.int64))
+            for name in SWEEP_COLUMNS:
+                parts[name].append(columns[name])
+
+    return {name: np.concatenate(values) if values else np.empty(0) for name, values in parts.items()}
+
+
+@instrumented()
+def run_rumor_sweep(network: SocialNetwork, path: str, origins: List[Union[int, List[int]]],
+                    probabilities: List[float], max_steps: List[int], n_simulations: int = 1000, seed: int = 0,
+                    workers: int = None, progress: Callable[[SweepProgress], None] = None) -> SweepProgress:
+    csr = network.get_csr()
+    origin_sets = [tuple([origin] if isinstance(origin, (int, np.integer)) else origin) for origin in origins]
+    unknown = sorted({user for users in origin_sets for user in users if csr.index_of(user) < 0})
+    if unknown:
+        raise ValueError(f"origines inconnues : {unknown}")
+
+    cells = [(users, float(probability), int(steps)) for users in origin_sets for probability in probabilities
+             for steps in max_steps]
+    meta = {"format": 1, "seed": seed, "n_simulations": n_simulations, "n_nodes": csr.n, "n_edges": csr.m}
+    f, done = _open_sweep_file(path, meta)
+
+    started = time.perf_counter()
+    pending = {}
+    for users, probability, steps in cells:
+        key = _sweep_cell_key(users, probability, steps)
+        if key not in done and key not in pending:
+            pending[key] = (list(users), probability, steps)
+    resumed = len({_sweep_cell_key(*cell) for cell in cells}) - len(pending)
+    state = SweepProgress(resumed, resumed + len(pending), resumed, 0, 0.0, 0.0)
+
+    tasks = [(key, _sweep_cell_seed(seed, key), csr.indices_of(users), probability, steps, n_simulations)
+             for key, (users, probability, steps) in pending.items()]
+    try:
+        for key, columns in _parallel_map(_sweep_cell_task, tasks, csr.shared_arrays(), workers):
+            users, probability, steps = pending[key]
+            _write_sweep_block(f, key, users, probability, steps, n_simulations, columns)
+
+            state.cells_done += 1
+            state.simulations += n_simulations
+            state.elapsed = time.perf_counter() - started
+            state.simulations_per_second = state.simulations / state.elapsed if state.elapsed > 0 else 0.0
+            METRICS.count("simulations", n_simulations)
+            if progress is not None:
+                progress(state)
+    finally:
+        f.close()
+
+    state.elapsed = time.perf_counter() - started
+    return state
+
+
+# les noms sans suffixe mesurent les fonctions du menu, sur un réseau networkx comme celui du menu ;
+# les noyaux sur tableaux (CSR) ont leur propre nom
+BENCHMARK_OPERATIONS = ["generate", "sample_edges", "recommend", "recommend_csr", "recommend_batch", "farthest",
+                        "farthest_csr", "farthest_batch", "cliques", "cliques_top", "rumor", "rumor_csr", "rumor_mc",
+                        "analyze", "graph_report"]
+
+
+@dataclass
+class BenchmarkResult:
+    operation: str
+    scale: int
+    nb_groups: int
+    p_in: float
+    n_nodes: int
+    n_edges: int
+    seconds: float
+    peak_memory: Optional[int]
+    items: int
+    throughput: float
+
+
+def _benchmark_max_people(scale: int, nb_groups: int) -> int:
+    return max(5, round(2 * scale / nb_groups) - 5)
+
+
+class _BenchmarkNetworks:
+    def __init__(self, scale: int, nb_groups: int, p_in: float, seed: int):
+        src, dst, sizes, group_activities = sample_social_edges(nb_groups, _benchmark_max_people(scale, nb_groups),
+                                                                p_in, seed)
+        group_ids = np.repeat(np.arange(nb_groups, dtype=np.int32), sizes)
+        self.csr = SocialNetwork.from_csr(CSRGraph.from_edges(int(sizes.sum()), src, dst, group_ids),
+                                          group_activities, cache_size=0)
+        self._nx = None
+
+    # même graphe, sous forme networkx : construit seulement si une opération du menu est mesurée
+    @property
+    def nx(self) -> SocialNetwork:
+        if self._nx is None:
+            csr = self.csr.get_csr()
+            self._nx = SocialNetwork(csr.to_networkx(), csr.groups_from_ids(), self.csr.group_activities,
+                                     cache_size=0)
+        return self._nx
+
+
+def _benchmark_operation(operation: str, networks: _BenchmarkNetworks, scale: int, nb_groups: int, p_in: float,
+                         seed: int, workers: int) -> int:
+    network = networks.csr
+    csr = network.get_csr()
+    rng = np.random.default_rng(seed)
+    sample = csr.node_ids[rng.integers(0, csr.n, size=min(csr.n, 500))].tolist()
+
+    if operation == "generate":
+        random.seed(seed)
+        return generate_social_graph(nb_groups, _benchmark_max_people(scale, nb_groups), p_in)[0].number_of_edges()
+    if operation == "sample_edges":
+        return _BenchmarkNetworks(scale, nb_groups, p_in, seed).csr.get_csr().m
+    if operation in ("recommend", "recommend_csr"):
+        target = networks.nx if operation == "recommend" else network
+        for user in sample:
+            target.get_friend_recommendations(user)
+        return len(sample)
+    if operation == "recommend_batch":
+        users = csr.node_ids[:min(csr.n, 20000)]
+        return sum(len(chunk) for chunk in network.iter_friend_recommendations(users))
+    if operation in ("farthest", "farthest_csr"):
+        target = networks.nx if operation == "farthest" else network
+        for user in sample[:50]:
+            target.get_farthest_person(user)
+        return len(sample[:50])
+    if operation == "farthest_batch":
+        return len(network.get_farthest_persons(sample[:256], workers=workers))
+    if operation == "cliques":
+        return len(networks.nx.find_cliques(10))
+    if operation == "cliques_top":
+        return len(network.largest_cliques(10, workers=workers))
+    if operation in ("rumor", "rumor_csr"):
+        target = networks.nx if operation == "rumor" else network
+        random.seed(seed)
+        for user in sample[:50]:
+            target.propagate_rumor(user, 0.3, 10)
+        return len(sample[:50])
+    if operation == "rumor_mc":
+        network.estimate_rumor_spread(sample[0], 0.3, 10, 512, seed, workers)
+        return 512
+    if operation == "analyze":
+        # le rapport est affiché par analyze_graph : on le jette, seul le calcul et la mise en forme comptent
+        with redirect_stdout(io.StringIO()):
+            analyze_graph(networks.nx.G, networks.nx.groups, networks.nx.group_activities)
+        return csr.m
+    if operation == "graph_report":
+        return network.graph_report().n_edges
+    raise ValueError(f"opération inconnue : {operation}")
+
+
+def run_benchmarks(scales: List[int], group_counts: List[int] = None, p_ins: List[float] = None,
+                   operations: List[str] = None, seed: int = 42, workers: int = 1, repeat: int = 1,
+                   track_memory: bool = True, progress: Callable[[BenchmarkResult], None] = None) -> List[
+        BenchmarkResult]:
+    # passage à blanc : imports paresseux (scipy…) et premiers appels hors mesure
+    warmup = _BenchmarkNetworks(200, 4, 0.2, seed)
+    for operation in operations or BENCHMARK_OPERATIONS:
+        _benchmark_operation(operation, warmup, 200, 4, 0.2, seed, workers)
+
+    results = []
+    for scale in scales:
+        for nb_groups in group_counts or [max(4, round(scale ** 0.5 / 2))]:
+            # par défaut, environ 12 amis internes par personne quelle que soit la taille des groupes
+            for p_in in p_ins or [min(0.6, 12 / max(scale / nb_groups - 1, 1))]:
+                networks = _BenchmarkNetworks(scale, nb_groups, p_in, seed)
+                csr = networks.csr.get_csr()
+
+                for operation in operations or BENCHMARK_OPERATIONS:
+                    seconds = float("inf")
+                    for _ in range(max(1, repeat)):
+                        started = time.perf_counter()
+                        items = _benchmark_operation(operation, networks, scale, nb_groups, p_in, seed, workers)
+                        seconds = min(seconds, time.perf_counter() - started)
+
+                    # deuxième passage sous tracemalloc, pour ne pas fausser la mesure du temps
+                    peak_memory = None
+                    if track_memory:
+                        tracemalloc.start()
+                        _benchmark_operation(operation, networks, scale, nb_groups, p_in, seed, workers)
+                        peak_memory = tracemalloc.get_traced_memory()[1]
+                        tracemalloc.stop()
+
+                    result = BenchmarkResult(operation, scale, nb_groups, round(p_in, 6), csr.n, csr.m, seconds,
+                                             peak_memory, items, items / seconds if seconds > 0 else float("inf"))
+                    results.append(result)
+                    if progress is not None:
+                        progress(result)
+    return results
+
+
+def save_benchmarks(results: List[BenchmarkResult], path: str):
+    payload = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "networkx": nx.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": [result.__dict__ for result in results],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+
+
+def compare_benchmarks(results: List[BenchmarkResult], baseline_path: str, threshold: float = 0.2) -> List[
+        Dict[str, Any]]:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["operation"], r["scale"], r["nb_groups"], r["p_in"]): r for r in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        reference = baseline.get((result.operation, result.scale, result.nb_groups, result.p_in))
+        if reference is None or reference["seconds"] <= 0:
+            continue
+
+        ratio = result.seconds / reference["seconds"]
+        memory_ratio = None
+        if result.peak_memory and reference.get("peak_memory"):
+            memory_ratio = result.peak_memory / reference["peak_memory"]
+        if ratio > 1 + threshold or (memory_ratio is not None and memory_ratio > 1 + threshold):
+            regressions.append({
+                "operation": result.operation,
+                "scale": result.scale,
+                "nb_groups": result.nb_groups,
+                "p_in": result.p_in,
+                "time_ratio": ratio,
+                "memory_ratio": memory_ratio,
+            })
+    return regressions
+
+
+class SocialLinkServer:
+    # protocole : un objet JSON par ligne, {"id": ..., "op": ..., ...} -> {"id": ..., "ok": ..., "result"/"error": ...}
+    READ_OPS = ("recommend", "farthest", "rumor")
+
+    def __init__(self, network: SocialNetwork, workers: int = None, window: float = 0.002, max_batch: int = 1024,
+                 cache_size: int = 4096):
+        self.network = network  # instantané courant : jamais modifié en place, remplacé après chaque écriture
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        # lectures dans des processus (hors GIL) ; les écritures restent dans un seul thread, l'une après l'autre
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.writer_pool = ThreadPoolExecutor(max_workers=1)
+        # chaque instantané est un fichier réseau que les processus projettent en mémoire :
+        # version -> [chemin, lots en cours]
+        self.snapshot_dir = tempfile.mkdtemp(prefix="social-link-")
+        self.snapshots = {network.version: [self._snapshot_file(network), 0]}
+        self.window = window
+        self.max_batch = max_batch
+        self.cache = ResultCache(cache_size)
+        self.pending = {op: [] for op in self.READ_OPS}
+        self.draining = {}
+        self.edits = []
+        self.writer = None
+        self.counts = {"requests": 0, "batches": 0, "computed": 0, "coalesced": 0, "errors": 0, "edits": 0}
+        self.server = None
+        self.connections = {}
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> Tuple[str, int]:
+        self.server = await asyncio.start_server(self._handle_connection, host, port, limit=2 ** 24)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            for writer in list(self.connections):
+                writer.close()
+            await asyncio.gather(*self.connections.values(), return_exceptions=True)
+            await self.server.wait_closed()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.writer_pool.shutdown(wait=False)
+        shutil.rmtree(self.snapshot_dir, ignore_errors=True)
+
+    def _snapshot_file(self, network: SocialNetwork) -> str:
+        # un réseau déjà projeté depuis un fichier est lu tel quel ; sinon on l'écrit une fois
+        path = network.get_csr().source_path
+        if path is None:
+            path = os.path.join(self.snapshot_dir, f"v{network.version}.slk")
+            save_network(network, path)
+        return path
+
+    def _release(self, version: int):
+        entry = self.snapshots.get(version)
+        if entry is None or entry[1] > 0 or version == self.network.version:
+            return
+        del self.snapshots[version]
+        if os.path.dirname(entry[0]) == self.snapshot_dir:
+            try:
+                os.remove(entry[0])
+            except OSError:
+                pass
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        tasks = set()
+        self.connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    # les requêtes d'une même connexion sont traitées en parallèle ; l'id permet de les apparier
+                    task = asyncio.ensure_future(self._respond(line, writer))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            self.connections.pop(writer, None)
+            writer.close()
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            response = {"id": request_id, "ok": True, "result": await self.handle(request)}
+        except Exception as error:
+            self.counts["errors"] += 1
+            response = {"id": request_id, "ok": False, "error": f"{type(error).__name__}: {error}"}
+        writer.write(json.dumps(response).encode() + b"\n")
+        await writer.drain()
+
+    async def handle(self, request: Dict[str, Any]) -> Any:
+        self.counts["requests"] += 1
+        op = request.get("op")
+
+        if op == "recommend":
+            return await self._read(op, (int(request["user"]), int(request.get("k", 5))))
+        if op == "farthest":
+            return await self._read(op, int(request["user"]))
+        if op == "rumor":
+            return await self._read(op, (int(request["origin"]), float(request.get("probability", 0.7)),
+                                         int(request.get("max_steps", 10)), int(request.get("simulations", 1000)),
+                                         request.get("seed"), int(request.get("top", 10))))
+        if op in ("add_friendship", "remove_friendship"):
+            return await self._write(op, int(request["a"]), int(request["b"]))
+        if op == "edits":
+            return await asyncio.gather(*(self._write(edit[0], int(edit[1]), int(edit[2]))
+                                          for edit in request["edits"]))
+        if op == "stats":
+            csr = self.network.get_csr()
+            return dict(self.counts, version=self.network.version, n_nodes=csr.n, n_edges=csr.m,
+                        cache=self.cache.stats())
+        if op == "ping":
+            return "pong"
+        raise ValueError(f"opération inconnue : {op}")
+
+    async def _read(self, op: str, key: Hashable) -> Any:
+        network = self.network
+        found, result = self.cache.get((op, network.version, key))
+        if found:
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending[op].append((key, future))
+        if op not in self.draining:
+            self.draining[op] = asyncio.ensure_future(self._drain(op))
+        return await future
+
+    async def _drain(self, op: str):
+        # les estimations de rumeur ne prennent que la moitié des processus : les requêtes courtes passent toujours
+        slots = asyncio.Semaphore(max(1, self.workers // 2) if op == "rumor" else self.workers)
+        running = set()
+        try:
+            # courte fenêtre pour regrouper les requêtes concurrentes ; pendant un calcul, les suivantes s'accumulent
+            await asyncio.sleep(self.window)
+            while self.pending[op]:
+                batch, self.pending[op] = self.pending[op][:self.max_batch], self.pending[op][self.max_batch:]
+                keys = list(dict.fromkeys(key for key, _ in batch))
+                self.counts["batches"] += 1
+                self.counts["computed"] += len(keys)
+                self.counts["coalesced"] += len(batch) - len(keys)
+
+                # une estimation de rumeur coûte cher : chaque clé distincte devient un calcul séparé
+                groups = [[key] for key in keys] if op == "rumor" else [keys]
+                for group in groups:
+                    await slots.acquire()
+                    task = asyncio.ensure_future(self._run_batch(op, group, batch, slots))
+                    running.add(task)
+                    task.add_done_callback(running.discard)
+                if not self.pending[op] and running:
+                    await asyncio.wait(set(running), return_when=asyncio.FIRST_COMPLETED)
+            if running:
+                await asyncio.gather(*running)
+        finally:
+            del self.draining[op]
+
+    async def _run_batch(self, op: str, keys: List[Hashable], batch: List[Tuple[Hashable, asyncio.Future]],
+                         slots: asyncio.Semaphore):
+        network = self.network
+        snapshot = self.snapshots[network.version]
+        snapshot[1] += 1
+        wanted = set(keys)
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self.pool, _server_batch_task, op,
+                                                                       snapshot[0], keys)
+        except Exception as error:
+            for key, future in batch:
+                if key in wanted and not future.done():
+                    future.set_exception(error)
+            return
+        finally:
+            slots.release()
+            snapshot[1] -= 1
+            self._release(network.version)
+
+        for key, result in results.items():
+            self.cache.put((op, network.version, key), result)
+        for key, future in batch:
+            if key in wanted and not future.done():
+                future.set_result(results[key])
+
+    async def _write(self, op: str, a: int, b: int) -> Dict[str, Any]:
+        future = asyncio.get_running_loop().create_future()
+        self.edits.append((op, a, b, future))
+        if self.writer is None:
+            self.writer = asyncio.ensure_future(self._drain_edits())
+        return await future
+
+    async def _drain_edits(self):
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.sleep(self.window)
+            while self.edits:
+                batch, self.edits = self.edits, []
+                try:
+                    network, applied = await loop.run_in_executor(
+                        self.writer_pool, _apply_server_edits, self.network, [edit[:3] for edit in batch])
+                    if network.version not in self.snapshots:
+                        path = await loop.run_in_executor(self.writer_pool, self._snapshot_file, network)
+                        self.snapshots[network.version] = [path, 0]
+                except Exception as error:
+                    for *_, future in batch:
+                        future.set_exception(error)
+                    continue
+
+                # bascule atomique : les lectures en cours gardent l'instantané qu'elles ont pris
+                previous, self.network = self.network, network
+                self._release(previous.version)
+                self.counts["edits"] += sum(applied)
+                for (*_, future), changed in zip(batch, applied):
+                    future.set_result({"applied": changed, "version": network.version})
+        finally:
+            self.writer = None
+
+
+_SERVER_NETWORKS = OrderedDict()  # chemin -> réseau projeté, propre à chaque processus de lecture
+
+
+def _server_batch_task(op: str, path: str, keys: List[Hashable]) -> Dict[Hashable, Any]:
+    network = _SERVER_NETWORKS.get(path)
+    if network is None:
+        # les lots d'un ancien instantané peuvent encore arriver : on garde les deux derniers
+        while len(_SERVER_NETWORKS) >= 2:
+            _SERVER_NETWORKS.popitem(last=False)
+        network = _SERVER_NETWORKS[path] = load_network(path, cache_size=0)
+    return _server_batch(op, network, keys)
+
+
+def _server_batch(op: str, network: SocialNetwork, keys: List[Hashable]) -> Dict[Hashable, Any]:
+    csr = network.get_csr()
+    results = {}
+
+    if op == "recommend":
+        for k in sorted({key[1] for key in keys}):
+            users = np.array([key[0] for key in keys if key[1] == k], dtype=np.int64)
+            rows = csr.indices_of(users)
+            ranked = iter(_rank_recommendation_chunk(csr, rows[rows >= 0], k))
+            for user, row in zip(users.tolist(), rows.tolist()):
+                results[(user, k)] = [list(item) for item in next(ranked)] if row >= 0 else []
+    elif op == "farthest":
+        for user, (farthest, distance) in network.get_farthest_persons(keys, workers=1).items():
+            results[user] = [farthest, distance]
+    else:
+        for key in keys:
+            origin, probability, max_steps, simulations, seed, top = key
+            estimate = network.estimate_rumor_spread(origin, probability, max_steps, simulations, seed, workers=1)
+            results[key] = None if estimate is None else {
+                "coverage_mean": estimate.coverage_mean,
+                "coverage_ci": list(estimate.coverage_ci),
+                "top_users": [list(item) for item in estimate.top_users(top)],
+            }
+    return results
+
+
+def _apply_server_edits(network: SocialNetwork, edits: List[Tuple[str, int, int]]) -> Tuple[
+        SocialNetwork, List[bool]]:
+    csr = network.get_csr()
+    state = {}
+    applied = []
+
+    # les modifications sont rejouées dans l'ordre d'arrivée, par-dessus l'instantané courant
+    for op, a, b in edits:
+        rows = csr.indices_of(np.array([a, b], dtype=np.int64))
+        if np.any(rows < 0) or (op == "add_friendship" and a == b):
+            applied.append(False)
+            continue
+
+        key = (int(min(rows)), int(max(rows)))
+        exists = state[key] if key in state else csr.has_edge(*key)
+        wanted = op == "add_friendship"
+        applied.append(exists != wanted)
+        state[key] = wanted
+
+    added = np.array([key for key, wanted in state.items() if wanted and not csr.has_edge(*key)],
+                     dtype=np.int64).reshape(-1, 2)
+    removed = np.array([key for key, wanted in state.items() if not wanted and csr.has_edge(*key)],
+                       dtype=np.int64).reshape(-1, 2)
+    if len(added) == 0 and len(removed) == 0:
+        return network, applied
+
+    snapshot = SocialNetwork.from_csr(csr.with_edge_changes(added, removed), network.group_activities,
+                                      cache_size=0)
+    snapshot.version = network.version + 1
+    return snapshot, applied
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_load(host: str, port: int, n_requests: int = 10000, concurrency: int = 64, mix: Dict[str, float] = None,
+                   user_ids: List[int] = None, seed: int = None) -> Dict[str, Any]:
+    mix = mix or {"recommend": 0.7, "farthest": 0.25, "rumor": 0.05}
+    rng = random.Random(seed)
+    users = user_ids if user_ids is not None else list(range(1000))
+    ops = list(mix)
+    weights = [mix[op] for op in ops]
+    latencies = {op: [] for op in ops}
+    errors = 0
+    remaining = [n_requests]
+
+    def make_request(request_id: int) -> Dict[str, Any]:
+        op = rng.choices(ops, weights)[0]
+        if op == "recommend":
+            return {"id": request_id, "op": op, "user": rng.choice(users), "k": 5}
+        if op == "farthest":
+            return {"id": request_id, "op": op, "user": rng.choice(users)}
+        if op == "rumor":
+            return {"id": request_id, "op": op, "origin": rng.choice(users), "probability": 0.3,
+                    "simulations": 256, "seed": rng.randrange(16)}
+        return {"id": request_id, "op": op, "a": rng.choice(users), "b": rng.choice(users)}
+
+    async def client():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port, limit=2 ** 24)
+        try:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                request = make_request(remaining[0])
+                started = time.perf_counter()
+                writer.write(json.dumps(request).encode() + b"\n")
+                await writer.drain()
+                response = json.loads(await reader.readline())
+                latencies[request["op"]].append(time.perf_counter() - started)
+                errors += not response.get("ok", False)
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    everything = [latency for values in latencies.values() for latency in values]
+    report = {"requests": len(everything), "errors": errors, "seconds": elapsed,
+              "throughput": len(everything) / elapsed if elapsed > 0 else float("inf"),
+              "p50_ms": _percentile(everything, 0.5) * 1000, "p99_ms": _percentile(everything, 0.99) * 1000}
+    for op, values in latencies.items():
+        report[op] = {"count": len(values), "p50_ms": _percentile(values, 0.5) * 1000,
+                      "p99_ms": _percentile(values, 0.99) * 1000}
+    return report
+
+
+def _open_output(path: Optional[str]):
+    if path is None or path == "-":
+        return open(sys.stdout.fileno(), "w", encoding="utf-8", newline="", closefd=False)
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def _load_cli_network(args: argparse.Namespace) -> SocialNetwork:
+    return load_network(args.network, mmap=not args.no_mmap)
+
+
+def _parse_user_list(text: Optional[str]) -> Optional[List[int]]:
+    if text is None or text == "all":
+        return None
+    return [int(part) for part in text.split(",") if part.strip()]
+
+
+def _parse_pairs(text: str) -> List[Tuple[int, int]]:
+    # "1:2,3:4" ou un fichier avec deux ids par ligne (séparés par virgule, point-virgule ou espaces)
+    if os.path.exists(text):
+        with open(text, encoding="utf-8") as f:
+            lines = [line for line in f if line.strip() and not line.startswith("#")]
+    else:
+        lines = text.split(",")
+    pairs = []
+    for line in lines:
+        parts = re.split(r"[:;,\s]+", line.strip())
+        pairs.append((int(parts[0]), int(parts[1])))
+    return pairs
+
+
+def _parse_size(text: str) -> int:
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def cli_import(args: argparse.Namespace) -> int:
+    def progress(lines: int, elapsed: float):
+        print(f"\r{lines} arêtes lues ({lines / max(elapsed, 1e-9):.0f}/s)", end="", file=sys.stderr)
+
+    network, report = import_edge_list(args.input, args.output, tuple(args.columns), args.delimiter, args.ids,
+                                       args.header, args.memory_limit, args.temp_dir,
+                                       None if args.quiet else progress)
+    if not args.quiet:
+        print(file=sys.stderr)
+
+    with _open_output(None) as out:
+        json.dump(report.__dict__, out)
+        out.write("\n")
+    return 0
+
+
+def cli_generate(args: argparse.Namespace) -> int:
+    src, dst, sizes, group_activities = sample_social_edges(args.groups, args.max_people, args.p_in, args.seed)
+    group_ids = np.repeat(np.arange(len(sizes), dtype=np.int32), sizes)
+    csr = CSRGraph.from_edges(int(sizes.sum()), src, dst, group_ids)
+    save_network(SocialNetwork.from_csr(csr, group_activities), args.output)
+
+    with _open_output(None) as out:
+        json.dump({"path": args.output, "n_nodes": csr.n, "n_edges": csr.m, "n_groups": len(sizes)}, out)
+        out.write("\n")
+    return 0
+
+
+def cli_analyze(args: argparse.Namespace) -> int:
+    report = _load_cli_network(args).graph_report(args.top, args.bridges, args.samples, args.workers,
+                                                  args.clustering)
+
+    if args.format == "text":
+        render_graph_report(report)
+        return 0
+
+    with _open_output(args.output) as out:
+        if args.format == "json":
+            json.dump(report.to_dict(), out, ensure_ascii=False)
+            out.write("\n")
+        else:
+            writer = csv.writer(out)
+            clustering = [] if report.group_clustering is None else ["clustering"]
+            writer.writerow(["group", "activity", "size", "internal_edges", *clustering])
+            for i, (name, group) in enumerate(zip(report.group_names, report.groups)):
+                row = [i, name, len(group), int(report.internal_edges[i])]
+                if report.group_clustering is not None:
+                    row.append(float(report.group_clustering[i]))
+                writer.writerow(row)
+    return 0
+
+
+def cli_clustering(args: argparse.Namespace) -> int:
+    network = _load_cli_network(args)
+    result = network.clustering(args.workers)
+
+    with _open_output(args.output) as out:
+        if args.format == "csv":
+            writer = csv.writer(out)
+            writer.writerow(["user", "triangles", "clustering"])
+            writer.writerows(zip(result.node_ids.tolist(), result.triangles.tolist(), result.clustering.tolist()))
+        else:
+            groups = [{"name": network.group_activities.get(i, f"Groupe {i + 1}"), "size": len(group),
+                       "clustering": float(clustering)}
+                      for i, (group, clustering) in enumerate(zip(network.groups, result.group_clustering))]
+            json.dump({"n_triangles": result.n_triangles, "transitivity": result.transitivity,
+                       "average_clustering": result.average_clustering, "seconds": result.elapsed,
+                       "groups": groups}, out, ensure_ascii=False)
+            out.write("\n")
+    return 0
+
+
+def cli_recommend(args: argparse.Namespace) -> int:
+    network = _load_cli_network(args)
+    users = _parse_user_list(args.users)
+    if args.mode == "embedding":
+        index = network.embeddings(args.method, activity_weight=args.activity_weight)
+        users = network.get_csr().node_ids.tolist() if users is None else users
+        chunks = ([(user, index.query(user, args.top)) for user in users[start:start + args.chunk_size]]
+                  for start in range(0, len(users), args.chunk_size))
+    else:
+        chunks = network.iter_friend_recommendations(users, args.top, args.chunk_size)
+
+    with _open_output(args.output) as out:
+        if args.format == "csv":
+            writer = csv.writer(out)
+            score = "score" if args.mode == "embedding" else "common_friends"
+            writer.writerow(["user", "rank", "recommended_user", score])
+            for chunk in chunks:
+                for user, recommendations in chunk:
+                    for rank, (recommended, common) in enumerate(recommendations, 1):
+                        writer.writerow([user, rank, recommended, common])
+        else:
+            # écrit au fil des blocs pour garder une mémoire bornée sur tout le réseau
+            out.write("[")
+            first = True
+            for chunk in chunks:
+                for user, recommendations in chunk:
+                    out.write(("" if first else ",") + json.dumps({"user": user, "recommendations": recommendations}))
+                    first = False
+            out.write("]\n")
+    return 0
+
+
+def cli_embed(args: argparse.Namespace) -> int:
+    network = _load_cli_network(args)
+    index = network.embeddings(args.method, args.dim, args.activity_weight, args.seed)
+    recall = index.evaluate(args.queries, args.top, args.seed)
+
+    with _open_output(args.output) as out:
+        json.dump({"method": args.method, "dim": args.dim, "n_lists": len(index.centroids),
+                   "build_seconds": index.build_seconds, **recall.__dict__}, out)
+        out.write("\n")
+    return 0
+
+
+def cli_centrality(args: argparse.Namespace) -> int:
+    network = _load_cli_network(args)
+    result = network.centrality(args.samples, args.seed, args.workers, args.confidence)
+
+    with _open_output(args.output) as out:
+        if args.format == "csv":
+            writer = csv.writer(out)
+            writer.writerow(["user", "pagerank", "betweenness", "betweenness_error", "closeness"])
+            writer.writerows(zip(result.node_ids.tolist(), result.pagerank.tolist(), result.betweenness.tolist(),
+                                 result.betweenness_error.tolist(), result.closeness.tolist()))
+        else:
+            json.dump({"n_samples": result.n_samples, "confidence": result.confidence,
+                       "betweenness_bound": result.betweenness_bound, "seconds": result.elapsed,
+                       **{measure: result.top(measure, args.top)
+                          for measure in ("betweenness", "closeness", "pagerank")}}, out)
+            out.write("\n")
+    return 0
+
+
+def cli_distance(args: argparse.Namespace) -> int:
+    # sans index de repères, les bornes estimées vaudraient [0, inf] pour toutes les paires
+    if args.estimate and not args.landmarks:
+        raise ValueError("--estimate nécessite un index de repères (--landmarks N)")
+    network = _load_cli_network(args)
+    if args.pairs is not None:
+        pairs = _parse_pairs(args.pairs)
+    else:
+        node_ids = network.get_csr().node_ids
+        pairs = node_ids[np.random.default_rng(args.seed).integers(0, len(node_ids), (args.random, 2))].tolist()
+
+    index = None
+    if args.landmarks:
+        index = network.build_landmarks(args.landmarks, args.strategy, args.seed, args.workers)
+    started = time.perf_counter()
+    lower, upper = network.distances(pairs, not args.estimate, args.workers)
+    elapsed = time.perf_counter() - started
+
+    with _open_output(args.output) as out:
+        if args.format == "csv":
+            writer = csv.writer(out)
+            writer.writerow(["source", "target", "lower", "upper"])
+            for (source, target), low, high in zip(pairs, lower.tolist(), upper.tolist()):
+                writer.writerow([source, target, *("" if np.isinf(bound) else int(bound) for bound in (low, high))])
+            return 0
+
+        results = []
+        for (source, target), low, high in zip(pairs, lower.tolist(), upper.tolist()):
+            item = {"source": source, "target": target, "lower": None if np.isinf(low) else int(low),
+                    "upper": None if np.isinf(high) else int(high)}
+            if args.path:
+                item["path"] = network.shortest_path(source, target)
+            results.append(item)
+        json.dump({"n_pairs": len(pairs), "exact": not args.estimate, "seconds": elapsed,
+                   "queries_per_second": len(pairs) / elapsed if elapsed else None,
+                   "landmarks": None if index is None else {
+                       "n_landmarks": len(index.landmarks), "strategy": index.strategy,
+                       "build_seconds": index.build_seconds, "memory_bytes": index.memory_bytes},
+                   "pairs": results[:args.top]}, out)
+        out.write("\n")
+    return 0
+
+
+def cli_cliques(args: argparse.Namespace) -> int:
+    network = _load_cli_network(args)
+    if args.top is not None:
+        cliques = network.largest_cliques(args.top, args.max_size, workers=args.workers)
+    else:
+        cliques = network.iter_cliques(args.max_size, args.min_size, workers=args.workers)
+
+    with _open_output(args.output) as out:
+        if args.format == "csv":
+            writer = csv.writer(out)
+            writer.writerow(["clique", "size", "members"])
+            for i, clique in enumerate(cliques):
+                writer.writerow([i, len(clique), " ".join(map(str, sorted(clique)))])
+        else:
+            out.write("[")
+            for i, clique in enumerate(cliques):
+                out.write(("," if i else "") + json.dumps(sorted(clique)))
+            out.write("]\n")
+    return 0
+
+
+def cli_communities(args: argparse.Namespace) -> int:
+    network = _load_cli_network(args)
+    result = network.detect_communities(args.method, args.resolution, args.seed, args.min_size)
+    if args.save is not None:
+        save_network(network, args.save)
+
+    with _open_output(args.output) as out:
+        if args.format == "csv":
+            writer = csv.writer(out)
+            writer.writerow(["user", "community"])
+            writer.writerows(zip(network.get_csr().node_ids.tolist(), result.labels.tolist()))
+        else:
+            json.dump({"method": result.method, "modularity": result.modularity,
+                       "n_communities": result.n_communities, "sizes": result.sizes[:args.top],
+                       "iterations": result.iterations, "seconds": result.elapsed}, out)
+            out.write("\n")
+    return 0
+
+
+def cli_rumor(args: argparse.Namespace) -> int:
+    network = _load_cli_network(args)
+    estimate = network.estimate_rumor_spread(_parse_user_list(args.origin), args.probability, args.max_steps,
+                                             args.simulations, args.seed, args.workers)
+    if estimate is None:
+        print(f"Erreur : origine inconnue ({args.origin})", file=sys.stderr)
+        return 1
+
+    with _open_output(args.output) as out:
+        if args.format == "csv":
+            writer = csv.writer(out)
+            writer.writerow(["user", "infection_probability", "expected_time"])
+            for user, prob, expected in zip(estimate.node_ids.tolist(), estimate.infection_probability.tolist(),
+                                            estimate.expected_time.tolist()):
+                if prob > 0:
+                    writer.writerow([user, prob, expected])
+        else:
+            json.dump({
+                "origins": estimate.origins,
+                "probability": estimate.probability,
+                "max_steps": estimate.max_steps,
+                "n_simulations": estimate.n_simulations,
+                "coverage_mean": estimate.coverage_mean,
+                "coverage_ci": list(estimate.coverage_ci),
+                "coverage_interval": list(estimate.coverage_interval),
+                "top_users": estimate.top_users(args.top),
+            }, out)
+            out.write("\n")
+    return 0
+
+
+def cli_sweep(args: argparse.Namespace) -> int:
+    network = _load_cli_network(args)
+    # origines séparées par des virgules ; « 7+8 » lance une même rumeur depuis plusieurs personnes
+    origins = [[int(user) for user in part.split("+")] for part in args.origins.split(",") if part.strip()]
+
+    def progress(state: SweepProgress):
+        print(f"\r{state.cells_done}/{state.cells_total} cellules, {state.simulations_per_second:.0f} simulations/s",
+              end="", file=sys.stderr)
+
+    state = run_rumor_sweep(network, args.output, origins, args.probabilities, args.max_steps, args.simulations,
+                            args.seed, args.workers, progress)
+    print(file=sys.stderr)
+
+    if args.export is not None:
+        results = load_sweep_results(args.output)
+        with _open_output(args.export) as out:
+            writer = csv.writer(out)
+            writer.writerow(list(results))
+            writer.writerows(zip(*(column.tolist() for column in results.values())))
+    with _open_output(None) as out:
+        json.dump(state.__dict__, out)
+        out.write("\n")
+    return 0
+
+
+def cli_animate(args: argparse.Namespace) -> int:
+    network = _load_cli_network(args)
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    frames = build_rumor_frames(network, args.origin, args.probability, args.max_steps, args.label_threshold,
+                                args.layout)
+    if frames is None:
+        raise ValueError(f"l'utilisateur {args.origin} n'existe pas dans le réseau")
+
+    started = time.perf_counter()
+    n_frames = export_rumor_animation(frames, args.output, args.fps, args.dpi, args.workers)
+    with _open_output(None) as out:
+        json.dump({"path": args.output, "frames": n_frames,
+                   "infected": int(np.count_nonzero(frames.infection_step >= 0)),
+                   "seconds": round(time.perf_counter() - started, 3)}, out)
+        out.write("\n")
+    return 0
+
+
+def cli_serve(args: argparse.Namespace) -> int:
+    network = _load_cli_network(args)
+
+    async def serve():
+        server = SocialLinkServer(network, args.workers, args.window / 1000, args.max_batch)
+        host, port = await server.start(args.host, args.port)
+        print(f"Serveur prêt sur {host}:{port} ({network.get_csr().n} personnes)", file=sys.stderr)
+        try:
+            await server.server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cli_loadgen(args: argparse.Namespace) -> int:
+    mix = {op: float(weight) for op, weight in (part.split("=") for part in args.mix.split(","))}
+    report = asyncio.run(run_load(args.host, args.port, args.requests, args.concurrency, mix,
+                                  list(range(args.users)), args.seed))
+    with _open_output(None) as out:
+        json.dump(report, out, indent=2)
+        out.write("\n")
+    return 1 if report["errors"] else 0
+
+
+def cli_bench(args: argparse.Namespace) -> int:
+    def progress(result: BenchmarkResult):
+        memory = f"{result.peak_memory / 1e6:8.1f} Mo" if result.peak_memory is not None else "       -"
+        print(f"   {result.operation:<16} n={result.n_nodes:<9} m={result.n_edges:<10} "
+              f"{result.seconds:9.3f}s {memory} {result.throughput:12.1f}/s", file=sys.stderr)
+
+    results = run_benchmarks(args.scales, args.groups, args.p_in, args.operations, args.seed, args.workers,
+                             args.repeat, not args.no_memory, progress)
+    save_benchmarks(results, args.results)
+
+    if args.baseline is None:
+        return 0
+
+    regressions = compare_benchmarks(results, args.baseline, args.threshold)
+    for regression in regressions:
+        memory = f", mémoire x{regression['memory_ratio']:.2f}" if regression["memory_ratio"] else ""
+        print(f"[RÉGRESSION] {regression['operation']} (n={regression['scale']}, groupes={regression['nb_groups']}, "
+              f"p_in={regression['p_in']}) : temps x{regression['time_ratio']:.2f}{memory}", file=sys.stderr)
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+def build_cli_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="Social-Link",
+                                     description="Sans sous-commande, lance le menu interactif.")
+    parser.add_argument("--metrics", default=None,
+                        help="active l'instrumentation et écrit les mesures (.prom : texte Prometheus, sinon JSON)")
+    parser.add_argument("--profile", default=None, help="profil cProfile de la commande (fichier pstats)")
+    commands = parser.add_subparsers(dest="command")
+
+    def network_command(name: str, help_text: str, formats: List[str]) -> argparse.ArgumentParser:
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--network", required=True, help="fichier réseau créé par 'generate'")
+        command.add_argument("--format", choices=formats, default=formats[0])
+        command.add_argument("--output", default=None, help="fichier de sortie (stdout par défaut)")
+        command.add_argument("--workers", type=int, default=None)
+        command.add_argument("--no-mmap", action="store_true", help="charge le réseau en mémoire")
+        return command
+
+    generate = commands.add_parser("generate", help="générer un réseau et l'enregistrer")
+    generate.add_argument("--groups", type=int, required=True)
+    generate.add_argument("--max-people", type=int, required=True)
+    generate.add_argument("--p-in", type=float, default=0.6)
+    generate.add_argument("--seed", type=int, default=None)
+    generate.add_argument("--output", required=True)
+    generate.set_defaults(handler=cli_generate)
+
+    def column_pair(text: str) -> List[int]:
+        columns = [int(part) for part in text.split(",")]
+        if len(columns) != 2:
+            raise argparse.ArgumentTypeError("deux colonnes attendues, par ex. 0,1")
+        return columns
+
+    importer = commands.add_parser("import", help="importer une liste d'arêtes (texte, .gz, SNAP, CSV)")
+    importer.add_argument("--input", required=True)
+    importer.add_argument("--output", required=True, help="fichier réseau à créer")
+    importer.add_argument("--columns", type=column_pair, default=[0, 1], help="colonnes source,cible")
+    importer.add_argument("--delimiter", default=None, help="séparateur (défaut : espaces, ou , / ; détecté)")
+    importer.add_argument("--ids", choices=["auto", "int", "str"], default="auto")
+    importer.add_argument("--header", action="store_true", default=None, help="la première ligne est un en-tête")
+    importer.add_argument("--memory-limit", type=_parse_size, default=None, help="plafond mémoire, par ex. 2G")
+    importer.add_argument("--temp-dir", default=None, help="dossier des fichiers temporaires")
+    importer.add_argument("--quiet", action="store_true")
+    importer.set_defaults(handler=cli_import)
+
+    analyze = network_command("analyze", "statistiques du réseau", ["json", "csv", "text"])
+    analyze.add_argument("--top", type=int, default=5)
+    analyze.add_argument("--bridges", type=int, default=0, help="ajoute les N meilleurs ponts (intermédiarité)")
+    analyze.add_argument("--samples", type=int, default=256, help="sources tirées pour l'intermédiarité")
+    analyze.add_argument("--clustering", action="store_true", help="ajoute transitivité et regroupement par groupe")
+    analyze.set_defaults(handler=cli_analyze)
+
+    recommend = network_command("recommend", "recommandations d'amis", ["json", "csv"])
+    recommend.add_argument("--users", default="all", help="liste d'ids séparés par des virgules, ou 'all'")
+    recommend.add_argument("--top", type=int, default=5)
+    recommend.add_argument("--chunk-size", type=int, default=4096)
+    recommend.add_argument("--mode", choices=["common", "embedding"], default="common")
+    recommend.add_argument("--method", choices=EMBEDDING_METHODS, default="walks", help="plongements (mode embedding)")
+    recommend.add_argument("--activity-weight", type=float, default=0.0, help="poids de l'activité du groupe (0-1)")
+    recommend.set_defaults(handler=cli_recommend)
+
+    embed = network_command("embed", "plongements et rappel de l'index approché", ["json"])
+    embed.add_argument("--method", choices=EMBEDDING_METHODS, default="walks")
+    embed.add_argument("--dim", type=int, default=64)
+    embed.add_argument("--activity-weight", type=float, default=0.0)
+    embed.add_argument("--queries", type=int, default=200, help="utilisateurs tirés pour mesurer le rappel")
+    embed.add_argument("--top", type=int, default=5)
+    embed.add_argument("--seed", type=int, default=42)
+    embed.set_defaults(handler=cli_embed)
+
+    centrality = network_command("centrality", "PageRank, intermédiarité et proximité", ["json", "csv"])
+    centrality.add_argument("--samples", type=int, default=256, help="sources BFS tirées (précision ~ 1/sqrt)")
+    centrality.add_argument("--confidence", type=float, default=0.95)
+    centrality.add_argument("--seed", type=int, default=0)
+    centrality.add_argument("--top", type=int, default=10)
+    centrality.set_defaults(handler=cli_centrality)
+
+    clustering = network_command("clustering", "triangles et coefficients de regroupement", ["json", "csv"])
+    clustering.set_defaults(handler=cli_clustering)
+
+    distance = network_command("distance", "degrés de séparation entre paires d'utilisateurs", ["json", "csv"])
+    pairs = distance.add_mutually_exclusive_group(required=True)
+    pairs.add_argument("--pairs", help="'1:2,3:4' ou fichier à deux colonnes")
+    pairs.add_argument("--random", type=int, help="N paires tirées au hasard (mesure de débit)")
+    distance.add_argument("--landmarks", type=int, default=0, help="taille de l'index de repères (0 : aucun)")
+    distance.add_argument("--strategy", choices=LANDMARK_STRATEGIES, default="degree")
+    distance.add_argument("--estimate", action="store_true", help="bornes des repères seulement, sans BFS (avec --landmarks)")
+    distance.add_argument("--path", action="store_true", help="ajoute un plus court chemin (json)")
+    distance.add_argument("--seed", type=int, default=0)
+    distance.add_argument("--top", type=int, default=100, help="paires détaillées (json)")
+    distance.set_defaults(handler=cli_distance)
+
+    cliques = network_command("cliques", "cercles d'amis complets", ["json", "csv"])
+    cliques.add_argument("--max-size", type=int, default=10)
+    cliques.add_argument("--min-size", type=int, default=1)
+    cliques.add_argument("--top", type=int, default=None, help="seulement les N plus grands")
+    cliques.set_defaults(handler=cli_cliques)
+
+    communities = network_command("communities", "détection de communautés (remplit les groupes)", ["json", "csv"])
+    communities.add_argument("--method", choices=["louvain", "label_propagation"], default="louvain")
+    communities.add_argument("--resolution", type=float, default=1.0)
+    communities.add_argument("--min-size", type=int, default=1, help="les communautés plus petites restent sans groupe")
+    communities.add_argument("--seed", type=int, default=None)
+    communities.add_argument("--top", type=int, default=10, help="tailles affichées (json)")
+    communities.add_argument("--save", default=None, help="enregistre le réseau avec les groupes détectés")
+    communities.set_defaults(handler=cli_communities)
+
+    rumor = network_command("rumor", "estimation Monte Carlo de la propagation", ["json", "csv"])
+    rumor.add_argument("--origin", required=True, help="id(s) d'origine séparés par des virgules")
+    rumor.add_argument("--probability", type=float, default=0.7)
+    rumor.add_argument("--max-steps", type=int, default=10)
+    rumor.add_argument("--simulations", type=int, default=1000)
+    rumor.add_argument("--seed", type=int, default=None)
+    rumor.add_argument("--top", type=int, default=10)
+    rumor.set_defaults(handler=cli_rumor)
+
+    animate = commands.add_parser("animate", help="exporter l'animation d'une rumeur (GIF ou MP4)")
+    animate.add_argument("--network", required=True, help="fichier réseau créé par 'generate'")
+    animate.add_argument("--origin", type=int, required=True)
+    animate.add_argument("--probability", type=float, default=0.7)
+    animate.add_argument("--max-steps", type=int, default=10)
+    animate.add_argument("--seed", type=int, default=None)
+    animate.add_argument("--output", required=True, help="fichier .gif ou .mp4")
+    animate.add_argument("--fps", type=float, default=1.0)
+    animate.add_argument("--dpi", type=int, default=80)
+    animate.add_argument("--label-threshold", type=int, default=200)
+    animate.add_argument("--layout", choices=LAYOUTS, default="circular")
+    animate.add_argument("--workers", type=int, default=None)
+    animate.add_argument("--no-mmap", action="store_true", help="charge le réseau en mémoire")
+    animate.set_defaults(handler=cli_animate)
+
+    serve = commands.add_parser("serve", help="serveur local de requêtes (JSON par ligne)")
+    serve.add_argument("--network", required=True, help="fichier réseau créé par 'generate'")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--workers", type=int, default=None, help="threads de calcul")
+    serve.add_argument("--window", type=float, default=2.0, help="fenêtre de regroupement (ms)")
+    serve.add_argument("--max-batch", type=int, default=1024)
+    serve.add_argument("--no-mmap", action="store_true", help="charge le réseau en mémoire")
+    serve.set_defaults(handler=cli_serve)
+
+    loadgen = commands.add_parser("loadgen", help="générateur de charge pour 'serve' (latences p50/p99)")
+    loadgen.add_argument("--host", default="127.0.0.1")
+    loadgen.add_argument("--port", type=int, default=8765)
+    loadgen.add_argument("--requests", type=int, default=10000)
+    loadgen.add_argument("--concurrency", type=int, default=64)
+    loadgen.add_argument("--users", type=int, default=1000, help="ids tirés dans [0, N)")
+    loadgen.add_argument("--mix", default="recommend=0.7,farthest=0.25,rumor=0.05")
+    loadgen.add_argument("--seed", type=int, default=None)
+    loadgen.set_defaults(handler=cli_loadgen)
+
+    def int_list(text: str) -> List[int]:
+        return [int(float(part)) for part in text.split(",")]
+
+    def float_list(text: str) -> List[float]:
+        return [float(part) for part in text.split(",")]
+
+    sweep = commands.add_parser("sweep", help="balayage de scénarios de rumeur (reprise sur le fichier de résultats)")
+    sweep.add_argument("--network", required=True, help="fichier réseau créé par 'generate'")
+    sweep.add_argument("--output", required=True, help="fichier de résultats colonnes, repris s'il existe")
+    sweep.add_argument("--origins", required=True, help="ex. 0,5,7+8")
+    sweep.add_argument("--probabilities", type=float_list, default=[0.7])
+    sweep.add_argument("--max-steps", type=int_list, default=[10])
+    sweep.add_argument("--simulations", type=int, default=1000, help="simulations par cellule")
+    sweep.add_argument("--seed", type=int, default=0)
+    sweep.add_argument("--workers", type=int, default=None)
+    sweep.add_argument("--export", default=None, help="copie CSV des courbes")
+    sweep.add_argument("--no-mmap", action="store_true", help="charge le réseau en mémoire")
+    sweep.set_defaults(handler=cli_sweep)
+
+    bench = commands.add_parser("bench", help="mesures de performance sur des réseaux synthétiques")
+    bench.add_argument("--scales", type=int_list, default=[1000, 10000, 100000, 1000000])
+    bench.add_argument("--groups", type=int_list, default=None, help="nombres de groupes (défaut : selon la taille)")
+    bench.add_argument("--p-in", type=float_list, default=None, help="probabilités internes (défaut : ~12 amis)")
+    bench.add_argument("--operations", type=lambda text: text.split(","), default=None)
+    bench.add_argument("--seed", type=int, default=42)
+    bench.add_argument("--workers", type=int, default=1)
+    bench.add_argument("--repeat", type=int, default=1, help="garde le meilleur temps sur N passages")
+    bench.add_argument("--no-memory", action="store_true", help="ne mesure pas le pic mémoire")
+    bench.add_argument("--results", default="bench_results.json")
+    bench.add_argument("--baseline", default=None)
+    bench.add_argument("--threshold", type=float, default=0.2)
+    bench.add_argument("--fail-on-regression", action="store_true")
+    bench.set_defaults(handler=cli_bench)
+
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = build_cli_parser().parse_args(argv)
+    if args.command is None:
+        interactive_menu()
+        return 0
+
+    if args.metrics is not None:
+        METRICS.enable()
+
+    try:
+        if args.profile is not None:
+            captured = profile_call(args.handler, (args,), stats_path=args.profile)
+            print(captured.stats, file=sys.stderr)
+            return captured.result
+        return args.handler(args)
+    except (OSError, ValueError) as error:
+        print(f"Erreur : {error}", file=sys.stderr)
+        return 1
+    finally:
+        if args.metrics is not None:
+            METRICS.write(args.metrics)
+
+
 if __name__ == "__main__":
-    interactive_menu()
+    sys.exit(main())
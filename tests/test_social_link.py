@@ -0,0 +1,1163 @@
+import csv
+import importlib.util
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+from itertools import chain
+from typing import List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+import pytest
+
+# le module porte un tiret dans son nom de fichier : on le charge à la main
+_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Social-Link.py")
+_SPEC = importlib.util.spec_from_file_location("social_link", _PATH)
+sl = importlib.util.module_from_spec(_SPEC)
+sys.modules["social_link"] = sl
+_SPEC.loader.exec_module(sl)
+
+
+def make_network(G: nx.Graph, use_csr: bool = True) -> "sl.SocialNetwork":
+    return sl.SocialNetwork(G, [list(G.nodes)], {0: "Tous"}, use_csr=use_csr)
+
+
+def trailing_isolated_graph() -> nx.Graph:
+    G = nx.Graph([(0, 1), (1, 2), (2, 3), (0, 3), (3, 4), (4, 1)])
+    G.add_node(5)
+    return G
+
+
+def random_graphs():
+    for seed in range(15):
+        G, _, _ = sl.generate_social_graph_fast(4, 12, 0.4, seed=seed)
+        G.add_node(max(G.nodes) + 1)
+        yield G
+
+
+def test_farthest_persons_trailing_isolated_node():
+    network = make_network(trailing_isolated_graph())
+    assert network.get_farthest_persons([1])[1][1] == 2
+
+
+@pytest.mark.parametrize("G", list(random_graphs()))
+def test_farthest_persons_match_eccentricity(G):
+    network = make_network(G)
+    results = network.get_farthest_persons()
+    for component in nx.connected_components(G):
+        if len(component) == 1:
+            continue
+        eccentricity = nx.eccentricity(G.subgraph(component))
+        for user in component:
+            assert results[user][1] == eccentricity[user]
+
+
+def baseline_farthest(G: nx.Graph, user: int) -> Tuple[Optional[int], Optional[int]]:
+    # comportement d'origine : à distance égale, la première personne découverte par le BFS
+    distances = nx.single_source_shortest_path_length(G, user)
+    if len(distances) <= 1:
+        return None, None
+    return max(distances.items(), key=lambda x: x[1])
+
+
+@pytest.mark.parametrize("use_csr", [False, True])
+def test_farthest_person_tie_break_matches_baseline(use_csr):
+    for G in random_graphs():
+        network = make_network(G, use_csr)
+        batch = network.get_farthest_persons()
+        for user in G:
+            assert network.get_farthest_person(user) == batch[user] == baseline_farthest(G, user)
+
+
+def test_farthest_persons_batch_matches_baseline_on_shuffled_graph():
+    G, _, _ = sl.generate_social_graph_fast(20, 40, 0.15, seed=11)
+    # voisins dans un ordre quelconque et ids non contigus
+    edges = list(G.edges)
+    random.Random(0).shuffle(edges)
+    H = nx.Graph()
+    H.add_nodes_from(3 * user + 1 for user in random.Random(1).sample(list(G), len(G)))
+    H.add_edges_from((3 * a + 1, 3 * b + 1) for a, b in edges)
+    users = list(H)[:150] + list(H)[:10]
+    for workers in (1, 2):
+        batch = make_network(H).get_farthest_persons(users, workers=workers)
+        assert all(batch[user] == baseline_farthest(H, user) for user in users)
+
+
+def test_graph_extent_matches_networkx():
+    for G in random_graphs():
+        extent = make_network(G).graph_extent()
+        largest = G.subgraph(max(nx.connected_components(G), key=len))
+        assert extent.exact
+        assert extent.diameter_lower == nx.diameter(largest)
+        assert extent.radius_lower == nx.radius(largest)
+
+
+def test_graph_extent_empty_graph():
+    assert make_network(nx.Graph()).graph_extent() is None
+
+
+@pytest.mark.parametrize("strategy", sl.LANDMARK_STRATEGIES)
+def test_landmark_distances_match_networkx(strategy):
+    for G in [trailing_isolated_graph(), *random_graphs()]:
+        network = make_network(G)
+        network.build_landmarks(4, strategy)
+        truth = dict(nx.all_pairs_shortest_path_length(G))
+        pairs = [(a, b) for a in G for b in G]
+        expected = np.array([truth[a].get(b, np.inf) for a, b in pairs])
+
+        lower, upper = network.distances(pairs, exact=False)
+        assert np.all(lower <= expected) and np.all(expected <= upper)
+        lower, upper = network.distances(pairs)
+        assert np.array_equal(lower, expected) and np.array_equal(upper, expected)
+
+
+def test_landmark_index_stores_true_distances():
+    network = make_network(trailing_isolated_graph())
+    index = network.build_landmarks(6)
+    truth = dict(nx.all_pairs_shortest_path_length(network.G))
+    for column, landmark in enumerate(index.landmarks.tolist()):
+        for user in range(6):
+            assert index.distances[user, column] == truth[landmark].get(user, sl.LANDMARK_UNREACHED)
+
+
+def test_inline_parallel_map_is_thread_safe():
+    from concurrent.futures import ThreadPoolExecutor
+
+    networks = [make_network(G) for G in random_graphs()]
+    expected = [network.get_farthest_persons(workers=1) for network in networks]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for _ in range(5):
+            results = list(pool.map(lambda network: network.get_farthest_persons(workers=1), networks))
+            assert results == expected
+
+
+def test_server_reads_follow_snapshots():
+    import asyncio
+    import json
+
+    G = trailing_isolated_graph()
+    reference = make_network(G.copy())
+
+    async def call(reader, writer, request):
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        return json.loads(await reader.readline())["result"]
+
+    async def scenario():
+        server = sl.SocialLinkServer(make_network(G), workers=2)
+        host, port = await server.start("127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            assert await call(reader, writer, {"op": "farthest", "user": 1}) == list(reference.get_farthest_person(1))
+            await call(reader, writer, {"op": "add_friendship", "a": 5, "b": 1})
+            reference.add_friendship(5, 1)
+            assert await call(reader, writer, {"op": "farthest", "user": 5}) == list(reference.get_farthest_person(5))
+            recommended = await call(reader, writer, {"op": "recommend", "user": 5, "k": 3})
+            # à score égal l'ordre dépend de l'ordre des voisins, différent après une modification
+            assert sorted(map(tuple, recommended)) == sorted(reference.get_friend_recommendations(5, 3))
+        finally:
+            writer.close()
+            await server.close()
+        return server.snapshot_dir
+
+    snapshot_dir = asyncio.run(scenario())
+    assert not os.path.exists(snapshot_dir)
+
+
+@pytest.mark.parametrize("use_csr", [False, True])
+def test_replacing_graph_drops_cached_results(use_csr):
+    G, groups, activities = sl.generate_social_graph_fast(3, 12, 0.4, seed=1)
+    network = sl.SocialNetwork(G, groups, activities, use_csr=use_csr)
+    user = next(iter(G))
+    assert network.get_friend_recommendations(user, 5)
+    network.get_farthest_person(user)
+
+    version = network.version
+    network.G = nx.complete_graph(G.nodes)
+    assert network.version > version
+    assert network.get_friend_recommendations(user, 5) == []
+    assert network.get_farthest_person(user)[1] == 1
+
+    network.groups = [list(G.nodes)]
+    assert network.version > version + 1
+
+
+def test_edits_drop_version_keyed_entries():
+    G, groups, activities = sl.generate_social_graph_fast(3, 12, 0.4, seed=2)
+    network = sl.SocialNetwork(G, groups, activities, use_csr=True)
+    users = list(G)
+    for user in users:
+        network.get_farthest_person(user)
+    network.graph_extent()
+    network.clustering()
+    assert len(network.cache._entries) == len(users) + 2
+
+    source = users[0]
+    target = next(user for user in users if user != source and not G.has_edge(source, user))
+    network.add_friendship(source, target)
+    assert len(network.cache._entries) == 0
+    assert network.get_farthest_person(source) == make_network(network.G).get_farthest_person(source)
+
+
+def test_menu_find_cliques_uses_top_k(monkeypatch, capsys):
+    G, groups, activities = sl.generate_social_graph_fast(4, 15, 0.6, seed=3)
+    network = sl.SocialNetwork(G, groups, activities, use_csr=True)
+    shown = []
+    monkeypatch.setattr(sl, "ask_positive_int", lambda prompt, default: 4)
+    monkeypatch.setattr(sl, "visualize_network", lambda *args, **kwargs: shown.append(kwargs["highlight_nodes"]))
+    monkeypatch.setattr(network, "find_cliques", lambda *args: pytest.fail("énumération complète"))
+
+    sl.menu_find_cliques(network)
+    expected = max(len(clique) for clique in nx.find_cliques(G) if len(clique) <= 4)
+    assert len(shown[0]) == expected
+    assert "Cercle #1" in capsys.readouterr().out
+
+
+def social_graph(seed: int = 4):
+    G, groups, activities = sl.generate_social_graph_fast(5, 20, 0.4, seed=seed)
+    return G, groups, activities
+
+
+def test_csr_matches_networkx_structure():
+    G, groups, activities = social_graph()
+    csr = sl.CSRGraph.from_networkx(G, groups)
+    assert csr.n == G.number_of_nodes() and csr.m == G.number_of_edges()
+    for row, user in enumerate(csr.node_ids.tolist()):
+        assert set(csr.node_ids[csr.neighbors(row)].tolist()) == set(G.neighbors(user))
+    assert nx.utils.graphs_equal(csr.to_networkx(), G)
+
+
+def test_recommendations_csr_and_batch_match_networkx():
+    G, groups, activities = social_graph()
+    reference = sl.SocialNetwork(G, groups, activities)
+    network = sl.SocialNetwork(G, groups, activities, use_csr=True)
+    batch = dict(pair for chunk in network.iter_friend_recommendations(max_recommendations=5, chunk_size=17)
+                 for pair in chunk)
+    for user in G:
+        expected = reference.get_friend_recommendations(user, 5)
+        assert network.get_friend_recommendations(user, 5) == expected
+        assert batch[user] == expected
+
+
+def test_edits_keep_csr_results_in_sync():
+    G, groups, activities = social_graph()
+    network = sl.SocialNetwork(G.copy(), groups, activities, use_csr=True)
+    users = list(G)
+    rng = np.random.default_rng(0)
+    for a, b in rng.choice(users, (40, 2)).tolist():
+        if G.has_edge(a, b):
+            G.remove_edge(a, b)
+            assert network.remove_friendship(a, b)
+        elif a != b:
+            G.add_edge(a, b)
+            assert network.add_friendship(a, b)
+        # G.copy() ne garde pas l'ordre des voisins, dont dépendent les égalités : référence sur network.G
+        assert nx.utils.graphs_equal(network.G, G)
+        reference = make_network(network.G)
+        assert network.get_farthest_person(a) == reference.get_farthest_person(a)
+        assert sorted(network.get_friend_recommendations(b, 50)) == sorted(reference.get_friend_recommendations(b, 50))
+
+
+def test_edits_patch_the_csr_in_networkx_order(monkeypatch):
+    G, groups, activities = social_graph()
+    network = sl.SocialNetwork(G, groups, activities, use_csr=True)
+    stats = network.stats
+    users = list(G)
+    rng = np.random.default_rng(1)
+
+    def rebuilt(*args, **kwargs):
+        raise AssertionError("CSR reconstruit depuis networkx")
+    from_networkx = sl.CSRGraph.from_networkx
+    monkeypatch.setattr(sl.CSRGraph, "from_networkx", rebuilt)
+
+    for _ in range(30):
+        # lots de modifications, y compris un même lien retiré puis rajouté dans le même lot
+        pairs = [tuple(pair) for pair in rng.choice(users, (4, 2)).tolist()]
+        for a, b in pairs + pairs[:2]:
+            if G.has_edge(a, b):
+                network.remove_friendship(a, b)
+            else:
+                network.add_friendship(a, b)
+        csr = network.get_csr()
+        expected = from_networkx(G, groups)
+        assert np.array_equal(csr.offsets, expected.offsets) and np.array_equal(csr.indices, expected.indices)
+        assert csr.m == G.number_of_edges() and np.array_equal(csr.group_ids, expected.group_ids)
+        assert stats.n_components() == nx.number_connected_components(G)
+
+
+def test_incremental_stats_match_full_report():
+    G, groups, activities = social_graph()
+    network = sl.SocialNetwork(G, groups, activities, use_csr=True)
+    network.stats
+    users = list(G)
+    network.add_friendships([(users[0], users[-1]), (users[1], users[-2])])
+    network.remove_friendships([next(iter(G.edges))])
+    incremental = network.graph_report().to_dict()
+    full = sl.build_graph_report(sl.CSRGraph.from_networkx(network.G, network.groups), network.groups,
+                                 network.group_activities).to_dict()
+    assert incremental == full
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_cliques_match_networkx(workers):
+    G, groups, activities = social_graph()
+    network = sl.SocialNetwork(G, groups, activities, use_csr=True)
+    expected = sorted(sorted(clique) for clique in nx.find_cliques(G) if len(clique) <= 5)
+    found = sorted(sorted(clique) for clique in network.iter_cliques(5, workers=workers))
+    assert found == expected
+
+    largest = network.largest_cliques(3, workers=workers)
+    sizes = sorted((len(clique) for clique in nx.find_cliques(G)), reverse=True)[:3]
+    assert [len(clique) for clique in largest] == sizes
+    assert all(G.subgraph(clique).number_of_edges() == len(clique) * (len(clique) - 1) // 2 for clique in largest)
+
+
+def test_rumor_estimate_is_deterministic_across_workers():
+    G, groups, activities = social_graph()
+    network = sl.SocialNetwork(G, groups, activities, use_csr=True)
+    origin = next(iter(G))
+    serial = network.estimate_rumor_spread(origin, 0.3, 6, 256, seed=7, workers=1)
+    parallel = network.estimate_rumor_spread(origin, 0.3, 6, 256, seed=7, workers=2)
+    assert np.array_equal(serial.coverage, parallel.coverage)
+    assert np.array_equal(serial.infection_probability, parallel.infection_probability)
+    assert serial.infection_probability[network.get_csr().index_of(origin)] == 1.0
+
+
+def test_rumor_probability_one_reaches_the_bfs_ball():
+    G, groups, activities = social_graph()
+    network = sl.SocialNetwork(G, groups, activities, use_csr=True)
+    origin = next(iter(G))
+    estimate = network.estimate_rumor_spread(origin, 1.0, 2, 64, seed=0, workers=1)
+    ball = nx.single_source_shortest_path_length(G, origin, cutoff=2)
+    expected = np.array([1.0 if user in ball else 0.0 for user in network.get_csr().node_ids.tolist()])
+    assert np.array_equal(estimate.infection_probability, expected)
+
+
+def test_communities_report_networkx_modularity():
+    G, groups, activities = sl.generate_social_graph_fast(6, 40, 0.5, seed=8)
+    network = sl.SocialNetwork(G, groups, activities, use_csr=True)
+    for method in ("louvain", "label_propagation"):
+        result = network.detect_communities(method, seed=0)
+        partition = [set(group) for group in network.groups]
+        assert sum(map(len, partition)) == G.number_of_nodes()
+        assert result.modularity == pytest.approx(nx.community.modularity(G, partition), abs=1e-9)
+        assert result.modularity > 0.3
+
+
+def test_import_edge_list_matches_networkx(tmp_path):
+    G, _, _ = social_graph()
+    path = tmp_path / "edges.csv"
+    with open(path, "w") as f:
+        f.write("source,target\n")
+        for a, b in G.edges:
+            f.write(f"u{a},u{b}\n")
+    network, report = sl.import_edge_list(str(path), memory_limit=1 << 20)
+    imported = nx.relabel_nodes(network.get_csr().to_networkx(), network.user_label)
+    assert report.n_edges == G.number_of_edges()
+    assert sorted(map(sorted, imported.edges)) == sorted(sorted((f"u{a}", f"u{b}")) for a, b in G.edges)
+
+
+def test_import_removes_the_header_line_not_a_comment(tmp_path):
+    comments = "# colonnes : source,target\n% source,target\n"
+    path = tmp_path / "edges.csv"
+    for rows, header in (("alice,bob\nbob,carol\n", True), ("1,2\n2,3\n", None)):
+        path.write_text(comments + "source,target\n" + rows)
+        network, report = sl.import_edge_list(str(path), header=header)
+        imported = nx.relabel_nodes(network.get_csr().to_networkx(), network.user_label)
+        assert sorted(map(sorted, imported.edges)) == [line.split(",") for line in rows.splitlines()]
+        assert report.n_nodes == 3 and report.skipped == 0
+
+
+def test_save_and_load_round_trip(tmp_path):
+    G, groups, activities = social_graph()
+    network = sl.SocialNetwork(G, groups, activities, use_csr=True)
+    path = str(tmp_path / "network.slk")
+    sl.save_network(network, path)
+    for mmap in (True, False):
+        loaded = sl.load_network(path, mmap=mmap)
+        assert nx.utils.graphs_equal(loaded.G, G)
+        assert sorted(map(sorted, loaded.groups)) == sorted(map(sorted, groups))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_centrality_and_clustering_match_networkx(workers):
+    G, groups, activities = social_graph()
+    network = sl.SocialNetwork(G, groups, activities, use_csr=True)
+    users = network.get_csr().node_ids.tolist()
+
+    centrality = network.centrality(n_samples=G.number_of_nodes(), seed=0, workers=workers)
+    betweenness, closeness, pagerank = nx.betweenness_centrality(G), nx.closeness_centrality(G), nx.pagerank(G)
+    assert np.allclose(centrality.betweenness, [betweenness[user] for user in users])
+    assert np.allclose(centrality.closeness, [closeness[user] for user in users])
+    assert np.allclose(centrality.pagerank, [pagerank[user] for user in users], atol=1e-6)
+
+    clustering = sl.compute_clustering(network.get_csr(), workers, chunk_wedges=200)
+    triangles, local = nx.triangles(G), nx.clustering(G)
+    assert clustering.triangles.tolist() == [triangles[user] for user in users]
+    assert np.allclose(clustering.clustering, [local[user] for user in users])
+    assert clustering.transitivity == pytest.approx(nx.transitivity(G))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parallel_distance_queries_match_networkx(workers):
+    G = next(random_graphs())
+    network = make_network(G)
+    network.build_landmarks(3, workers=workers)
+    truth = dict(nx.all_pairs_shortest_path_length(G))
+    pairs = [(a, b) for a in G for b in G]
+    lower, upper = network.distances(pairs, workers=workers)
+    assert np.array_equal(lower, [truth[a].get(b, np.inf) for a, b in pairs])
+    assert np.array_equal(lower, upper)
+    for a, b in pairs[::37]:
+        path = network.shortest_path(a, b)
+        assert (path is None) == (b not in truth[a])
+        if path is not None:
+            assert len(path) - 1 == truth[a][b] and all(G.has_edge(u, v) for u, v in zip(path, path[1:]))
+
+
+def test_sweep_is_deterministic_and_resumes(tmp_path):
+    G, groups, activities = social_graph()
+    network = sl.SocialNetwork(G, groups, activities, use_csr=True)
+    users = list(G)
+    grid = dict(origins=[users[0], [users[1], users[2]]], probabilities=[0.2, 0.5], max_steps=[3])
+
+    sl.run_rumor_sweep(network, str(tmp_path / "serial.slsw"), n_simulations=96, seed=3, workers=1, **grid)
+    sl.run_rumor_sweep(network, str(tmp_path / "parallel.slsw"), n_simulations=96, seed=3, workers=2, **grid)
+    partial = str(tmp_path / "partial.slsw")
+    sl.run_rumor_sweep(network, partial, origins=grid["origins"][:1], probabilities=[0.5], max_steps=[3],
+                       n_simulations=96, seed=3, workers=1)
+    progress = sl.run_rumor_sweep(network, partial, n_simulations=96, seed=3, workers=1, **grid)
+    assert progress.cells_resumed == 1
+
+    def by_cell(path):
+        results = sl.load_sweep_results(path)
+        order = np.lexsort((results["step"], results["probability"], results["origins"]))
+        return {name: values[order] for name, values in results.items()}
+
+    serial = by_cell(str(tmp_path / "serial.slsw"))
+    for other in (by_cell(str(tmp_path / "parallel.slsw")), by_cell(partial)):
+        for name, values in serial.items():
+            assert np.array_equal(values, other[name]), name
+
+
+def test_seed_selection_covers_components_with_certain_spread():
+    G = nx.disjoint_union_all([nx.path_graph(30), nx.cycle_graph(20), nx.star_graph(5)])
+    network = make_network(G)
+    selection = network.select_rumor_seeds(3, probability=1.0, max_steps=100, n_samples=4000, seed=0, workers=2)
+    components = [next(i for i, c in enumerate(nx.connected_components(G)) if seed in c) for seed in selection.seeds]
+    assert sorted(components) == [0, 1, 2]
+    assert selection.expected_spread == pytest.approx(G.number_of_nodes(), rel=0.1)
+
+
+def test_embedding_index_recall_against_exact_search():
+    G, groups, activities = sl.generate_social_graph_fast(8, 40, 0.3, seed=6)
+    network = sl.SocialNetwork(G, groups, activities, use_csr=True)
+    index = network.embeddings("walks", dim=32)
+    recall = index.evaluate(n_queries=50, k=5, seed=0)
+    assert recall.ann_recall >= 0.8
+    user = next(iter(G))
+    assert all(not G.has_edge(user, other) and other != user for other, _ in index.query(user, 5))
+
+
+@pytest.fixture
+def network_file(tmp_path):
+    path = str(tmp_path / "network.slk")
+    assert sl.main(["generate", "--groups", "5", "--max-people", "30", "--seed", "1", "--output", path]) == 0
+    return path
+
+
+@pytest.mark.parametrize("clustering", [False, True])
+def test_cli_analyze_csv(tmp_path, network_file, clustering):
+    output = str(tmp_path / "analyze.csv")
+    argv = ["analyze", "--network", network_file, "--format", "csv", "--output", output]
+    assert sl.main(argv + ["--clustering"] * clustering) == 0
+    with open(output, encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    network = sl.load_network(network_file)
+    local = nx.clustering(network.G)
+    assert rows[0] == ["group", "activity", "size", "internal_edges"] + ["clustering"] * clustering
+    assert len(rows) == len(network.groups) + 1
+    for row, group in zip(rows[1:], network.groups):
+        assert len(row) == len(rows[0])
+        assert int(row[2]) == len(group)
+        assert int(row[3]) == network.G.subgraph(group).number_of_edges()
+        if clustering:
+            assert float(row[4]) == pytest.approx(np.mean([local[user] for user in group]))
+
+
+def test_benchmarks_time_the_named_functions(monkeypatch):
+    calls = []
+
+    def spy(owner, name):
+        original = getattr(owner, name)
+        if isinstance(owner, type):
+            def wrapper(self, *args, **kwargs):
+                calls.append((name, self.use_csr))
+                return original(self, *args, **kwargs)
+        else:
+            def wrapper(*args, **kwargs):
+                calls.append((name, None))
+                return original(*args, **kwargs)
+        monkeypatch.setattr(owner, name, wrapper)
+
+    for name in ("get_friend_recommendations", "get_farthest_person", "propagate_rumor", "find_cliques"):
+        spy(sl.SocialNetwork, name)
+    for name in ("generate_social_graph", "analyze_graph"):
+        spy(sl, name)
+
+    for operation, expected in [("generate", ("generate_social_graph", None)),
+                                ("analyze", ("analyze_graph", None)),
+                                ("cliques", ("find_cliques", False)),
+                                ("recommend", ("get_friend_recommendations", False)),
+                                ("recommend_csr", ("get_friend_recommendations", True)),
+                                ("farthest", ("get_farthest_person", False)),
+                                ("farthest_csr", ("get_farthest_person", True)),
+                                ("rumor", ("propagate_rumor", False)),
+                                ("rumor_csr", ("propagate_rumor", True))]:
+        calls.clear()
+        results = sl.run_benchmarks([300], operations=[operation], track_memory=False)
+        assert [result.operation for result in results] == [operation]
+        assert expected in calls and set(calls) == {expected}, operation
+
+
+def group_statistics(G: nx.Graph, groups: List[List[int]]) -> Tuple[np.ndarray, float, float]:
+    group_of = {user: k for k, group in enumerate(groups) for user in group}
+    sizes = np.array([len(group) for group in groups])
+    intra = sum(group_of[a] == group_of[b] for a, b in G.edges)
+    inter = G.number_of_edges() - intra
+    n_pairs = len(groups) * (len(groups) - 1) // 2
+    return sizes, intra / int((sizes * (sizes - 1) // 2).sum()), inter / n_pairs
+
+
+def test_sample_social_edges_is_seeded():
+    first = sl.sample_social_edges(12, 30, 0.3, seed=7)
+    second = sl.sample_social_edges(12, 30, 0.3, seed=7)
+    for a, b in zip(first[:3], second[:3]):
+        assert np.array_equal(a, b)
+    assert first[3] == second[3]
+    assert not np.array_equal(first[2], sl.sample_social_edges(12, 30, 0.3, seed=8)[2])
+
+    src, dst, sizes, _ = first
+    keys = np.minimum(src, dst).astype(np.int64) * sizes.sum() + np.maximum(src, dst)
+    assert len(np.unique(keys)) == len(keys) and not np.any(src == dst)
+
+
+def test_generate_social_graph_fast_matches_reference_statistics():
+    random.seed(3)
+    reference = group_statistics(*sl.generate_social_graph(40, 30, 0.3)[:2])
+    G, groups, activities = sl.generate_social_graph_fast(40, 30, 0.3, seed=3)
+    fast = group_statistics(G, groups)
+
+    assert sorted(activities) == list(range(40))
+    assert sorted(chain.from_iterable(groups)) == sorted(G.nodes)
+    for sizes in (reference[0], fast[0]):
+        assert sizes.min() >= 5 and sizes.max() <= 30
+    assert fast[0].mean() == pytest.approx(reference[0].mean(), rel=0.15)
+    assert fast[1] == pytest.approx(0.3, abs=0.02) and reference[1] == pytest.approx(0.3, abs=0.02)
+    # 2 à 5 ponts par paire de groupes : 3,5 en moyenne
+    assert fast[2] == pytest.approx(reference[2], abs=0.25)
+
+
+def run_cli(capfd, *argv) -> str:
+    # les sous-commandes écrivent directement sur le descripteur de stdout
+    capfd.readouterr()
+    assert sl.main([str(arg) for arg in argv]) == 0
+    return capfd.readouterr().out
+
+
+def test_cli_does_not_import_matplotlib():
+    code = f"import importlib.util, sys; spec = importlib.util.spec_from_file_location('social_link', {_PATH!r}); " \
+           "module = importlib.util.module_from_spec(spec); spec.loader.exec_module(module); " \
+           "print(any(name.startswith('matplotlib') for name in sys.modules))"
+    assert subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout == "False\n"
+
+
+def test_cli_generate_and_analyze(capfd, tmp_path):
+    path = tmp_path / "network.slk"
+    summary = json.loads(run_cli(capfd, "generate", "--groups", 5, "--max-people", 30, "--seed", 1, "--output", path))
+    network = sl.load_network(str(path))
+    assert summary["n_nodes"] == network.G.number_of_nodes() and summary["n_edges"] == network.G.number_of_edges()
+    assert summary["n_groups"] == len(network.groups) == 5
+    again = tmp_path / "again.slk"
+    run_cli(capfd, "generate", "--groups", 5, "--max-people", 30, "--seed", 1, "--output", again)
+    assert again.read_bytes() == path.read_bytes()
+
+    report = json.loads(run_cli(capfd, "analyze", "--network", path, "--clustering"))
+    assert report["n_nodes"] == network.G.number_of_nodes() and report["n_edges"] == network.G.number_of_edges()
+    assert report["transitivity"] == pytest.approx(nx.transitivity(network.G))
+    text = run_cli(capfd, "analyze", "--network", path, "--format", "text")
+    assert f"Nombre de connexions : {network.G.number_of_edges()}" in text
+
+
+def test_cli_recommend(capfd, network_file):
+    network = sl.load_network(network_file)
+    users = [0, 7, 19]
+    rows = json.loads(run_cli(capfd, "recommend", "--network", network_file, "--users", "0,7,19", "--top", 3))
+    assert [row["user"] for row in rows] == users
+    for row in rows:
+        assert [tuple(item) for item in row["recommendations"]] == network.get_friend_recommendations(row["user"], 3)
+
+    lines = run_cli(capfd, "recommend", "--network", network_file, "--format", "csv", "--chunk-size", 16).splitlines()
+    assert lines[0] == "user,rank,recommended_user,common_friends"
+    assert {int(line.split(",")[0]) for line in lines[1:]} <= set(network.G)
+
+
+def test_cli_cliques(capfd, network_file):
+    network = sl.load_network(network_file)
+    found = json.loads(run_cli(capfd, "cliques", "--network", network_file, "--min-size", 3))
+    expected = sorted(sorted(c) for c in nx.find_cliques(network.G) if len(c) >= 3)
+    assert sorted(found) == expected
+    top = json.loads(run_cli(capfd, "cliques", "--network", network_file, "--top", 2))
+    assert [len(c) for c in top] == sorted(map(len, expected), reverse=True)[:2]
+    lines = run_cli(capfd, "cliques", "--network", network_file, "--format", "csv", "--top", 2).splitlines()
+    assert lines[0] == "clique,size,members" and len(lines) == 3
+
+
+def test_cli_rumor(capfd, network_file):
+    result = json.loads(run_cli(capfd, "rumor", "--network", network_file, "--origin", 0, "--probability", 1.0,
+                                "--max-steps", 100, "--simulations", 20, "--seed", 1))
+    network = sl.load_network(network_file)
+    reachable = len(nx.node_connected_component(network.G, 0))
+    assert result["coverage_mean"] == pytest.approx(reachable / network.G.number_of_nodes())
+    lines = run_cli(capfd, "rumor", "--network", network_file, "--origin", 0, "--format", "csv",
+                    "--simulations", 20, "--seed", 1).splitlines()
+    assert lines[0] == "user,infection_probability,expected_time" and lines[1].startswith("0,1.0,")
+    capfd.readouterr()
+    assert sl.main(["rumor", "--network", network_file, "--origin", "99999"]) == 1
+
+
+def test_cli_distance(capfd, network_file):
+    network = sl.load_network(network_file)
+    pairs = [(0, 7), (3, 19), (5, 5)]
+    expected = [nx.shortest_path_length(network.G, a, b) if nx.has_path(network.G, a, b) else None for a, b in pairs]
+    text = ",".join(f"{a}:{b}" for a, b in pairs)
+    for extra in ([], ["--landmarks", 4]):
+        result = json.loads(run_cli(capfd, "distance", "--network", network_file, "--pairs", text, "--path", *extra))
+        assert result["exact"] and result["n_pairs"] == len(pairs)
+        assert [item["lower"] for item in result["pairs"]] == [item["upper"] for item in result["pairs"]] == expected
+        for item, length in zip(result["pairs"], expected):
+            assert item["path"] is None if length is None else len(item["path"]) == length + 1
+
+    lines = run_cli(capfd, "distance", "--network", network_file, "--pairs", text, "--format", "csv").splitlines()
+    assert lines[0] == "source,target,lower,upper"
+    assert [line.split(",")[2] for line in lines[1:]] == ["" if length is None else str(length) for length in expected]
+
+    estimate = json.loads(run_cli(capfd, "distance", "--network", network_file, "--pairs", text, "--estimate",
+                                  "--landmarks", 4))
+    assert not estimate["exact"] and estimate["landmarks"]["n_landmarks"] == 4
+    for item, length in zip(estimate["pairs"], expected):
+        if length is not None:
+            assert item["lower"] <= length <= item["upper"]
+    capfd.readouterr()
+    assert sl.main(["distance", "--network", network_file, "--pairs", text, "--estimate"]) == 1
+    assert "--landmarks" in capfd.readouterr().err
+
+
+def test_cli_import(capfd, tmp_path):
+    G, _, _ = social_graph()
+    path = tmp_path / "edges.txt"
+    with open(path, "w") as f:
+        f.write("# poids;source;cible\n")
+        for a, b in G.edges:
+            f.write(f"1;u{a};u{b}\n")
+    output = tmp_path / "imported.slk"
+    report = json.loads(run_cli(capfd, "import", "--input", path, "--output", output, "--columns", "1,2",
+                                "--delimiter", ";", "--ids", "str", "--memory-limit", "1M", "--temp-dir", tmp_path,
+                                "--quiet"))
+    assert report["string_ids"] and report["skipped"] == 0
+    assert report["n_nodes"] == G.number_of_nodes() - nx.number_of_isolates(G)
+    assert report["n_edges"] == G.number_of_edges()
+    network = sl.load_network(str(output))
+    imported = nx.relabel_nodes(network.get_csr().to_networkx(), network.user_label)
+    assert sorted(map(sorted, imported.edges)) == sorted(sorted((f"u{a}", f"u{b}")) for a, b in G.edges)
+    assert capfd.readouterr().err == ""
+
+    assert sl.main(["import", "--input", str(path), "--output", str(output), "--columns", "1,2"]) == 0
+    captured = capfd.readouterr()
+    assert json.loads(captured.out)["n_edges"] == G.number_of_edges()
+    assert f"{G.number_of_edges()} arêtes lues" in captured.err
+
+
+def test_cli_clustering(capfd, tmp_path, network_file):
+    network = sl.load_network(network_file)
+    result = json.loads(run_cli(capfd, "clustering", "--network", network_file, "--workers", 2))
+    assert result["n_triangles"] == sum(nx.triangles(network.G).values()) // 3
+    assert result["transitivity"] == pytest.approx(nx.transitivity(network.G))
+    assert result["average_clustering"] == pytest.approx(nx.average_clustering(network.G))
+    assert [group["size"] for group in result["groups"]] == list(map(len, network.groups))
+
+    output = tmp_path / "clustering.csv"
+    assert run_cli(capfd, "clustering", "--network", network_file, "--format", "csv", "--output", output) == ""
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+    triangles, clustering = nx.triangles(network.G), nx.clustering(network.G)
+    assert sorted(int(row["user"]) for row in rows) == sorted(network.G)
+    for row in rows:
+        assert int(row["triangles"]) == triangles[int(row["user"])]
+        assert float(row["clustering"]) == pytest.approx(clustering[int(row["user"])])
+
+
+@pytest.mark.parametrize("method", sl.EMBEDDING_METHODS)
+def test_cli_embed(capfd, network_file, method):
+    result = json.loads(run_cli(capfd, "embed", "--network", network_file, "--method", method, "--dim", 8,
+                                "--queries", 20, "--top", 3, "--seed", 1))
+    assert result["method"] == method and result["dim"] == 8 and result["n_queries"] == 20 and result["k"] == 3
+    assert 0 <= result["ann_recall"] <= 1 and 0 <= result["common_recall"] <= 1 and result["n_lists"] >= 1
+
+    network = sl.load_network(network_file)
+    index = network.embeddings(method)
+    rows = json.loads(run_cli(capfd, "recommend", "--network", network_file, "--mode", "embedding",
+                              "--method", method, "--users", "0,7", "--top", 3))
+    assert [row["user"] for row in rows] == [0, 7]
+    for row in rows:
+        assert len(row["recommendations"]) == 3
+        assert [(v, pytest.approx(score)) for v, score in row["recommendations"]] == index.query(row["user"], 3)
+
+
+def test_cli_centrality(capfd, network_file):
+    network = sl.load_network(network_file)
+    n = network.G.number_of_nodes()
+    result = json.loads(run_cli(capfd, "centrality", "--network", network_file, "--samples", n, "--top", 3))
+    assert result["n_samples"] == n and result["confidence"] == 0.95
+    for measure, expected in (("betweenness", nx.betweenness_centrality(network.G)),
+                              ("closeness", nx.closeness_centrality(network.G)),
+                              ("pagerank", nx.pagerank(network.G))):
+        assert len(result[measure]) == 3
+        for user, value in result[measure]:
+            assert value == pytest.approx(expected[user], abs=1e-6)
+        assert result[measure][0][1] == pytest.approx(max(expected.values()), abs=1e-6)
+
+    lines = run_cli(capfd, "centrality", "--network", network_file, "--format", "csv", "--samples", 16,
+                    "--workers", 2).splitlines()
+    assert lines[0] == "user,pagerank,betweenness,betweenness_error,closeness"
+    assert sorted(int(line.split(",")[0]) for line in lines[1:]) == sorted(network.G)
+
+
+@pytest.mark.parametrize("method", ["louvain", "label_propagation"])
+def test_cli_communities(capfd, tmp_path, network_file, method):
+    G = sl.load_network(network_file).G
+    saved = tmp_path / "communities.slk"
+    result = json.loads(run_cli(capfd, "communities", "--network", network_file, "--method", method, "--seed", 1,
+                                "--top", 2, "--save", saved))
+    assert result["method"] == method and len(result["sizes"]) == min(2, result["n_communities"])
+
+    lines = run_cli(capfd, "communities", "--network", network_file, "--method", method, "--seed", 1,
+                    "--format", "csv").splitlines()
+    assert lines[0] == "user,community"
+    labels = dict(tuple(map(int, line.split(","))) for line in lines[1:])
+    partition = {}
+    for user, label in labels.items():
+        partition.setdefault(label, set()).add(user)
+    assert set(labels) == set(G) and len(partition) == result["n_communities"]
+    assert result["modularity"] == pytest.approx(nx.community.modularity(G, partition.values()), abs=1e-9)
+
+    network = sl.load_network(str(saved))
+    assert sorted(map(sorted, network.groups)) == sorted(map(sorted, partition.values()))
+    assert network.group_activities[0] == "Communauté 1"
+
+
+def test_cli_sweep(capfd, tmp_path, network_file):
+    output, export = tmp_path / "sweep.slsw", tmp_path / "sweep.csv"
+    argv = ["sweep", "--network", network_file, "--output", output, "--origins", "0,5+7", "--probabilities", "0.3,1",
+            "--max-steps", 3, "--simulations", 32, "--seed", 2, "--workers", 1]
+    capfd.readouterr()
+    assert sl.main([str(arg) for arg in argv + ["--export", export]]) == 0
+    captured = capfd.readouterr()
+    state = json.loads(captured.out)
+    assert state["cells_total"] == state["cells_done"] == 4 and state["cells_resumed"] == 0
+    assert state["simulations"] == 4 * 32 and "4/4 cellules" in captured.err
+
+    state = json.loads(run_cli(capfd, *argv))
+    assert state["cells_resumed"] == 4 and state["simulations"] == 0
+
+    direct = tmp_path / "direct.slsw"
+    sl.run_rumor_sweep(sl.load_network(network_file), str(direct), [[0], [5, 7]], [0.3, 1.0], [3], 32, 2, 1)
+    results, expected = sl.load_sweep_results(str(output)), sl.load_sweep_results(str(direct))
+    with open(export, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(expected) and len(rows) - 1 == len(expected["step"])
+    for name, values in expected.items():
+        assert np.array_equal(results[name], values), name
+
+
+def test_cli_serve_and_loadgen(capfd, network_file):
+    n = sl.load_network(network_file).G.number_of_nodes()
+    server = subprocess.Popen([sys.executable, _PATH, "serve", "--network", network_file, "--port", "0",
+                               "--workers", "2"], stderr=subprocess.PIPE, text=True)
+    try:
+        ready = server.stderr.readline()
+        assert ready.startswith("Serveur prêt sur 127.0.0.1:") and f"({n} personnes)" in ready
+        port = ready.split(":")[1].split()[0]
+        report = json.loads(run_cli(capfd, "loadgen", "--port", port, "--requests", 200, "--concurrency", 8,
+                                    "--users", n, "--mix", "recommend=4,farthest=2,rumor=1,add_friendship=1", "--seed", 1))
+        assert report["requests"] == 200 and report["errors"] == 0
+        assert sum(report[op]["count"] for op in ("recommend", "farthest", "rumor", "add_friendship")) == 200
+
+        capfd.readouterr()
+        assert sl.main(["loadgen", "--port", port, "--requests", "10", "--concurrency", "2", "--mix", "inconnue=1"]) == 1
+        assert json.loads(capfd.readouterr().out)["errors"] == 10
+    finally:
+        server.send_signal(signal.SIGINT)
+        assert server.wait(timeout=30) == 0
+        server.stderr.close()
+
+
+def test_cli_bench(capfd, tmp_path):
+    first, baseline = tmp_path / "first.json", tmp_path / "baseline.json"
+    argv = ["bench", "--scales", "200", "--groups", "4", "--operations", "recommend,farthest_csr", "--no-memory",
+            "--repeat", "2"]
+    capfd.readouterr()
+    assert sl.main(argv + ["--results", str(first)]) == 0
+    assert "recommend" in capfd.readouterr().err
+    with open(first, encoding="utf-8") as f:
+        payload = json.load(f)
+    assert payload["meta"]["numpy"] == np.__version__
+    assert [(r["operation"], r["scale"], r["nb_groups"]) for r in payload["results"]] == [
+        ("recommend", 200, 4), ("farthest_csr", 200, 4)]
+    assert all(r["peak_memory"] is None and r["seconds"] > 0 for r in payload["results"])
+
+    # une référence 100 fois plus rapide signale une régression, qui n'échoue qu'avec --fail-on-regression
+    measured = [r["seconds"] for r in payload["results"]]
+    for scale, regression in ((1e-2, True), (1e2, False)):
+        for result, seconds in zip(payload["results"], measured):
+            result["seconds"] = seconds * scale
+        with open(baseline, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        for fail in (False, True):
+            capfd.readouterr()
+            argv_run = argv + ["--results", str(tmp_path / "run.json"), "--baseline", str(baseline)]
+            assert sl.main(argv_run + ["--fail-on-regression"] * fail) == int(regression and fail)
+            assert ("[RÉGRESSION] recommend (n=200, groupes=4" in capfd.readouterr().err) == regression
+
+
+def test_metrics_nested_spans_and_counters():
+    metrics = sl.Metrics()
+    with metrics.span("ignored"):
+        metrics.count("visited", 5)
+    assert metrics.snapshot() == {"latency": {}, "counters": [], "spans": {}}
+
+    metrics.enable()
+    for _ in range(3):
+        with metrics.span("outer"):
+            metrics.count("visited", 2)
+            with metrics.span("inner"):
+                metrics.count("visited")
+    snapshot = metrics.snapshot()
+    assert snapshot["spans"].keys() == {"outer", "outer/inner"}
+    assert snapshot["spans"]["outer/inner"]["calls"] == 3
+    assert snapshot["spans"]["outer"]["total"] >= snapshot["spans"]["outer/inner"]["total"]
+    assert snapshot["counters"] == [{"name": "visited", "function": "inner", "value": 3},
+                                    {"name": "visited", "function": "outer", "value": 6}]
+    latency = snapshot["latency"]["inner"]
+    assert latency["count"] == sum(latency["buckets"].values()) == 3
+    assert json.loads(metrics.to_json()) == json.loads(json.dumps(snapshot))
+
+
+def test_metrics_prometheus_text():
+    metrics = sl.Metrics(buckets=(0.5, 1.0))
+    metrics.enable()
+    metrics._observe('say "hi"', 'say "hi"', 0.7)
+    metrics._observe('say "hi"', 'say "hi"', 2.0)
+    with metrics.span("work"):
+        metrics.count("edges_scanned", 4)
+    lines = metrics.to_prometheus("test").splitlines()
+    assert "# TYPE test_call_duration_seconds histogram" in lines
+    buckets = [line for line in lines if line.startswith('test_call_duration_seconds_bucket{function="say \\"hi\\""')]
+    assert [line.rsplit(" ", 1)[1] for line in buckets] == ["0", "1", "2"]
+    assert 'test_call_duration_seconds_count{function="say \\"hi\\""} 2' in lines
+    assert "# TYPE test_edges_scanned_total counter" in lines
+    assert 'test_edges_scanned_total{function="work"} 4' in lines
+
+
+def test_instrumented_methods_and_cli_metrics(capfd, tmp_path, network_file):
+    network = sl.load_network(network_file)
+    sl.METRICS.reset()
+    sl.METRICS.enable()
+    try:
+        network.get_friend_recommendations(0)
+        network.get_friend_recommendations(0)
+        snapshot = sl.METRICS.snapshot()
+    finally:
+        sl.METRICS.disable()
+        sl.METRICS.reset()
+    counters = {(item["name"], item["function"]): item["value"] for item in snapshot["counters"]}
+    assert sum(value for (name, _), value in counters.items() if name in ("cache_hits", "cache_misses")) == 2
+    assert snapshot["latency"]
+
+    path = tmp_path / "metrics.prom"
+    run_cli(capfd, "--metrics", path, "recommend", "--network", network_file, "--users", "0")
+    assert "sociallink_call_duration_seconds_count" in path.read_text(encoding="utf-8")
+    sl.METRICS.disable()
+    sl.METRICS.reset()
+
+
+def test_profile_call_captures_cpu_and_memory(tmp_path):
+    def allocate(n: int) -> int:
+        return len([bytes(1000) for _ in range(n)])
+
+    path = str(tmp_path / "call.pstats")
+    profile = sl.profile_call(allocate, (2000,), cpu=True, memory=True, top=5, stats_path=path)
+    assert profile.result == 2000 and profile.seconds > 0
+    assert "allocate" in profile.stats and os.path.getsize(path) > 0
+    assert profile.peak_memory >= 2000 * 1000
+    assert 0 < len(profile.top_allocations) <= 5
+
+    bare = sl.profile_call(allocate, kwargs={"n": 10}, cpu=False)
+    assert bare.result == 10 and bare.stats is None and bare.peak_memory is None and bare.top_allocations == []
+
+
+@pytest.fixture
+def shown_figures(monkeypatch):
+    matplotlib = pytest.importorskip("matplotlib")
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    figures = []
+    monkeypatch.setattr(plt, "show", lambda *args, **kwargs: figures.append(plt.gcf()))
+    yield figures
+    plt.close("all")
+
+
+def drawn_collections(figure) -> Tuple[list, list]:
+    from matplotlib.collections import LineCollection, PathCollection
+
+    ax = figure.axes[0]
+    lines = [c for c in ax.collections if isinstance(c, LineCollection)]
+    points = [c for c in ax.collections if isinstance(c, PathCollection)]
+    return lines, points
+
+
+def test_visualize_network_batches_edges_and_limits_labels(shown_figures):
+    G, groups, activities = social_graph()
+    network = sl.SocialNetwork(G, groups, activities)
+    sl.visualize_network(network, label_threshold=1000)
+    sl.visualize_network(network, highlight_nodes={0, 5}, label_threshold=10)
+
+    for figure, n_labels in zip(shown_figures, (G.number_of_nodes(), 2)):
+        lines, points = drawn_collections(figure)
+        assert len(lines) == 1 and len(lines[0].get_segments()) == G.number_of_edges()
+        assert len(points) == 1 and len(points[0].get_offsets()) == G.number_of_nodes()
+        assert len(figure.axes[0].texts) == n_labels
+    highlighted = shown_figures[1].axes[0].texts
+    assert sorted(text.get_text() for text in highlighted) == ["0", "5"]
+
+
+def test_visualize_group_network_counts_links_between_groups(shown_figures):
+    G, groups, activities = social_graph()
+    network = sl.SocialNetwork(G, groups, activities)
+    group_of = {user: k for k, group in enumerate(groups) for user in group}
+    between = {}
+    for a, b in G.edges:
+        if group_of[a] != group_of[b]:
+            key = tuple(sorted((group_of[a], group_of[b])))
+            between[key] = between.get(key, 0) + 1
+
+    sl.visualize_network(network, max_nodes=10)
+    sl.visualize_group_network(network, max_links=3)
+    for figure, n_links in zip(shown_figures, (len(between), 3)):
+        lines, points = drawn_collections(figure)
+        assert len(points) == 1 and len(points[0].get_offsets()) == len(groups)
+        assert len(lines) == 1 and len(lines[0].get_segments()) == n_links
+    title = shown_figures[0].axes[0].get_title()
+    assert f"{sum(between.values())} liens entre groupes" in title
+
+    labels = {text.get_text() for text in shown_figures[0].axes[0].texts}
+    assert {str(count) for count in between.values()} <= labels
+
+
+@pytest.mark.parametrize("use_csr", [False, True])
+def test_rumor_frames_keep_rumor_state(use_csr):
+    pytest.importorskip("matplotlib")
+    G, groups, activities = social_graph()
+    network = sl.SocialNetwork(G, groups, activities, use_csr=use_csr)
+    random.seed(5)
+    last = network.propagate_rumor(3, 0.4, 6)
+    random.seed(9)
+    expected = dict(network.propagate_rumor(0, 0.4, 6))
+    network.rumor_state = last
+
+    random.seed(9)
+    frames = sl.build_rumor_frames(network, 0, 0.4, 6)
+    assert network.rumor_state is last
+    assert frames.n_frames == max(expected.values()) + 1
+    steps = dict(zip(frames.node_ids.tolist(), frames.infection_step.tolist()))
+    assert {user: step for user, step in steps.items() if step >= 0} == expected
+    assert frames.node_colors.shape == (frames.n_frames, G.number_of_nodes(), 4)
+    for frame, new in enumerate(frames.new_nodes[1:], 1):
+        assert sorted(frames.node_ids[new].tolist()) == sorted(u for u, s in expected.items() if s == frame)
+    infected_edges = {tuple(sorted(e)) for e in G.edges if e[0] in expected and e[1] in expected}
+    drawn = {tuple(sorted((int(frames.node_ids[a]), int(frames.node_ids[b]))))
+             for a, b, step in zip(frames.src, frames.dst, frames.edge_step) if step < frames.n_frames}
+    assert drawn == infected_edges
+    assert sl.build_rumor_frames(network, 99999) is None
+
+
+def test_export_rumor_animation_gif(tmp_path):
+    pytest.importorskip("matplotlib")
+    Image = pytest.importorskip("PIL.Image")
+    network = make_network(nx.path_graph(8))
+    frames = sl.build_rumor_frames(network, 0, 1.0, 4)
+    assert frames.n_frames == 5
+
+    images = []
+    for workers in (1, 2):
+        path = str(tmp_path / f"rumor-{workers}.gif")
+        assert sl.export_rumor_animation(frames, path, fps=4, dpi=20, workers=workers) == 5
+        with Image.open(path) as gif:
+            assert gif.n_frames == 5
+            pictures = []
+            for index in range(gif.n_frames):
+                gif.seek(index)
+                pictures.append(np.asarray(gif.convert("RGB")))
+            images.append(pictures)
+    assert all(np.array_equal(a, b) for a, b in zip(*images))
+
+    with pytest.raises(ValueError):
+        sl.export_rumor_animation(frames, str(tmp_path / "rumor.avi"))
+
+
+def test_realtime_rumor_uses_one_scene(shown_figures, capsys):
+    network = make_network(nx.path_graph(6))
+    sl.visualize_rumor_propagation_realtime(network, 0, 1.0, 10)
+    scene_texts = [text.get_text() for text in shown_figures[0].axes[0].texts]
+    assert sorted(scene_texts[:6]) == [str(user) for user in range(6)]
+    assert "Utilisateurs infectés : 6 (100.00%)" in capsys.readouterr().out
+
+
+def test_cli_animate(capfd, tmp_path, network_file):
+    pytest.importorskip("PIL")
+    path = tmp_path / "rumor.gif"
+    result = json.loads(run_cli(capfd, "animate", "--network", network_file, "--origin", 0, "--probability", 1.0,
+                                "--max-steps", 2, "--output", path, "--dpi", 20, "--workers", 1))
+    assert result["frames"] == 3 and path.stat().st_size > 0
+    assert result["infected"] == len(nx.ego_graph(sl.load_network(network_file).G, 0, radius=2))
+
+
+def test_layout_cache_is_keyed_by_version_and_seed():
+    G, groups, activities = social_graph()
+    network = sl.SocialNetwork(G, groups, activities)
+    for kind in sl.LAYOUTS:
+        positions = network.layout(kind)
+        assert positions.shape == (G.number_of_nodes(), 2) and np.all(np.isfinite(positions))
+        assert network.layout(kind) is positions
+    forced = network.layout("force")
+    assert network.layout("force", seed=1) is not forced and network.layouts["force"]["seed"] == 1
+
+    circular = nx.circular_layout(G)
+    users = network.get_csr().node_ids.tolist()
+    # networkx calcule les angles en float32
+    assert np.allclose(network.layout("circular"), [circular[user] for user in users], atol=1e-6)
+
+    before = network.layout("groups")
+    a, b = next((a, b) for a in G for b in G if a < b and not G.has_edge(a, b))
+    network.add_friendship(a, b)
+    assert network.layout("groups") is not before and np.allclose(network.layout("groups"), before)
+
+    network.G = nx.path_graph(5)
+    assert network.layouts == {}
+    assert network.layout("circular").shape == (5, 2)
+
+
+def test_groups_layout_clusters_each_group():
+    G, groups, activities = social_graph()
+    network = sl.SocialNetwork(G, groups, activities)
+    positions = network.layout("groups")
+    row = {user: i for i, user in enumerate(network.get_csr().node_ids.tolist())}
+    centers = np.array([positions[[row[user] for user in group]].mean(axis=0) for group in groups])
+    for k, group in enumerate(groups):
+        distances = np.linalg.norm(positions[[row[user] for user in group], None, :] - centers[None, :, :], axis=2)
+        assert np.all(distances.argmin(axis=1) == k)
+
+
+@pytest.mark.parametrize("kind", ["force", "spring"])
+def test_layout_warm_starts_after_an_edit(monkeypatch, kind):
+    G, groups, activities = social_graph()
+    network = sl.SocialNetwork(G, groups, activities)
+    seen = []
+    if kind == "force":
+        force_layout = sl._force_layout
+
+        def spy(src, dst, initial, *args, **kwargs):
+            seen.append((network.get_csr().degrees() > 0, initial))
+            return force_layout(src, dst, initial, *args, **kwargs)
+        monkeypatch.setattr(sl, "_force_layout", spy)
+    else:
+        spring_layout = nx.spring_layout
+
+        def spy(G, pos=None, **kwargs):
+            seen.append((None, pos))
+            return spring_layout(G, pos=pos, **kwargs)
+        monkeypatch.setattr(sl.nx, "spring_layout", spy)
+
+    before = network.layout(kind)
+    users = network.get_csr().node_ids.tolist()
+    a, b = next((a, b) for a in G for b in G if a < b and not G.has_edge(a, b))
+    network.add_friendship(a, b)
+    after = network.layout(kind)
+
+    assert len(seen) == 2 and after is not before
+    linked, initial = seen[1]
+    if kind == "force":
+        assert np.allclose(initial, before[linked], atol=1e-2)
+    else:
+        assert seen[0][1] is None
+        assert np.allclose([initial[user] for user in users], before)
+
+
+@pytest.mark.parametrize("G", list(random_graphs())[:5])
+def test_eccentricity_bounds_by_blocks(monkeypatch, G):
+    csr = make_network(G).get_csr()
+    sources = np.arange(0, csr.n, 3)
+    shared = csr.shared_arrays()
+    whole = sl._eccentricity_bounds_task(shared, sources)
+    monkeypatch.setattr(sl, "ECCENTRICITY_BLOCK_ROWS", 7)
+    blocked = sl._eccentricity_bounds_task(shared, sources)
+    for a, b in zip(whole, blocked):
+        assert np.array_equal(a, b)
+
+    lower, upper = blocked[2:]
+    for component in nx.connected_components(G):
+        eccentricity = nx.eccentricity(G.subgraph(component))
+        for user in component:
+            row = csr.index_of(user)
+            assert lower[row] <= eccentricity[user] <= upper[row]
+    isolated = csr.index_of(max(G))
+    assert lower[isolated] == 0
+    assert upper[isolated] == (0 if isolated in sources else np.iinfo(np.int64).max)
+
+
+@pytest.mark.parametrize("numeric", [True, False])
+def test_id_table_codes_are_stable_across_blocks(numeric):
+    rng = np.random.default_rng(3)
+    table = sl._IdTable(numeric)
+    reference = {}
+    for size in rng.integers(1, 400, size=60).tolist():
+        ids = rng.integers(0, 5000, size=(size, 2)) * 7
+        if not numeric:
+            ids = np.char.add("u", ids.astype(str))
+        seen = set(reference)
+        codes = table.encode(ids)
+        for value, code in zip(ids.ravel().tolist(), codes.ravel().tolist()):
+            # un id déjà vu garde son code ; les nouveaux ids du bloc prennent les codes suivants
+            assert reference.setdefault(value, code) == code
+            assert (code < len(seen)) == (value in seen)
+        assert sorted(set(reference.values())) == list(range(len(reference)))
+        # séries de tailles au moins doublées : O(log N) séries à parcourir
+        assert len(table.runs) <= int(np.log2(len(table))) + 1
+    assert len(table) == len(reference)
+    keys = sorted(reference)
+    assert table.keys.tolist() == keys
+    assert np.array_equal(table.ranks()[[reference[key] for key in keys]], np.arange(len(keys)))
+
+
+def test_id_table_switches_to_strings():
+    table = sl._IdTable(True)
+    first = table.encode(np.array([[10, 9], [100, 10]]))
+    table.to_strings()
+    second = table.encode(np.array([["9", "x"], ["100", "10"]]))
+    assert first.tolist() == [[1, 0], [2, 1]] and second.tolist() == [[0, 3], [2, 1]]
+    assert table.keys.tolist() == ["10", "100", "9", "x"]
+